@@ -0,0 +1,138 @@
+# agent_runtime.py
+"""Deferred construction of the ADK session service and the agent graph.
+
+Importing google.adk, google.genai and the orchestrator with its four
+sub-agents takes far longer than everything the login screen needs. The
+entry points hold an AgentRuntime instead and the heavy pieces are imported
+and built the first time they are used: the session service right after
+login, the runner (and with it the whole agent graph) on the first chat turn.
+
+Logins go through `resume()`, which reads the user, their latest session and
+its recent history from the login cache (db/session_cache.py) and writes
+nothing. Only sessions created before user_sessions existed need the session
+service, and `adopt_legacy_session()` looks for them once the password has
+been verified.
+"""
+import threading
+
+from db import session_cache
+from db.history_store import import_legacy_history
+from profile_renderer import PROFILE_KEY
+from startup_profile import profiler
+
+
+class AgentRuntime:
+    """Builds the session service and the Runner on first access."""
+
+    def __init__(self, app_name, db_url):
+        self.app_name = app_name
+        self.db_url = db_url
+        self._session_service = None
+        self._runner = None
+        self._lock = threading.RLock()
+
+    @property
+    def session_service(self):
+        if self._session_service is None:
+            with self._lock:
+                if self._session_service is None:
+                    with profiler.phase("session service"):
+                        from google.adk.sessions import DatabaseSessionService
+
+                        self._session_service = DatabaseSessionService(db_url=self.db_url)
+        return self._session_service
+
+    @property
+    def runner(self):
+        if self._runner is None:
+            with self._lock:
+                if self._runner is None:
+                    session_service = self.session_service
+                    with profiler.phase("runner build"):
+                        from google.adk.runners import Runner
+                        from orchestrator_agent.agent import root_agent
+
+                        self._runner = Runner(
+                            agent=root_agent, app_name=self.app_name, session_service=session_service
+                        )
+        return self._runner
+
+    def resume(self, username, history_limit=session_cache.RESUME_HISTORY_LIMIT):
+        """The login cache entry for `username` (see session_cache.resume), or None for an unknown user.
+
+        Read-only and free of google.adk, as it runs before the password is checked.
+        """
+        return session_cache.resume(self.app_name, username, history_limit)
+
+    def adopt_legacy_session(self, resumed):
+        """After a successful login: the resume entry, with a pre-user_sessions session recorded if there is one.
+
+        Returns `resumed` unchanged when it already has a session or none is found.
+        """
+        if resumed["session_id"] is not None:
+            return resumed
+        username, history_limit = resumed["username"], resumed["history_limit"]
+        # Look for a session made before user_sessions existed, which ADK keeps
+        # under the name-derived user id, and record it.
+        user_id = session_cache.legacy_user_id(username)
+        listing = self.session_service.list_sessions(app_name=self.app_name, user_id=user_id)
+        if not listing.sessions:
+            return resumed
+        session_id = listing.sessions[0].id
+        session = self.session_service.get_session(app_name=self.app_name, user_id=user_id, session_id=session_id)
+        if not session or not self._owns_legacy_session(resumed, user_id, session.state):
+            return resumed
+        # Such sessions may also still keep their history in state, and lack the account id the tools use.
+        import_legacy_history(user_id, session_id, session.state)
+        if session.state.get(session_cache.ACCOUNT_ID_KEY) != resumed["account_id"]:
+            self._set_account_id(session, resumed["account_id"])
+        session_cache.record_session(self.app_name, resumed["account_id"], user_id, session_id)
+        return session_cache.resume(self.app_name, username, history_limit)
+
+    @staticmethod
+    def _owns_legacy_session(resumed, user_id, state):
+        # Different usernames can share a legacy user id ("bob.smith", "bob_smith"), so the
+        # session is only claimed when it names this exact user or no other account maps to it.
+        claimed_by = state.get(session_cache.ACCOUNT_ID_KEY)
+        if claimed_by is not None:
+            return claimed_by == resumed["account_id"]
+        if (state.get(PROFILE_KEY) or {}).get("user_name") == resumed["username"]:
+            return True
+        return session_cache.legacy_user_id_accounts(user_id) == [resumed["account_id"]]
+
+    def _set_account_id(self, session, account_id):
+        from google.adk.events import Event, EventActions
+
+        self.session_service.append_event(session, Event(
+            invocation_id=Event.new_id(), author="user",
+            actions=EventActions(state_delta={session_cache.ACCOUNT_ID_KEY: account_id}),
+        ))
+
+    def start_session(self, account_id, state, session_id=None):
+        """Creates a session for the account and records it as the one the next login resumes.
+
+        Returns (user_id, session_id). The ADK user id is str(account_id), and
+        the account id is also kept in state for the tools.
+        """
+        user_id = str(account_id)
+        session = self.session_service.create_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id,
+            state=dict(state, **{session_cache.ACCOUNT_ID_KEY: account_id}),
+        )
+        session_cache.record_session(self.app_name, account_id, user_id, session.id)
+        return user_id, session.id
+
+    def warm_up(self):
+        """Builds the runner on a background thread, e.g. while the user is typing the first message."""
+        if self._runner is not None:
+            return None
+        thread = threading.Thread(target=self._warm_up, name="agent-runtime-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_up(self):
+        from orchestrator_agent.router import intent_router
+
+        self.runner
+        # Training the pre-router's TF-IDF model (and importing NumPy) otherwise lands on the first turn.
+        intent_router.model
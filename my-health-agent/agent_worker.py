@@ -0,0 +1,119 @@
+# agent_worker.py
+"""A long-lived event loop on a background thread for running agent turns.
+
+`asyncio.run` creates and closes an event loop per call, and the HTTP clients
+and connection pools inside the model client are bound to the loop they were
+created on, so every chat message would open fresh connections. The worker
+keeps one loop alive for the life of the process; callers hand it coroutines
+and get concurrent.futures.Future objects back.
+"""
+import asyncio
+import threading
+
+
+class AgentWorker:
+    """Runs coroutines on a single persistent event loop in a daemon thread."""
+
+    def __init__(self, name="agent-worker"):
+        self.name = name
+        self.loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        # Tasks driving the async generators passed to iterate(); the loop only keeps weak references.
+        self._drivers = set()
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            # Cancel whatever is still running so it can release its connections.
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def start(self):
+        """Starts the loop thread if it is not running yet; safe to call repeatedly."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+            self._thread.start()
+        self._ready.wait()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, coro):
+        """Schedules `coro` on the worker loop and returns a concurrent.futures.Future."""
+        if not self.running:
+            self.start()
+        self.submitted += 1
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Blocks the calling thread until `coro` finishes on the worker loop and returns its result."""
+        return self.submit(coro).result(timeout)
+
+    def iterate(self, agen, timeout=None):
+        """Drives an async generator on the worker loop and yields its items to the calling thread.
+
+        One task on the loop runs every step, so context variables the
+        generator sets (e.g. the tracing span stack) survive between items.
+        Each step is requested by the consumer, so the generator never runs
+        ahead of it.
+        """
+        requests = self.run(self._start(agen))
+
+        async def step(close=False):
+            future = asyncio.get_running_loop().create_future()
+            requests.put_nowait((future, close))
+            return await future
+
+        try:
+            while True:
+                try:
+                    yield self.run(step(), timeout)
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Also runs if the consumer stops early, so the generator's cleanup happens on its loop.
+            self.run(step(close=True), timeout)
+
+    async def _start(self, agen):
+        requests = asyncio.Queue()
+        self._drivers.add(asyncio.ensure_future(self._drive(agen, requests)))
+        return requests
+
+    async def _drive(self, agen, requests):
+        # Answers each (future, close) request with the generator's next item or its exception.
+        try:
+            while True:
+                future, close = await requests.get()
+                try:
+                    future.set_result(await (agen.aclose() if close else agen.__anext__()))
+                except Exception as e:  # StopAsyncIteration included; the consumer re-raises it
+                    future.set_exception(e)
+                if close:
+                    return
+        finally:
+            self._drivers.discard(asyncio.current_task())
+
+    def stop(self, timeout=5):
+        """Stops the loop and waits for the thread to exit."""
+        with self._lock:
+            if not self.running:
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+            self._thread = None
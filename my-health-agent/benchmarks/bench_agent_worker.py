@@ -0,0 +1,143 @@
+# my-health-agent/benchmarks/bench_agent_worker.py
+"""Turn latency and connections opened: asyncio.run per message vs the AgentWorker loop.
+
+A local TCP server stands in for the model API and counts accepted connections.
+The stub model client keeps one keep-alive connection per event loop, the way
+the genai client's async HTTP pool does, and pays --handshake-ms (a stand-in
+for TCP + TLS setup) whenever it has to open a new one. Each message makes
+--calls-per-turn requests (orchestrator, sub-agent, ...) that each take
+--model-ms on the server.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_agent_worker --messages 100
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+import weakref
+
+from agent_worker import AgentWorker
+
+
+class StubModelServer:
+    """Line-based request/response server on a background loop that counts connections."""
+
+    def __init__(self, model_ms):
+        self.model_ms = model_ms
+        self.connections = 0
+        self.port = None
+        self._worker = AgentWorker(name="stub-model-server").start()
+        self._server = self._worker.run(self._start())
+
+    async def _start(self):
+        server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while await reader.readline():
+                await asyncio.sleep(self.model_ms / 1000)
+                writer.write(b"ok\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def stop(self):
+        self._server.close()
+        self._worker.stop()
+
+
+class StubModelClient:
+    """Reuses one connection per event loop; a new loop means a new connection."""
+
+    def __init__(self, port, handshake_ms):
+        self.port = port
+        self.handshake_ms = handshake_ms
+        self._connections = weakref.WeakKeyDictionary()
+
+    async def _connection(self):
+        loop = asyncio.get_running_loop()
+        conn = self._connections.get(loop)
+        if conn is None or conn[1].is_closing():
+            reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+            await asyncio.sleep(self.handshake_ms / 1000)
+            conn = self._connections[loop] = (reader, writer)
+        return conn
+
+    async def aclose(self):
+        conn = self._connections.pop(asyncio.get_running_loop(), None)
+        if conn is not None:
+            conn[1].close()
+            await conn[1].wait_closed()
+
+    async def generate(self):
+        reader, writer = await self._connection()
+        writer.write(b"generate\n")
+        await writer.drain()
+        return await reader.readline()
+
+
+async def chat_turn(client, calls):
+    for _ in range(calls):
+        await client.generate()
+
+
+def run_messages(submit, client, messages, calls):
+    latencies = []
+    for _ in range(messages):
+        start = time.perf_counter()
+        submit(chat_turn(client, calls))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label, latencies, connections, messages):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<24} | {statistics.median(ordered):>8.1f} | {p95:>8.1f} | "
+          f"{connections * 100 / messages:>16.1f} | {threading.active_count():>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--calls-per-turn", type=int, default=2)
+    parser.add_argument("--model-ms", type=float, default=5.0)
+    parser.add_argument("--handshake-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    server = StubModelServer(args.model_ms)
+    print(f"{'mode':<24} | {'p50 ms':>8} | {'p95 ms':>8} | {'conns/100 messages':>16} | {'threads':>7}")
+
+    client = StubModelClient(server.port, args.handshake_ms)
+
+    async def turn_then_close(turn):
+        # Connections cannot outlive the loop asyncio.run is about to close.
+        try:
+            await turn
+        finally:
+            await client.aclose()
+
+    before = server.connections
+    latencies = run_messages(lambda turn: asyncio.run(turn_then_close(turn)), client, args.messages, args.calls_per_turn)
+    report("asyncio.run per message", latencies, server.connections - before, args.messages)
+
+    worker = AgentWorker().start()
+    client = StubModelClient(server.port, args.handshake_ms)
+    before = server.connections
+    latencies = run_messages(worker.run, client, args.messages, args.calls_per_turn)
+    report("AgentWorker loop", latencies, server.connections - before, args.messages)
+
+    worker.run(client.aclose())
+    worker.stop()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# my-health-agent/benchmarks/bench_appointment_lookup.py
+"""Appointment lookup latency at millions of rows: by patient name vs by patient_id.
+
+Builds a doctors database with --appointments rows for --patients accounts,
+booked the old way (patient_name only, patient_id and starts_at NULL, one in
+--free-text times typed as "3 PM"). Then it times:
+  * the migration: ensure_starts_at_schema fills starts_at, ensure_patient_schema
+    links the rows over the ATTACHed user database, then the indexes are built;
+  * the old "my appointments" query, an exact-text match on patient_name with
+    no usable index, so a full scan;
+  * the name fallback (patient_name COLLATE NOCASE, indexed);
+  * the patient_id query (index seek, already in starts_at order), both as a bare
+    query and end to end through appointments_for_patient;
+  * upcoming-only and one-month lookups: the old text columns (the date
+    range on appointment_date can use no index, and the rows are sorted) vs a
+    range scan of (patient_id, starts_at);
+  * one doctor's bookings on one day, a range scan of (doctor_id, starts_at).
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_appointment_lookup --appointments 2000000 --patients 200000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from db import history_store, session_cache, user_profile_db
+from db.connection import close_all_pools, connection, transaction
+from orchestrator_agent.sub_agents.appointment_agent import database
+
+OLD_QUERY = """
+    SELECT d.name, d.hospital_name, a.appointment_date, a.appointment_time, d.consultation_fee
+    FROM appointments a
+    JOIN doctors d ON a.doctor_id = d.id
+    WHERE a.patient_name = ?
+    ORDER BY a.appointment_date, a.appointment_time
+"""
+NEW_ORDER = ("ORDER BY a.appointment_date, a.appointment_time", "ORDER BY a.starts_at, a.id")
+NAME_QUERY = OLD_QUERY.replace("a.patient_name = ?", "a.patient_name = ? COLLATE NOCASE").replace(*NEW_ORDER)
+ID_QUERY = OLD_QUERY.replace("a.patient_name = ?", "a.patient_id = ?").replace(*NEW_ORDER)
+OLD_RANGE_QUERY = OLD_QUERY.replace("a.patient_name = ?", "a.patient_id = ? AND a.appointment_date >= ? AND a.appointment_date < ?")
+RANGE_QUERY = ID_QUERY.replace("a.patient_id = ?", "a.patient_id = ? AND a.starts_at >= ? AND a.starts_at < ?")
+DOCTOR_DAY_QUERY = "SELECT id, starts_at FROM appointments WHERE doctor_id = ? AND starts_at >= ? AND starts_at < ? ORDER BY starts_at"
+CHUNK = 100_000
+
+
+def patient_name(index):
+    return f"Patient {index:07d}"
+
+
+def prepare(tmp, appointments, patients, doctors, free_text):
+    user_profile_db.DB_FILE = history_store.DB_FILE = session_cache.DB_FILE = Path(tmp) / "user_profiles.db"
+    database.DB_FILE = Path(tmp) / "doctors.db"
+    user_profile_db.initialize_user_database()
+    with connection(user_profile_db.DB_FILE) as conn, transaction(conn):
+        conn.executemany(
+            "INSERT INTO users (username, password_hash, profile_json) VALUES (?, 'x', '{}')",
+            ((patient_name(index),) for index in range(patients)),
+        )
+
+    rng = random.Random(11)
+    with connection(database.DB_FILE) as conn:
+        database.create_tables(conn)
+        with transaction(conn):
+            conn.executemany(
+                "INSERT INTO doctors (name, specialization, hospital_name, consultation_fee, visiting_hours) "
+                "VALUES (?, 'General Physician', 'City Hospital', 500, '{}')",
+                ((f"Dr. Lookup {index}",) for index in range(doctors)),
+            )
+        # Start from the old layout: no patient_id or starts_at columns, no indexes or trigger on them.
+        for index in ("idx_appointments_patient_starts", "idx_appointments_patient_name_starts",
+                      "idx_appointments_doctor_starts"):
+            conn.execute(f"DROP INDEX {index}")
+        conn.execute("DROP TRIGGER appointments_starts_at_ai")
+        conn.execute("ALTER TABLE appointments DROP COLUMN patient_id")
+        conn.execute("ALTER TABLE appointments DROP COLUMN starts_at")
+        for start in range(0, appointments, CHUNK):
+            with transaction(conn):
+                conn.executemany(
+                    "INSERT INTO appointments (doctor_id, patient_name, appointment_date, appointment_time) "
+                    "VALUES (?, ?, ?, ?)",
+                    ((rng.randint(1, doctors), patient_name(rng.randrange(patients)),
+                      f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                      f"{rng.randint(1, 4)} PM" if rng.random() < free_text else f"{rng.randint(9, 16):02d}:00")
+                     for _ in range(min(CHUNK, appointments - start))),
+                )
+
+
+def timed(conn_queries, runs):
+    latencies = []
+    for run in runs:
+        start = time.perf_counter()
+        conn_queries(run)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--appointments", type=int, default=2_000_000)
+    parser.add_argument("--patients", type=int, default=200_000)
+    parser.add_argument("--doctors", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=2000, help="lookups per indexed path")
+    parser.add_argument("--scans", type=int, default=10, help="lookups on the unindexed path")
+    parser.add_argument("--free-text", type=float, default=0.01, help="share of bookings with a free-text time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        prepare(tmp, args.appointments, args.patients, args.doctors, args.free_text)
+        print(f"Loaded {args.appointments:,} appointments for {args.patients:,} patients "
+              f"in {time.perf_counter() - started:.1f} s")
+
+        with connection(database.DB_FILE) as conn:
+            started = time.perf_counter()
+            database.ensure_starts_at_schema(conn)
+            database.ensure_patient_schema(conn)
+            linked, timed_rows = conn.execute(
+                "SELECT COUNT(patient_id), COUNT(starts_at) FROM appointments").fetchone()
+            print(f"Migration (backfill of {linked:,} patient ids and {timed_rows:,} start times + indexes): "
+                  f"{time.perf_counter() - started:.1f} s\n")
+
+            rng = random.Random(5)
+            patients = [rng.randrange(args.patients) for _ in range(args.lookups)]
+            rows = [
+                ("patient_name, no index (old)",
+                 timed(lambda p: conn.execute(OLD_QUERY, (patient_name(p),)).fetchall(), patients[:args.scans])),
+                ("patient_name NOCASE, indexed",
+                 timed(lambda p: conn.execute(NAME_QUERY, (patient_name(p).lower(),)).fetchall(), patients)),
+                ("patient_id, indexed",
+                 timed(lambda p: conn.execute(ID_QUERY, (p + 1,)).fetchall(), patients)),
+                ("upcoming, text columns (old)",
+                 timed(lambda p: conn.execute(OLD_RANGE_QUERY, (p + 1, "2026-07-01", "9999")).fetchall(), patients)),
+                ("upcoming, starts_at range",
+                 timed(lambda p: conn.execute(RANGE_QUERY, (p + 1, "2026-07-01T00:00", "9999")).fetchall(), patients)),
+                ("one month, starts_at range",
+                 timed(lambda p: conn.execute(RANGE_QUERY, (p + 1, "2026-07-01T00:00", "2026-08-01T00:00")).fetchall(), patients)),
+                ("doctor's day, starts_at range",
+                 timed(lambda p: conn.execute(DOCTOR_DAY_QUERY, (p % args.doctors + 1, "2026-07-01T00:00", "2026-07-02T00:00")).fetchall(), patients)),
+            ]
+            plans = {name: "; ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params))
+                     for name, query, params in (
+                ("upcoming, text columns", OLD_RANGE_QUERY, (1, "2026-07-01", "9999")),
+                ("upcoming, starts_at", RANGE_QUERY, (1, "2026-07-01T00:00", "9999")),
+            )}
+        rows.append(("appointments_for_patient(id)",
+                     timed(lambda p: database.appointments_for_patient(p + 1, None), patients)))
+        close_all_pools()
+
+    print(f"{'lookup':<32} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, (p50, p95) in rows:
+        print(f"{name:<32} {p50:>9.3f} {p95:>9.3f}")
+    print()
+    for name, plan in plans.items():
+        print(f"{name}: {plan}")
+
+
+if __name__ == "__main__":
+    main()
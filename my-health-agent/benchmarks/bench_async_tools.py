@@ -0,0 +1,119 @@
+# my-health-agent/benchmarks/bench_async_tools.py
+"""Event-loop latency and throughput of the appointment tools, sync vs async.
+
+Simulates concurrent chat sessions on one event loop. Each turn awaits a stub
+model call (asyncio.sleep) and then runs one appointment tool, either directly
+on the loop (the old FunctionTool behaviour) or through db.executor. A probe
+task measures how late the loop wakes it up.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_async_tools --sessions 100 --turns 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from db.connection import connection, transaction
+from db.executor import async_db_tool
+from db.session_cache import ACCOUNT_ID_KEY
+from orchestrator_agent.sub_agents.appointment_agent import database
+from orchestrator_agent.sub_agents.appointment_agent.search import specialization_key, location_key
+
+SPECIALIZATIONS = ['Cardiologist', 'Neurologist', 'Dermatologist', 'General Physician', 'Pediatrician']
+LOCATIONS = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Pune']
+HOURS = json.dumps({"Mon,Tue,Wed,Thu,Fri,Sat,Sun": "09:00-17:00"})
+
+
+def build_database(path, doctors):
+    database.DB_FILE = path
+    rng = random.Random(3)
+    with connection(path) as conn:
+        database.create_tables(conn)
+        rows = []
+        for i in range(doctors):
+            spec, loc = rng.choice(SPECIALIZATIONS), rng.choice(LOCATIONS)
+            rows.append((f"Dr. Async {i}", spec, rng.randint(5, 25), loc, f"City Hospital, {loc}", 800, HOURS,
+                         specialization_key(spec), location_key(loc)))
+        with transaction(conn):
+            conn.executemany(
+                "INSERT INTO doctors (name, specialization, experience_years, location, hospital_name, consultation_fee, visiting_hours, specialization_key, location_key) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def make_tools(use_async):
+    functions = (database._find_doctors_in_db, database._book_appointment_in_db, database._get_appointments_for_user_db)
+    if use_async:
+        return [async_db_tool(fn) for fn in functions]
+
+    def as_blocking_coroutine(fn):
+        async def call(*args):
+            return fn(*args)  # Runs on the event loop thread, like a sync FunctionTool.
+        return call
+    return [as_blocking_coroutine(fn) for fn in functions]
+
+
+async def run_sessions(use_async, sessions, turns, model_ms, doctors):
+    find, book, view = make_tools(use_async)
+    lags = []
+    stop = asyncio.Event()
+
+    async def probe(interval=0.001):
+        while not stop.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    async def session(n):
+        rng = random.Random(n)
+        # What ADK passes as tool_context: the session state carries the account id.
+        tool_context = SimpleNamespace(state={ACCOUNT_ID_KEY: n + 1})
+        day = (date.today() + timedelta(days=1 + rng.randint(0, 13))).isoformat()
+        for turn in range(turns):
+            await asyncio.sleep(model_ms / 1000)  # stub model call
+            step = turn % 3
+            if step == 0:
+                await find(rng.choice(SPECIALIZATIONS), rng.choice(LOCATIONS), "", False, "", False, 0, 0, "")
+            elif step == 1:
+                await book(rng.randint(1, doctors), f"Patient {n}", day, f"{rng.randint(9, 16)}:{rng.choice(['00', '30'])}",
+                           tool_context)
+            else:
+                await view(f"Patient {n}", tool_context)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(session(n) for n in range(sessions)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    lags.sort()
+    return sessions * turns / elapsed, statistics.median(lags), lags[int(len(lags) * 0.99)], lags[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=9)
+    parser.add_argument("--model-ms", type=float, default=50.0, help="stub model latency per turn")
+    parser.add_argument("--doctors", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_database(Path(tmp) / "doctors.db", args.doctors)
+        print(f"{args.sessions} sessions x {args.turns} turns, stub model {args.model_ms:.0f} ms")
+        print(f"{'tools':>6} | {'turns/s':>8} | {'loop lag p50':>12} | {'p99':>8} | {'max':>8}  (ms)")
+        for label, use_async in (("sync", False), ("async", True)):
+            throughput, p50, p99, worst = asyncio.run(
+                run_sessions(use_async, args.sessions, args.turns, args.model_ms, args.doctors)
+            )
+            print(f"{label:>6} | {throughput:>8.0f} | {p50:>12.2f} | {p99:>8.2f} | {worst:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
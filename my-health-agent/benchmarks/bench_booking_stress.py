@@ -0,0 +1,100 @@
+# my-health-agent/benchmarks/bench_booking_stress.py
+"""Multi-threaded booking stress test for the slot model.
+
+N threads hammer a handful of doctors and days through _book_appointment_in_db.
+Afterwards the run fails (exit code 1) if any (doctor, date, slot) was booked
+twice, or if the appointments and claimed slots disagree. Reports bookings/sec.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_booking_stress --threads 16 --attempts 500
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from db.connection import connection, transaction
+from db.session_cache import ACCOUNT_ID_KEY
+from orchestrator_agent.sub_agents.appointment_agent import database
+from orchestrator_agent.sub_agents.appointment_agent.slots import parse_visiting_hours, slots_for_day
+
+ALL_WEEK = json.dumps({"Mon,Tue,Wed,Thu,Fri,Sat,Sun": "09:00-13:00"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=500, help="booking attempts per thread")
+    parser.add_argument("--doctors", type=int, default=3)
+    parser.add_argument("--days", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = Path(tmp) / "doctors.db"
+        with connection(database.DB_FILE) as conn:
+            database.create_tables(conn)
+            with transaction(conn):
+                conn.executemany(
+                    "INSERT INTO doctors (name, specialization, experience_years, location, hospital_name, consultation_fee, visiting_hours) "
+                    "VALUES (?, 'General Physician', 10, 'Pune', 'City Hospital, Pune', 500, ?)",
+                    [(f"Dr. Stress {i}", ALL_WEEK) for i in range(args.doctors)],
+                )
+
+        first_day = date.today() + timedelta(days=1)
+        days = [(first_day + timedelta(days=i)).isoformat() for i in range(args.days)]
+        times = slots_for_day(parse_visiting_hours(ALL_WEEK), first_day)
+        capacity = args.doctors * len(days) * len(times)
+        outcomes = {"booked": 0, "rejected": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            # What ADK passes as tool_context: the session state carries the account id.
+            tool_context = SimpleNamespace(state={ACCOUNT_ID_KEY: seed + 1})
+            for attempt in range(args.attempts):
+                result = database._book_appointment_in_db(
+                    rng.randint(1, args.doctors), f"Patient {seed}-{attempt}", rng.choice(days), rng.choice(times),
+                    tool_context,
+                )
+                key = "booked" if result.startswith("{") else "rejected" if "slot" in result else "errors"
+                with lock:
+                    outcomes[key] += 1
+                if key == "errors":
+                    print(result)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        with connection(database.DB_FILE) as conn:
+            duplicates = conn.execute("""
+                SELECT doctor_id, appointment_date, appointment_time, COUNT(*) FROM appointments
+                GROUP BY doctor_id, appointment_date, appointment_time HAVING COUNT(*) > 1
+            """).fetchall()
+            appointments = conn.execute("SELECT COUNT(*) FROM appointments").fetchone()[0]
+            claimed = conn.execute("SELECT COUNT(*) FROM doctor_slots WHERE appointment_id IS NOT NULL").fetchone()[0]
+
+    attempts = args.threads * args.attempts
+    print(f"threads x attempts:  {args.threads} x {args.attempts} = {attempts} against {capacity} slots")
+    print(f"booked / rejected:   {outcomes['booked']} / {outcomes['rejected']} (errors: {outcomes['errors']})")
+    print(f"appointments/claims: {appointments} / {claimed}")
+    print(f"throughput:          {attempts / elapsed:,.0f} attempts/s, {outcomes['booked'] / elapsed:,.0f} bookings/s")
+
+    if duplicates or appointments != claimed or appointments != outcomes["booked"] or outcomes["errors"]:
+        print(f"FAILED: double bookings {duplicates[:5]}")
+        sys.exit(1)
+    print("OK: no double bookings")
+
+
+if __name__ == "__main__":
+    main()
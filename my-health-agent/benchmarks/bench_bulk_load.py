@@ -0,0 +1,98 @@
+# my-health-agent/benchmarks/bench_bulk_load.py
+"""Doctor load throughput and cold-start cost of initialize_database().
+
+Load: the same generated rows are inserted the old way (one executemany with
+the search indexes and FTS triggers maintained row by row) and through
+bulk_load (chunked transactions, indexes and FTS rebuilt once at the end).
+
+Startup: a fresh interpreter imports the database module and runs
+initialize_database() against an already-populated database. The old
+startup is emulated by also importing Faker and running the COUNT(*)
+emptiness check it used to do.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_bulk_load --rows 200000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from db.connection import close_all_pools, connection, transaction
+from orchestrator_agent.sub_agents.appointment_agent import bulk_load, database
+
+STARTUP_SNIPPET = """
+import time
+started = time.perf_counter()
+{pre_import}
+from orchestrator_agent.sub_agents.appointment_agent import database
+database.DB_FILE = {db_file!r}
+database.initialize_database()
+print("STARTUP_MS", (time.perf_counter() - started) * 1000)
+"""
+
+
+def legacy_load(path, rows):
+    with connection(path) as conn:
+        database.create_tables(conn)
+        started = time.perf_counter()
+        with transaction(conn):
+            conn.executemany("""
+                INSERT INTO doctors (name, specialization, experience_years, location, hospital_name, consultation_fee, visiting_hours, specialization_key, location_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, list(bulk_load._with_keys(rows)))
+        return time.perf_counter() - started
+
+
+def bulk(path, rows, chunk_size):
+    with connection(path) as conn:
+        database.create_tables(conn)
+        started = time.perf_counter()
+        bulk_load.load_doctors(conn, rows, chunk_size)
+        return time.perf_counter() - started
+
+
+def startup_ms(db_file, pre_import, runs):
+    env = dict(os.environ, AROGYA_QUIET="1")
+    times = []
+    for _ in range(runs):
+        code = STARTUP_SNIPPET.format(pre_import=pre_import, db_file=str(db_file))
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True).stdout
+        times.append(float(next(line for line in out.splitlines() if line.startswith("STARTUP_MS")).split()[1]))
+    return sorted(times)[len(times) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=bulk_load.CHUNK_SIZE)
+    parser.add_argument("--startup-runs", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = list(bulk_load.generate_doctors(args.rows, seed=1))
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_seconds = legacy_load(Path(tmp) / "legacy.db", rows)
+        bulk_db = Path(tmp) / "bulk.db"
+        bulk_seconds = bulk(bulk_db, rows, args.chunk_size)
+        close_all_pools()
+
+        print(f"{'loader':<30} | {'seconds':>8} | {'rows/sec':>10}")
+        print(f"{'executemany, indexes live':<30} | {legacy_seconds:>8.2f} | {args.rows / legacy_seconds:>10,.0f}")
+        print(f"{'bulk_load, indexes deferred':<30} | {bulk_seconds:>8.2f} | {args.rows / bulk_seconds:>10,.0f}")
+
+        lazy = startup_ms(bulk_db, "", args.startup_runs)
+        legacy_pre_import = (
+            "import faker, sqlite3\n"
+            f"sqlite3.connect({str(bulk_db)!r}).execute('SELECT COUNT(*) FROM doctors').fetchone()"
+        )
+        eager = startup_ms(bulk_db, legacy_pre_import, args.startup_runs)
+        print(f"\ninitialize_database() cold start on a populated DB ({args.rows:,} doctors), median of {args.startup_runs}:")
+        print(f"  Faker at import + COUNT(*) check: {eager:.0f} ms")
+        print(f"  lazy Faker + LIMIT 1 check:       {lazy:.0f} ms  (saved {eager - lazy:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
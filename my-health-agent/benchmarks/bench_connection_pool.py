@@ -0,0 +1,101 @@
+# my-health-agent/benchmarks/bench_connection_pool.py
+"""Measures get_user-style lookup throughput with N threads, comparing a fresh
+sqlite3.connect per call (the old create_connection pattern) with the shared
+connection pool in db/connection.py.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_connection_pool --threads 1 4 8 16
+"""
+import argparse
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from db.connection import ConnectionPool, transaction
+
+USERS = 1000
+LOOKUP = "SELECT profile_json, password_hash FROM users WHERE username = ?"
+
+
+def build_database(path):
+    pool = ConnectionPool(path)
+    with pool.connection() as conn:
+        conn.execute("""
+            CREATE TABLE users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                profile_json TEXT NOT NULL
+            );
+        """)
+        profile = json.dumps({"user_context": {"personalInfo": {"age": 40, "sex": "Female"}}})
+        with transaction(conn):
+            conn.executemany(
+                "INSERT INTO users (username, password_hash, profile_json) VALUES (?, ?, ?)",
+                [(f"user {i}", "0" * 64, profile) for i in range(USERS)],
+            )
+    pool.close_all()
+
+
+def unpooled_lookup(path, username):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    row = conn.execute(LOOKUP, (username,)).fetchone()
+    conn.close()
+    return json.loads(row[0])
+
+
+def make_pooled_lookup(pool):
+    def lookup(path, username):
+        with pool.connection() as conn:
+            row = conn.execute(LOOKUP, (username,)).fetchone()
+        return json.loads(row[0])
+    return lookup
+
+
+def run(lookup, path, threads, duration):
+    counts = [0] * threads
+    stop = threading.Event()
+
+    def worker(index):
+        i = index
+        while not stop.is_set():
+            lookup(path, f"user {i % USERS}")
+            counts[index] += 1
+            i += threads
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    time.sleep(duration)
+    stop.set()
+    for w in workers:
+        w.join()
+    return sum(counts) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "users.db")
+        build_database(path)
+        pool = ConnectionPool(path)
+        pooled_lookup = make_pooled_lookup(pool)
+
+        print(f"{'threads':>8} | {'connect/close ops/s':>20} | {'pooled ops/s':>13} | {'speedup':>7}")
+        for threads in args.threads:
+            before = run(unpooled_lookup, path, threads, args.duration)
+            after = run(pooled_lookup, path, threads, args.duration)
+            print(f"{threads:>8} | {before:>20,.0f} | {after:>13,.0f} | {after / before:>6.1f}x")
+        print(f"connections opened by the pool: {pool.opened}")
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# my-health-agent/benchmarks/bench_doctor_cache.py
+"""Replays a find_doctors query log with and without the doctor-search result cache.
+
+The log is a text file with one "specialization,location" pair per line.
+Without --log a synthetic log is used: Zipf-like popularity over
+specialization x city, spelled the ways the model sends them ("Physician",
+"general physician", "Bengaluru"...). Every --write-every queries a doctor's
+fee is updated, which bumps the generation and empties the cache, as an admin
+edit or import would.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_doctor_cache --doctors 100000 --queries 20000 --write-every 5000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from db.connection import close_all_pools, connection, transaction
+from orchestrator_agent.sub_agents.appointment_agent import database
+from orchestrator_agent.sub_agents.appointment_agent.bulk_load import (
+    HOSPITALS, LOCATIONS, SPECIALIZATIONS, _visiting_hours_pool, load_doctors
+)
+from orchestrator_agent.sub_agents.appointment_agent.doctor_cache import doctor_cache
+
+SPELLINGS = {
+    "General Physician": ["General Physician", "physician", "Physician", "GP"],
+    "Orthopedic Surgeon": ["Orthopedic Surgeon", "orthopaedic"],
+    "Cardiologist": ["Cardiologist", "cardiologist", "heart specialist"],
+}
+CITY_SPELLINGS = {"Bangalore": ["Bangalore", "Bengaluru"], "Mumbai": ["Mumbai", "mumbai", "Bombay"]}
+
+
+def doctor_rows(count, rng):
+    # Same shape as bulk_load.generate_doctors, without Faker names.
+    hours = _visiting_hours_pool()
+    for index in range(count):
+        loc = rng.choice(LOCATIONS)
+        yield (f"Dr. Bench {index}", rng.choice(SPECIALIZATIONS), rng.randint(5, 25), loc,
+               f"{rng.choice(HOSPITALS)}, {loc}", rng.randint(8, 25) * 100, rng.choice(hours[rng.randint(3, 5)]))
+
+
+def synthetic_log(count, rng):
+    pairs = [(spec, loc) for spec in SPECIALIZATIONS for loc in LOCATIONS]
+    rng.shuffle(pairs)
+    weights = [1 / (rank + 1) for rank in range(len(pairs))]
+    log = []
+    for spec, loc in rng.choices(pairs, weights, k=count):
+        log.append((rng.choice(SPELLINGS.get(spec, [spec])), rng.choice(CITY_SPELLINGS.get(loc, [loc]))))
+    return log
+
+
+def replay(queries, write_every, doctors):
+    rng = random.Random(3)
+    latencies = []
+    for index, (specialization, location) in enumerate(queries, 1):
+        start = time.perf_counter()
+        database._find_doctors_in_db(specialization, location, "", False, "", False, 0, 0, "")
+        latencies.append((time.perf_counter() - start) * 1e6)
+        if write_every and index % write_every == 0:
+            with connection(database.DB_FILE) as conn, transaction(conn):
+                conn.execute("UPDATE doctors SET consultation_fee = consultation_fee + 100 WHERE id = ?",
+                             (rng.randint(1, doctors),))
+    latencies.sort()
+    return sum(latencies) / len(latencies), latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", type=Path, help="query log, one 'specialization,location' per line")
+    parser.add_argument("--doctors", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=20_000, help="size of the synthetic log")
+    parser.add_argument("--write-every", type=int, default=5000, help="queries between doctor updates (0: none)")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    if args.log:
+        queries = [tuple((line.split(",", 1) + [""])[:2]) for line in args.log.read_text().splitlines() if line.strip()]
+    else:
+        queries = synthetic_log(args.queries, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = Path(tmp) / "doctors.db"
+        with connection(database.DB_FILE) as conn:
+            database.create_tables(conn)
+            load_doctors(conn, doctor_rows(args.doctors, rng))
+
+        max_entries = doctor_cache.max_entries
+        doctor_cache.max_entries = 0
+        uncached = replay(queries, args.write_every, args.doctors)
+        doctor_cache.max_entries = max_entries
+        doctor_cache.clear()
+        cached = replay(queries, args.write_every, args.doctors)
+        stats = doctor_cache.stats()
+        close_all_pools()
+
+    print(f"{len(queries)} queries over {args.doctors:,} doctors, a doctor update every {args.write_every or '-'} queries\n")
+    print(f"{'mode':<10} {'mean us':>9} {'p50 us':>9} {'p99 us':>9}")
+    for name, (mean, p50, p99) in (("uncached", uncached), ("cached", cached)):
+        print(f"{name:<10} {mean:>9.1f} {p50:>9.1f} {p99:>9.1f}")
+    print(f"\nspeedup (mean): {uncached[0] / cached[0]:.1f}x")
+    print(f"cache: hit rate {stats['hit_rate']:.1%} ({stats['hits']} hits, {stats['misses']} misses), "
+          f"{stats['invalidations']} invalidations, {stats['evictions']} evictions, "
+          f"{stats['entries']} entries using {stats['bytes'] / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# my-health-agent/benchmarks/bench_doctor_directory.py
+"""Multi-criteria doctor ranking: SQLite vs the in-memory columnar directory.
+
+Ranks doctors for (specialization, city, weekday, hospital) queries with the
+directory's weights, three ways:
+  * sql + python: fetch every candidate row from the composite index, decode
+    visiting_hours and score in Python (what ranking in the SQL path costs);
+  * directory.top_k: the vectorized ranking only, returning doctor ids;
+  * directory_search: top_k plus fetching the k full rows from SQLite.
+The experience-only SQL search (search_doctors) is timed for reference.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_doctor_directory --doctors 1000000
+"""
+import argparse
+import heapq
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from db.connection import close_all_pools, connection
+from orchestrator_agent.sub_agents.appointment_agent import database
+from orchestrator_agent.sub_agents.appointment_agent.bulk_load import LOCATIONS, SPECIALIZATIONS, load_doctors
+from orchestrator_agent.sub_agents.appointment_agent.directory import (
+    WEIGHTS, day_mask, directory_search, doctor_directory
+)
+from orchestrator_agent.sub_agents.appointment_agent.doctor_cache import doctors_generation
+from orchestrator_agent.sub_agents.appointment_agent.search import canonical_key, search_doctors, specialization_key, location_key
+from benchmarks.bench_doctor_cache import doctor_rows
+
+HOSPITAL_PREFERENCES = ["", "", "apollo", "fortis health"]
+
+
+def sql_ranked(conn, spec_key, loc_key, weekday, hospital, k, bounds):
+    max_experience, min_fee, fee_range = bounds
+    terms = hospital.split()
+    rows = conn.execute(
+        "SELECT id, experience_years, consultation_fee, visiting_hours, hospital_name FROM doctors "
+        "WHERE specialization_key = ? AND location_key = ?", (spec_key, loc_key)).fetchall()
+    scored = []
+    for doctor_id, experience, fee, visiting_hours, hospital_name in rows:
+        score = experience / max_experience * WEIGHTS["experience"] + (1 - (fee - min_fee) / fee_range) * WEIGHTS["fee"]
+        score += (day_mask(visiting_hours) >> weekday & 1) * WEIGHTS["availability"]
+        if terms and all(term in canonical_key(hospital_name).split() for term in terms):
+            score += WEIGHTS["hospital"]
+        scored.append((score, experience, -doctor_id))
+    return [-doctor_id for _, _, doctor_id in heapq.nlargest(k, scored)]
+
+
+def timed(queries, search):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(*query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--sql-queries", type=int, default=50, help="queries for the slow sql + python path")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    queries = [(specialization_key(rng.choice(SPECIALIZATIONS)), location_key(rng.choice(LOCATIONS)),
+                rng.randrange(7), rng.choice(HOSPITAL_PREFERENCES)) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = Path(tmp) / "doctors.db"
+        with connection(database.DB_FILE) as conn:
+            database.create_tables(conn)
+            started = time.perf_counter()
+            load_doctors(conn, doctor_rows(args.doctors, random.Random(7)))
+            print(f"Loaded {args.doctors:,} doctors into SQLite in {time.perf_counter() - started:.1f} s")
+            generation = doctors_generation(conn)
+            doctor_directory.load(conn, generation)
+            print(f"Directory snapshot: {doctor_directory.stats['load_ms']:.0f} ms, "
+                  f"{doctor_directory.nbytes() / 2**20:.1f} MiB\n")
+            bounds = conn.execute("SELECT MAX(experience_years), MIN(consultation_fee), "
+                                  "MAX(consultation_fee) - MIN(consultation_fee) FROM doctors").fetchone()
+
+            rows = [
+                ("sql + python ranking", timed(queries[:args.sql_queries], lambda s, l, d, h: sql_ranked(conn, s, l, d, h, args.k, bounds))),
+                ("search_doctors (exp. only)", timed(queries, lambda s, l, d, h: search_doctors(conn, s, l, args.k))),
+                ("directory.top_k", timed(queries, lambda s, l, d, h: doctor_directory.top_k(s, l, args.k, d, h))),
+                ("directory_search", timed(queries, lambda s, l, d, h: directory_search(conn, generation, s, l, args.k, d, h))),
+            ]
+            mismatches = sum(sql_ranked(conn, *query, args.k, bounds) != doctor_directory.top_k(query[0], query[1], args.k, query[2], query[3])
+                             for query in queries[:args.sql_queries])
+        close_all_pools()
+
+    print(f"{'ranking path':<28} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, (p50, p99) in rows:
+        print(f"{name:<28} {p50:>9.3f} {p99:>9.3f}")
+    print(f"\nsql + python vs directory.top_k disagreements: {mismatches}/{args.sql_queries}")
+
+
+if __name__ == "__main__":
+    main()
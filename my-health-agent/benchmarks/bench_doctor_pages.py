@@ -0,0 +1,75 @@
+# my-health-agent/benchmarks/bench_doctor_pages.py
+"""Deep pages of one doctor search: keyset seek vs LIMIT/OFFSET.
+
+Pages through every (specialization, city) match in experience order, the
+order the SQL path of find_doctors uses. The OFFSET page re-reads and skips
+every earlier row, so its cost grows with the page number; the keyset page
+seeks to the previous page's last (experience_years, id) in the composite
+index and reads only its own rows.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_doctor_pages --doctors 1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from db.connection import close_all_pools, connection
+from orchestrator_agent.sub_agents.appointment_agent import database
+from orchestrator_agent.sub_agents.appointment_agent.bulk_load import load_doctors
+from orchestrator_agent.sub_agents.appointment_agent.search import (
+    DOCTOR_COLUMNS, location_key, search_doctors_page, specialization_key
+)
+from benchmarks.bench_doctor_cache import doctor_rows
+
+SPECIALIZATION, LOCATION = "Cardiologist", "Mumbai"
+
+
+def offset_page(conn, page, size):
+    return conn.execute(
+        f"SELECT {DOCTOR_COLUMNS} FROM doctors WHERE specialization_key = ? AND location_key = ? "
+        "ORDER BY experience_years DESC, id LIMIT ? OFFSET ?",
+        (specialization_key(SPECIALIZATION), location_key(LOCATION), size, page * size),
+    ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = Path(tmp) / "doctors.db"
+        with connection(database.DB_FILE) as conn:
+            database.create_tables(conn)
+            load_doctors(conn, doctor_rows(args.doctors, random.Random(7)))
+
+            keyset_ms, after = [], None
+            while True:
+                start = time.perf_counter()
+                rows, _ = search_doctors_page(conn, SPECIALIZATION, LOCATION, args.page_size, after=after, source="exact")
+                keyset_ms.append((time.perf_counter() - start) * 1000)
+                if len(rows) < args.page_size:
+                    break
+                after = (rows[-1][3], rows[-1][0])
+
+            offset_ms = []
+            for page in range(len(keyset_ms)):
+                start = time.perf_counter()
+                offset_page(conn, page, args.page_size)
+                offset_ms.append((time.perf_counter() - start) * 1000)
+        close_all_pools()
+
+    pages = len(keyset_ms)
+    print(f"{SPECIALIZATION} in {LOCATION}: {pages:,} pages of {args.page_size} over {args.doctors:,} doctors\n")
+    print(f"{'page':>8} {'keyset ms':>10} {'offset ms':>10}")
+    for page in sorted({0, pages // 10, pages // 2, pages - 1}):
+        print(f"{page + 1:>8} {keyset_ms[page]:>10.3f} {offset_ms[page]:>10.3f}")
+    print(f"\nall pages: keyset {sum(keyset_ms):.0f} ms, offset {sum(offset_ms):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# my-health-agent/benchmarks/bench_doctor_search.py
+"""Compares the legacy LIKE '%...%' doctor query with the indexed search layer.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_doctor_search --sizes 1000 100000 1000000
+"""
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from orchestrator_agent.sub_agents.appointment_agent.search import (
+    ensure_search_schema, search_doctors, specialization_key, location_key
+)
+
+SPECIALIZATIONS = ['Cardiologist', 'Neurologist', 'Dermatologist', 'Orthopedic Surgeon', 'General Physician', 'Pediatrician', 'Oncologist', 'Endocrinologist', 'Gastroenterologist']
+LOCATIONS = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad']
+# A mix of exact, aliased and partial terms, as the model sends them.
+QUERIES = [
+    ("Cardiologist", "Mumbai"), ("physician", "Pune"), ("Neurologist", "Bengaluru"),
+    ("Dermatologist", ""), ("", "Delhi"), ("Orthopaedic", "Chennai"), ("Pediatrician", "Kolkata"),
+    ("cardio", "mum"), ("gastro", "Hyderabad"),
+]
+
+LEGACY_QUERY = "SELECT id, name, specialization, experience_years, hospital_name, consultation_fee, visiting_hours FROM doctors WHERE 1=1"
+
+
+def build_database(path, count):
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("""
+        CREATE TABLE doctors (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            specialization TEXT NOT NULL,
+            experience_years INTEGER,
+            location TEXT,
+            hospital_name TEXT,
+            consultation_fee REAL,
+            visiting_hours TEXT,
+            specialization_key TEXT,
+            location_key TEXT
+        );
+    """)
+    rng = random.Random(42)
+    hours = json.dumps({"Mon,Wed,Fri": "10:00-13:00"})
+    chunk = []
+    conn.execute("BEGIN")
+    for i in range(count):
+        spec = rng.choice(SPECIALIZATIONS)
+        loc = rng.choice(LOCATIONS)
+        chunk.append((f"Dr. Bench {i}", spec, rng.randint(5, 25), loc, f"City Hospital, {loc}",
+                      rng.randint(8, 25) * 100, hours, specialization_key(spec), location_key(loc)))
+        if len(chunk) == 50_000:
+            conn.executemany("INSERT INTO doctors (name, specialization, experience_years, location, hospital_name, consultation_fee, visiting_hours, specialization_key, location_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", chunk)
+            chunk = []
+    if chunk:
+        conn.executemany("INSERT INTO doctors (name, specialization, experience_years, location, hospital_name, consultation_fee, visiting_hours, specialization_key, location_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", chunk)
+    conn.execute("COMMIT")
+    return conn
+
+
+def legacy_search(conn, specialization, location):
+    query, params = LEGACY_QUERY, []
+    if specialization:
+        search_term = 'General Physician' if 'physician' in specialization.lower() else specialization
+        query += " AND specialization LIKE ?"
+        params.append(f"%{search_term}%")
+    if location:
+        query += " AND location LIKE ?"
+        params.append(f"%{location}%")
+    query += " ORDER BY experience_years DESC LIMIT 5"
+    return conn.execute(query, params).fetchall()
+
+
+def measure(fn, conn, iterations):
+    samples = []
+    for i in range(iterations):
+        spec, loc = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        fn(conn, spec, loc)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'doctors':>10} | {'legacy p50':>11} {'legacy p99':>11} | {'indexed p50':>11} {'indexed p99':>11}  (ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            conn = build_database(Path(tmp) / f"doctors_{size}.db", size)
+            legacy = measure(legacy_search, conn, args.iterations)
+            ensure_search_schema(conn)
+            indexed = measure(lambda c, s, l: search_doctors(c, s, l, limit=5), conn, args.iterations)
+            conn.close()
+            print(f"{size:>10} | {legacy[0]:>11.3f} {legacy[1]:>11.3f} | {indexed[0]:>11.3f} {indexed[1]:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
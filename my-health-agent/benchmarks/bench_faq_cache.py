@@ -0,0 +1,75 @@
+# my-health-agent/benchmarks/bench_faq_cache.py
+"""Replays a query log against the faq_bot response cache.
+
+The log is a text file with one question per line. Without --log a synthetic
+log with repeated and lightly re-phrased questions is used. Every miss is
+charged --model-ms of simulated model latency.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_faq_cache --log queries.txt --model-ms 1200
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from orchestrator_agent.sub_agents.faq_bot.cache import FaqResponseCache
+
+TOPICS = ["hypertension", "diabetes", "asthma", "migraine", "the flu", "malaria", "dengue", "anemia",
+          "thyroid disease", "high cholesterol", "arthritis", "meditation", "vitamin d deficiency"]
+TEMPLATES = ["What is {t}?", "what is {t}", "Can you tell me what is {t}?", "What are the symptoms of {t}?",
+             "what are the symptoms of {t}??", "How is {t} treated?", "What causes {t}?", "Please explain {t}."]
+
+
+def synthetic_log(count, seed=11):
+    rng = random.Random(seed)
+    # Zipf-like popularity: a few topics dominate, as in production traffic.
+    weights = [1 / (rank + 1) for rank in range(len(TOPICS))]
+    return [rng.choice(TEMPLATES).format(t=rng.choices(TOPICS, weights)[0]) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", type=Path, help="query log, one question per line")
+    parser.add_argument("--queries", type=int, default=5000, help="size of the synthetic log")
+    parser.add_argument("--model-ms", type=float, default=1200.0, help="simulated model latency per miss")
+    parser.add_argument("--size", type=int, default=None, help="override the LRU size bound")
+    args = parser.parse_args()
+
+    queries = [line.strip() for line in args.log.read_text().splitlines() if line.strip()] if args.log else synthetic_log(args.queries)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        options = {}
+        if args.size is not None:
+            options["max_entries"] = args.size
+        cache = FaqResponseCache(db_file=Path(tmp) / "faq_cache.db", **options)
+
+        lookup_ms = []
+        for question in queries:
+            start = time.perf_counter()
+            answer = cache.get(question)
+            lookup_ms.append((time.perf_counter() - start) * 1000)
+            if answer is None:
+                cache.put(question, f"Canned answer for: {question}")
+
+        stats = cache.stats()
+        without_cache = len(queries) * args.model_ms
+        with_cache = stats["misses"] * args.model_ms + sum(lookup_ms)
+        lookup_ms.sort()
+        print(f"queries:          {len(queries)}")
+        print(f"hits / misses:    {stats['hits']} / {stats['misses']}")
+        print(f"hit rate:         {stats['hit_rate']:.1%}")
+        print(f"entries/evicted:  {stats['entries']} / {stats['evictions']}")
+        print(f"lookup p50/p99:   {statistics.median(lookup_ms):.3f} / {lookup_ms[int(len(lookup_ms) * 0.99)]:.3f} ms")
+        print(f"model time:       {without_cache / 1000:.1f} s without cache, {with_cache / 1000:.1f} s with cache")
+
+        # Persistence: a fresh instance on the same file should start warm.
+        restarted = FaqResponseCache(db_file=Path(tmp) / "faq_cache.db", **options)
+        warm = sum(restarted.get(question) is not None for question in queries[:200])
+        print(f"after restart:    {warm}/200 of the first queries served from the persisted cache")
+
+
+if __name__ == "__main__":
+    main()
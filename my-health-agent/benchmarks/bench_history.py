@@ -0,0 +1,88 @@
+# my-health-agent/benchmarks/bench_history.py
+"""Prompt size and render time of the interaction history over a long session.
+
+Compares the legacy behaviour (the full history list kept in session state and
+interpolated into every prompt) with the append-only history store plus the
+bounded window + rolling summary from history_manager. Byte columns are history
+bytes sent per turn (orchestrator plus one sub-agent); the store columns time
+one append and the two window loads a turn needs.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_history --turns 1000
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from db import history_store
+from db.connection import close_all_pools, connection
+from history_manager import AGENT_BUDGET_BYTES, render_history
+
+USER_MESSAGES = [
+    "I have had a headache and mild fever since yesterday evening.",
+    "Can you find a cardiologist in Mumbai for me?",
+    "What is hypertension and how is it usually treated?",
+    "I walked for 30 minutes today, how many calories is that?",
+    "Please book doctor 42 for 2025-07-01 at 10 AM.",
+]
+
+
+def agent_reply(rng):
+    return " ".join(rng.choice(["Based on your symptoms,", "Here are the doctors I found.", "Staying hydrated helps.",
+                                "Please consult a physician if it persists.", "Your appointment is confirmed."])
+                    for _ in range(rng.randint(5, 25)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--report-every", type=int, default=100)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    history_store.DB_FILE = Path(tmp.name) / "history.db"
+    with connection(history_store.DB_FILE) as conn:
+        history_store.create_history_tables(conn)
+
+    rng = random.Random(7)
+    agents = list(AGENT_BUDGET_BYTES)
+    legacy_history = []
+    legacy_render = bounded_render = 0.0
+    legacy_state_bytes = 0
+
+    print(f"{'turn':>6} | {'legacy bytes':>12} | {'bounded bytes':>13} | {'state bytes':>11} | "
+          f"{'legacy ms':>9} | {'store ms':>8}")
+    for turn in range(1, args.turns + 1):
+        entries = [{"role": "user", "content": rng.choice(USER_MESSAGES)},
+                   {"role": rng.choice(agents[1:]), "content": agent_reply(rng)}]
+
+        # Legacy: the whole list is rewritten into session state and sent with every prompt.
+        start = time.perf_counter()
+        legacy_history.extend(entries)
+        legacy_state_bytes = len(json.dumps({"interaction_history": legacy_history}).encode("utf-8"))
+        legacy_prompt = str(legacy_history)
+        legacy_sizes = [len(legacy_prompt.encode("utf-8"))] * 2
+        legacy_render += time.perf_counter() - start
+
+        # Store: one append, then each of the turn's two prompts loads and renders the window.
+        start = time.perf_counter()
+        history_store.append_entries("bench", "session", entries)
+        bounded_sizes = []
+        for name in (agents[0], rng.choice(agents[1:])):
+            window, summary = history_store.load_window("bench", "session")
+            bounded_sizes.append(len(render_history(window, summary, name).encode("utf-8")))
+        bounded_render += time.perf_counter() - start
+
+        if turn % args.report_every == 0:
+            print(f"{turn:>6} | {sum(legacy_sizes):>12,} | {sum(bounded_sizes):>13,} | {legacy_state_bytes:>11,} | "
+                  f"{legacy_render * 1000 / turn:>9.3f} | {bounded_render * 1000 / turn:>8.3f}")
+
+    close_all_pools()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
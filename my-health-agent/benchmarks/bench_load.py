@@ -0,0 +1,181 @@
+# my-health-agent/benchmarks/bench_load.py
+"""Offline end-to-end load test with a stub model (benchmarks/stub_model.py).
+
+N simulated users run concurrently on one event loop, as they would behind the
+Streamlit server. Each one logs in (session_cache.resume + verify_login_async),
+creates a session and plays a scripted conversation: find a doctor, book them, view
+the appointments. The turns go through utils.call_agent_async with the real
+runner, agents, tools and databases. Only the model is replaced.
+
+Reports throughput, latency percentiles per step and DB contention (executor
+and semaphore wait from the db spans, rejected and failed bookings). All
+databases live in a temporary directory.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_load --users 50 --model-ms 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+os.environ.setdefault("AROGYA_QUIET", "1")
+
+import tracing
+from db import history_store, session_cache, user_profile_db
+from db.connection import close_all_pools, connection, transaction
+from db.user_profile_db import add_user, verify_login_async
+from orchestrator_agent.sub_agents.appointment_agent import database
+from orchestrator_agent.sub_agents.appointment_agent.bulk_load import seed_doctors
+from utils import call_agent_async
+
+APP_NAME = "Arogya Mitra Load Test"
+PASSWORD = "1234"
+SLOT_TIMES = ["09:00", "09:30", "10:00", "10:30", "11:00"]
+
+
+def script_for(user_index):
+    """The scripted conversation for one user; bookings spread over days to limit intended conflicts."""
+    day = date.today() + timedelta(days=1 + user_index // len(SLOT_TIMES))
+    slot = SLOT_TIMES[user_index % len(SLOT_TIMES)]
+    return [
+        ("find", "Please find a general physician in Mumbai"),
+        ("book", f"Book the first doctor for {day.isoformat()} at {slot}"),
+        ("view", "view my appointments"),
+    ]
+
+
+def percentiles(values):
+    ordered = sorted(values)
+    return {p: tracing.percentile(ordered, p / 100) for p in (50, 95, 99)}
+
+
+async def simulate_user(index, runner, session_service, timings, outcomes):
+    name = f"Load User {index}"
+
+    start = time.perf_counter()
+    resumed = await asyncio.to_thread(session_cache.resume, APP_NAME, name)
+    if not resumed or not await verify_login_async(name, resumed["password_hash"], PASSWORD):
+        outcomes["login_failed"] += 1
+        return
+    timings["login"].append((time.perf_counter() - start) * 1000)
+    user_id = resumed["user_id"]
+
+    start = time.perf_counter()
+    # As AgentRuntime.start_session: the account id goes into state for the appointment tools.
+    session = await asyncio.to_thread(
+        session_service.create_session, app_name=APP_NAME, user_id=user_id,
+        state=dict(resumed["profile"], **{session_cache.ACCOUNT_ID_KEY: resumed["account_id"]}),
+    )
+    await asyncio.to_thread(session_cache.record_session, APP_NAME, resumed["account_id"], user_id, session.id)
+    timings["session"].append((time.perf_counter() - start) * 1000)
+
+    for step, message in script_for(index):
+        start = time.perf_counter()
+        reply = await call_agent_async(runner, user_id, session.id, message)
+        timings[step].append((time.perf_counter() - start) * 1000)
+        if step == "book":
+            text = reply or ""
+            outcomes["booked" if "book_appointment returned:\n{" in text else
+                     "rejected" if "already booked" in text or "visiting hours" in text else "book_failed"] += 1
+
+
+def prepare_databases(tmp, users, doctors):
+    database.DB_FILE = Path(tmp) / "doctors.db"
+    user_profile_db.DB_FILE = history_store.DB_FILE = session_cache.DB_FILE = Path(tmp) / "user_profiles.db"
+    with connection(database.DB_FILE) as conn:
+        database.create_tables(conn)
+        seed_doctors(conn, doctors, seed=1)
+        # Ranked first for the scripted search (seeded doctors have at most 25 years) and
+        # available every day, so the bookings only conflict when the script intends it.
+        with transaction(conn):
+            conn.execute(
+                "INSERT INTO doctors (name, specialization, experience_years, location, hospital_name, consultation_fee, "
+                "visiting_hours, specialization_key, location_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ("Dr. Load Test", "General Physician", 40, "Mumbai", "City Hospital, Mumbai", 500,
+                 json.dumps({"Mon,Tue,Wed,Thu,Fri,Sat,Sun": "09:00-12:00"}), "general physician", "mumbai"),
+            )
+    user_profile_db.initialize_user_database()
+    for index in range(users):
+        profile = {"user_context": {"user_name": f"Load User {index}", "personalInfo": {"age": 30, "sex": "F"},
+                                    "diagnosedConditions": [], "currentMedications": []}}
+        add_user(f"Load User {index}", PASSWORD, profile)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--doctors", type=int, default=2000)
+    parser.add_argument("--model-ms", type=float, default=200.0, help="stub model latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--prompt-ms-per-1k", type=float, default=0.0,
+                        help="extra stub latency per 1000 prompt tokens (prefill cost)")
+    parser.add_argument("--sessions", choices=["sqlite", "memory"], default="sqlite",
+                        help="DatabaseSessionService on a temp SQLite file, or InMemorySessionService")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prepare_databases(tmp, args.users, args.doctors)
+
+        # Collect db/tool spans for the contention report.
+        tracing.TRACE_ENABLED = True
+        tracing.sink = tracing.JsonlSink(Path(tmp) / "traces.jsonl")
+
+        from google.adk.runners import Runner
+        from google.adk.sessions import DatabaseSessionService, InMemorySessionService
+        from benchmarks.stub_model import install_stub_models, usage_totals
+        from orchestrator_agent.agent import root_agent
+
+        install_stub_models(root_agent, args.model_ms, args.jitter_ms, args.prompt_ms_per_1k)
+        if args.sessions == "sqlite":
+            session_service = DatabaseSessionService(db_url=f"sqlite:///{Path(tmp) / 'sessions.db'}")
+        else:
+            session_service = InMemorySessionService()
+        runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=session_service)
+
+        timings = {step: [] for step in ("login", "session", "find", "book", "view")}
+        outcomes = {"booked": 0, "rejected": 0, "book_failed": 0, "login_failed": 0}
+
+        async def run_all():
+            await asyncio.gather(*(
+                simulate_user(index, runner, session_service, timings, outcomes) for index in range(args.users)
+            ))
+
+        started = time.perf_counter()
+        asyncio.run(run_all())
+        elapsed = time.perf_counter() - started
+        tracing.sink.close()
+        spans = tracing.load_spans(Path(tmp) / "traces.jsonl")
+        close_all_pools()
+
+    turns = sum(len(timings[step]) for step in ("find", "book", "view"))
+    print(f"{args.users} users, {turns} turns in {elapsed:.2f} s: {turns / elapsed:.1f} turns/sec, "
+          f"{args.users / elapsed:.1f} users/sec (stub model {args.model_ms:.0f} +/- {args.jitter_ms:.0f} ms per call)\n")
+
+    print(f"{'step':<10} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for step, values in timings.items():
+        if values:
+            p = percentiles(values)
+            print(f"{step:<10} {len(values):>6} {p[50]:>9.1f} {p[95]:>9.1f} {p[99]:>9.1f}")
+
+    db_spans = [item for item in spans if item.get("kind") == "db"]
+    if db_spans:
+        print("\nDB contention (db spans):")
+        for field in ("semaphore_wait_ms", "queue_wait_ms", "duration_ms"):
+            p = percentiles([item.get(field, 0.0) for item in db_spans])
+            print(f"  {field:<18} p50 {p[50]:>8.2f}  p95 {p[95]:>8.2f}  p99 {p[99]:>8.2f}")
+    print(f"\nModel calls: {usage_totals['calls']}, prompt tokens: {usage_totals['prompt_tokens']:,} "
+          f"({usage_totals['prompt_tokens'] / max(1, usage_totals['calls']):,.0f} per call)")
+    print(f"Bookings: {outcomes['booked']} booked, {outcomes['rejected']} rejected (slot taken), "
+          f"{outcomes['book_failed']} failed; logins failed: {outcomes['login_failed']}")
+
+    print("\nSpans:")
+    tracing.print_report(tracing.summarize(spans))
+
+
+if __name__ == "__main__":
+    main()
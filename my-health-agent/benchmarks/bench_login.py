@@ -0,0 +1,150 @@
+# my-health-agent/benchmarks/bench_login.py
+"""Login latency for users with long histories: the old login sequence vs session_cache.resume.
+
+Old: get_user (json.loads of profile_json) -> list_sessions -> get_session.
+Pre-store sessions kept interaction_history in state, so get_session loads
+all of it. recent_entries then fetches the chat history shown on screen.
+New: one SQL statement through session_cache.resume, first cold (empty LRU)
+and then warm. The password check is the same on both paths and is left
+out; benchmarks/bench_passwords.py times it.
+
+The old sequence uses google-adk's DatabaseSessionService when it is
+installed. Otherwise a one-table SQLite session store stands in for it, which
+is a lower bound on the real cost since ADK also loads the session's events.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_login --users 200 --history 2000
+"""
+import argparse
+import json
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from db import history_store, passwords, session_cache, user_profile_db
+from db.connection import close_all_pools
+from db.user_profile_db import add_user, get_user, initialize_user_database
+
+APP_NAME = "Arogya Mitra"
+PASSWORD = "1234"
+CHAT_HISTORY_LIMIT = 50
+
+
+class SqliteSessionStore:
+    """Minimal stand-in for DatabaseSessionService: list/get/create with a JSON state column."""
+
+    def __init__(self, path):
+        self.path = path
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE sessions (app_name TEXT, user_id TEXT, id TEXT, state TEXT, "
+                         "PRIMARY KEY (app_name, user_id, id))")
+
+    def create_session(self, app_name, user_id, session_id, state):
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("INSERT INTO sessions VALUES (?, ?, ?, ?)", (app_name, user_id, session_id, json.dumps(state)))
+        return SimpleNamespace(id=session_id, state=state)
+
+    def list_sessions(self, app_name, user_id):
+        with sqlite3.connect(self.path) as conn:
+            rows = conn.execute("SELECT id FROM sessions WHERE app_name = ? AND user_id = ?", (app_name, user_id)).fetchall()
+        return SimpleNamespace(sessions=[SimpleNamespace(id=row[0]) for row in rows])
+
+    def get_session(self, app_name, user_id, session_id):
+        with sqlite3.connect(self.path) as conn:
+            row = conn.execute("SELECT state FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                               (app_name, user_id, session_id)).fetchone()
+        return SimpleNamespace(id=session_id, state=json.loads(row[0])) if row else None
+
+
+def session_store(tmp):
+    try:
+        from google.adk.sessions import DatabaseSessionService
+    except ImportError:
+        return SqliteSessionStore(Path(tmp) / "sessions.db"), "one-table SQLite stand-in"
+    return DatabaseSessionService(db_url=f"sqlite:///{Path(tmp) / 'sessions.db'}"), "DatabaseSessionService"
+
+
+def prepare(tmp, users, history_length, sessions):
+    user_profile_db.DB_FILE = history_store.DB_FILE = session_cache.DB_FILE = Path(tmp) / "user_profiles.db"
+    initialize_user_database()
+    # Registration is not what is measured; keep seeding hundreds of users quick.
+    passwords.SCRYPT_LOG2_N = 10
+    rng = random.Random(7)
+    for index in range(users):
+        username = f"Login User {index}"
+        profile = {"user_context": {"user_name": username, "personalInfo": {"age": 40, "sex": "M"},
+                                    "diagnosedConditions": ["Asthma"], "currentMedications": []}}
+        account_id = add_user(username, PASSWORD, profile)
+        history = [{"role": "user" if turn % 2 == 0 else "symptom_bot",
+                    "content": " ".join(rng.choice(["headache", "fever since Monday", "please advise", "rest well",
+                                                    "drink water", "see a doctor"]) for _ in range(12))}
+                   for turn in range(history_length)]
+        # Sessions from before account ids, stored under the name-derived user id.
+        user_id = session_cache.legacy_user_id(username)
+        session_id = f"session-{index}"
+        # The session as it looked before the history store: the whole history in state.
+        sessions.create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id,
+                                state=dict(profile, interaction_history=history))
+        history_store.append_entries(user_id, session_id, history)
+        session_cache.record_session(APP_NAME, account_id, user_id, session_id)
+
+
+def old_login(sessions, username):
+    profile, stored_hash = get_user(username)
+    assert profile and stored_hash
+    user_id = session_cache.legacy_user_id(username)
+    session_id = sessions.list_sessions(app_name=APP_NAME, user_id=user_id).sessions[0].id
+    sessions.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    return history_store.recent_entries(user_id, session_id, CHAT_HISTORY_LIMIT)
+
+
+def new_login(username):
+    resumed = session_cache.resume(APP_NAME, username, CHAT_HISTORY_LIMIT)
+    assert resumed and resumed["password_hash"]
+    return resumed["history"]
+
+
+def timed(usernames, login):
+    latencies = []
+    for username in usernames:
+        start = time.perf_counter()
+        history = login(username)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert len(history) == CHAT_HISTORY_LIMIT
+    latencies.sort()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--history", type=int, default=2000, help="history entries per user")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sessions, store_name = session_store(tmp)
+        prepare(tmp, args.users, args.history, sessions)
+        usernames = [f"Login User {index}" for index in range(args.users)]
+        random.Random(3).shuffle(usernames)
+
+        session_cache.clear_cache()
+        rows = [("get_user + list/get session", timed(usernames, lambda name: old_login(sessions, name))),
+                ("resume, cold cache", timed(usernames, new_login)),
+                ("resume, warm cache", timed(usernames, new_login))]
+        close_all_pools()
+
+    print(f"{args.users} users, {args.history} history entries each, {CHAT_HISTORY_LIMIT} shown on login; "
+          f"old sessions: {store_name}\n")
+    print(f"{'login path':<30} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name, latencies in rows:
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"{name:<30} {p50:>9.3f} {p95:>9.3f} {latencies[-1]:>9.3f}")
+    print(f"\nlogin cache: {session_cache.cache_stats['hits']} hits, {session_cache.cache_stats['misses']} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# my-health-agent/benchmarks/bench_profile_render.py
+"""Prompt bytes and render time of {user_context} per turn.
+
+Legacy: every agent template had `{user_context}`, and ADK filled it with
+str(profile dict) on each model call. Cached: profile_renderer's per-agent
+block, looked up by the profile version stamped into session state. faq_bot
+has no placeholder, so it renders nothing.
+
+A turn is timed as the orchestrator plus one sub-agent. Sub-agents rotate
+through the four, as the router would spread the turns.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_profile_render --turns 10000
+"""
+import argparse
+import re
+import time
+
+import profile_renderer
+from profile_renderer import cached_profile_block, render_profile, stamp_profile_version
+
+SUB_AGENTS = ["symptom_bot", "med_coach", "faq_bot", "appointment_agent"]
+LEGACY_PLACEHOLDER = re.compile(r"{+[^{}]*}+")
+TEMPLATE = "<user_context>\n{user_context}\n</user_context>"
+
+
+def sample_state():
+    return stamp_profile_version({
+        "user_context": {
+            "user_name": "Asha Raghunathan",
+            "personalInfo": {"age": 54, "sex": "F"},
+            "diagnosedConditions": ["Type 2 Diabetes", "Hypertension", "Hypothyroidism"],
+            "currentMedications": [
+                {"name": "Metformin", "dosage": "500 mg twice daily"},
+                {"name": "Amlodipine", "dosage": "5 mg once daily"},
+                {"name": "Levothyroxine", "dosage": "50 mcg before breakfast"},
+            ],
+        },
+    })
+
+
+def legacy_fill(template, state):
+    # What ADK's state injection did: one regex pass, str() of the value.
+    return LEGACY_PLACEHOLDER.sub(lambda m: str(state.get(m.group().strip("{}"), "")), template)
+
+
+def run(turns, render):
+    state = sample_state()
+    total_bytes = 0
+    start = time.perf_counter()
+    for turn in range(turns):
+        sub_agent = SUB_AGENTS[turn % len(SUB_AGENTS)]
+        for agent_name in ("arogya_mitra_orchestrator", sub_agent):
+            total_bytes += len(render(state, agent_name).encode("utf-8"))
+    return (time.perf_counter() - start) / turns * 1e6, total_bytes / turns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=10000)
+    args = parser.parse_args()
+
+    def legacy(state, agent_name):
+        return legacy_fill(TEMPLATE, state)
+
+    def uncached(state, agent_name):
+        if agent_name == "faq_bot":
+            return ""
+        return TEMPLATE.replace("{user_context}", render_profile(state["user_context"], agent_name))
+
+    def cached(state, agent_name):
+        if agent_name == "faq_bot":
+            return ""
+        return TEMPLATE.replace("{user_context}", cached_profile_block(state, agent_name))
+
+    profile_renderer.clear_cache()
+    rows = [("legacy str(dict)", *run(args.turns, legacy)),
+            ("per-agent, uncached", *run(args.turns, uncached)),
+            ("per-agent, cached", *run(args.turns, cached))]
+    base_us, base_bytes = rows[0][1], rows[0][2]
+
+    print(f"{args.turns} turns (orchestrator + one sub-agent each)\n")
+    print(f"{'mode':<22} {'us/turn':>9} {'bytes/turn':>11} {'saved bytes':>12} {'speedup':>8}")
+    for name, us, size in rows:
+        print(f"{name:<22} {us:>9.2f} {size:>11.0f} {base_bytes - size:>12.0f} {base_us / us:>7.1f}x")
+    print(f"\ncache: {profile_renderer.cache_stats['hits']} hits, {profile_renderer.cache_stats['misses']} misses")
+
+
+if __name__ == "__main__":
+    main()
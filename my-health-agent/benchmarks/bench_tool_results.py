@@ -0,0 +1,135 @@
+# my-health-agent/benchmarks/bench_tool_results.py
+"""Size and cost of the appointment tool results, json vs compact format.
+
+For a sample of find_doctors pages and view_my_appointments results, reports
+the bytes and estimated tokens (chars / 4, as the stub model counts them) of
+each format, the encoding time, and the prompt tokens the results add to a
+conversation that keeps them in its history for --turns later turns.
+
+With --harness the stub-model load test (benchmarks/bench_load.py) also
+runs once per format, with prefill latency proportional to the prompt size,
+and its summary lines are printed. It needs google-adk and faker; without
+them only the size and tool-time figures are reported.
+
+Run from the my-health-agent directory:
+    python -m benchmarks.bench_tool_results --doctors 20000
+    python -m benchmarks.bench_tool_results --harness --users 50
+"""
+import argparse
+import importlib.util
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from db.connection import close_all_pools, connection, transaction
+from orchestrator_agent.sub_agents.appointment_agent import database, results
+from orchestrator_agent.sub_agents.appointment_agent.bulk_load import LOCATIONS, SPECIALIZATIONS, load_doctors
+from orchestrator_agent.sub_agents.appointment_agent.doctor_cache import doctor_cache
+from benchmarks.bench_doctor_cache import doctor_rows
+
+FORMATS = ("json", "compact")
+PATIENTS = 50
+
+
+def add_appointments(rng, doctors):
+    with connection(database.DB_FILE) as conn, transaction(conn):
+        conn.executemany(
+            "INSERT INTO appointments (doctor_id, patient_name, appointment_date, appointment_time) VALUES (?, ?, ?, ?)",
+            [(rng.randint(1, doctors), f"Patient {index % PATIENTS}", f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+              f"{rng.randint(9, 16):02d}:{rng.choice(('00', '30'))}") for index in range(PATIENTS * 6)],
+        )
+
+
+def sample(fmt, searches):
+    results.RESULT_FORMAT = fmt
+    doctor_cache.clear()
+    timings, outputs = [], {"find_doctors": [], "view_my_appointments": []}
+    for specialization, location in searches:
+        start = time.perf_counter()
+        outputs["find_doctors"].append(database._find_doctors_in_db(specialization, location, "", False, "", False, 0, 0, ""))
+        timings.append(time.perf_counter() - start)
+    for index in range(PATIENTS):
+        outputs["view_my_appointments"].append(database.appointments_for_patient(None, f"Patient {index}"))
+    return outputs, sum(timings) / len(timings) * 1e6
+
+
+def missing_harness_modules():
+    missing = []
+    for module in ("google.adk", "faker"):
+        try:
+            found = importlib.util.find_spec(module) is not None
+        except ModuleNotFoundError:
+            found = False
+        if not found:
+            missing.append(module)
+    return missing
+
+
+def run_harness(args):
+    missing = missing_harness_modules()
+    if missing:
+        return print(f"\nstub-model harness skipped: {', '.join(missing)} not installed")
+    summaries = {}
+    for fmt in FORMATS:
+        env = dict(os.environ, AROGYA_TOOL_RESULT_FORMAT=fmt)
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_load", "--users", str(args.users), "--doctors", str(args.doctors),
+             "--model-ms", str(args.model_ms), "--prompt-ms-per-1k", str(args.prompt_ms_per_1k)],
+            env=env, capture_output=True, text=True,
+        )
+        if completed.returncode:
+            return print(f"\nbench_load failed ({fmt}):\n{completed.stderr[-2000:]}")
+        lines = completed.stdout.splitlines()
+        summaries[fmt] = [line for line in lines if line.startswith(("find ", "book ", "view ", "Model calls", f"{args.users} users"))]
+    for fmt, lines in summaries.items():
+        print(f"\nstub-model harness, {fmt} results "
+              f"({args.model_ms:.0f} ms per call + {args.prompt_ms_per_1k:.0f} ms per 1k prompt tokens):")
+        for line in lines:
+            print(f"  {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=20_000)
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=10, help="later turns that carry each result in their history")
+    parser.add_argument("--harness", action="store_true", help="also run bench_load once per format")
+    parser.add_argument("--users", type=int, default=50, help="bench_load users (--harness)")
+    parser.add_argument("--model-ms", type=float, default=200.0, help="bench_load stub latency (--harness)")
+    parser.add_argument("--prompt-ms-per-1k", type=float, default=20.0, help="bench_load prefill cost (--harness)")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    searches = [(rng.choice(SPECIALIZATIONS), rng.choice(LOCATIONS)) for _ in range(args.searches)]
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = Path(tmp) / "doctors.db"
+        with connection(database.DB_FILE) as conn:
+            database.create_tables(conn)
+            load_doctors(conn, doctor_rows(args.doctors, rng))
+        add_appointments(rng, args.doctors)
+        sample("json", searches)  # warm-up: pools, directory snapshot, page cache
+        measured = {fmt: sample(fmt, searches) for fmt in FORMATS}
+        close_all_pools()
+
+    print(f"{'tool':<22} {'format':<8} {'bytes':>7} {'tokens':>7} {f'x{args.turns} turns':>11}")
+    for tool in ("find_doctors", "view_my_appointments"):
+        for fmt in FORMATS:
+            outputs = measured[fmt][0][tool]
+            size = sum(len(output.encode()) for output in outputs) / len(outputs)
+            tokens = sum(len(output) // 4 for output in outputs) / len(outputs)
+            print(f"{tool:<22} {fmt:<8} {size:>7.0f} {tokens:>7.0f} {tokens * (args.turns + 1):>11.0f}")
+    for tool in ("find_doctors", "view_my_appointments"):
+        before, after = (sum(len(output) for output in measured[fmt][0][tool]) for fmt in FORMATS)
+        print(f"{tool}: compact is {1 - after / before:.0%} smaller")
+    print(f"\nfind_doctors uncached call: json {measured['json'][1]:.0f} us, compact {measured['compact'][1]:.0f} us")
+
+    if args.harness:
+        run_harness(args)
+
+
+if __name__ == "__main__":
+    main()
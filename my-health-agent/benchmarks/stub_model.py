@@ -0,0 +1,181 @@
+# my-health-agent/benchmarks/stub_model.py
+"""A deterministic stand-in for Gemini, for offline end-to-end benchmarks.
+
+StubLlm answers from the request alone, with no network: the orchestrator
+transfers to a sub-agent by keyword, the appointment agent calls its tools
+with arguments parsed from the user's message, and every other reply is
+canned text. Each call sleeps for a configurable latency, so the harness
+measures our own code (routing, tools, DB, session and history I/O) against
+a model that costs a fixed, known amount.
+"""
+import asyncio
+import json
+import random
+import re
+from typing import AsyncGenerator
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+ROUTES = (
+    ("appointment_agent", re.compile(r"\b(doctor|book|appointment|cardiologist|physician|specialist)\b", re.I)),
+    ("symptom_bot", re.compile(r"\b(pain|fever|headache|cough|hurt|symptom)\b", re.I)),
+    ("med_coach", re.compile(r"\b(calorie|diet|walk|exercise|breakfast)\b", re.I)),
+)
+_FIND = re.compile(r"find (?:an? )?(?P<specialization>[a-z ]+?) in (?P<location>[a-z ]+)", re.I)
+_BOOK = re.compile(r"book .*?(?P<date>\d{4}-\d{2}-\d{2}) at (?P<time>\d{1,2}:\d{2})", re.I)
+_USER_NAME = re.compile(r"^\s*Name: (?P<name>.+)$", re.M)
+
+# Totals over every StubLlm call, for reports: prompt tokens are estimated as chars / 4.
+usage_totals = {"calls": 0, "prompt_tokens": 0}
+
+
+def _text(content):
+    return "".join(part.text for part in (content.parts or []) if getattr(part, "text", None))
+
+
+def _prompt_text(content):
+    # What the model reads from a content: text plus function calls and their results.
+    text = []
+    for part in content.parts or []:
+        if getattr(part, "text", None):
+            text.append(part.text)
+        elif getattr(part, "function_call", None):
+            text.append(json.dumps(part.function_call.args or {}))
+        elif getattr(part, "function_response", None):
+            text.append(str((part.function_response.response or {}).get("result", part.function_response.response)))
+    return "".join(text)
+
+
+def _last_user_text(llm_request):
+    for content in reversed(llm_request.contents or []):
+        text = _text(content)
+        # ADK replays other agents' turns as user content prefixed "For context:".
+        if content.role == "user" and text and not text.startswith("For context:"):
+            return text
+    return ""
+
+
+def _function_responses(llm_request):
+    return [
+        part.function_response
+        for content in llm_request.contents or []
+        for part in content.parts or []
+        if getattr(part, "function_response", None)
+    ]
+
+
+def _call(name, **args):
+    return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))])
+
+
+def _reply(text):
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+class StubLlm(BaseLlm):
+    """Deterministic model for one agent; `latency_ms` (+/- `jitter_ms`) is slept per call."""
+
+    agent_name: str = ""
+    latency_ms: float = 200.0
+    jitter_ms: float = 0.0
+    stream_chunks: int = 8
+    # Prefill cost: extra latency per 1000 prompt tokens, so bigger prompts answer slower as with a real model.
+    prompt_ms_per_1k: float = 0.0
+
+    @classmethod
+    def supported_models(cls):
+        return [r"stub-.*"]
+
+    def _decide(self, llm_request: LlmRequest) -> types.Content:
+        last = (llm_request.contents or [None])[-1]
+        if last is not None and any(getattr(part, "function_response", None) for part in last.parts or []):
+            return self._after_tool(llm_request, last)
+
+        text = _last_user_text(llm_request)
+        if self.agent_name == "arogya_mitra_orchestrator":
+            for agent_name, pattern in ROUTES:
+                if pattern.search(text):
+                    return _call("transfer_to_agent", agent_name=agent_name)
+            return _call("transfer_to_agent", agent_name="faq_bot")
+
+        if self.agent_name == "appointment_agent":
+            return self._appointment(llm_request, text)
+        return _reply(f"[{self.agent_name}] Here is some general guidance about: {text[:80]}")
+
+    def _appointment(self, llm_request, text):
+        system = str(getattr(llm_request.config, "system_instruction", "") or "")
+        name_match = _USER_NAME.search(system)
+        patient_name = name_match.group("name") if name_match else "Load Test Patient"
+
+        find = _FIND.search(text)
+        if find:
+            return _call("find_doctors", specialization=find.group("specialization"), location=find.group("location"),
+                         preferred_date="", available_only=False, hospital="", hospital_only=False,
+                         max_fee=0, min_experience=0, cursor="")
+        book = _BOOK.search(text)
+        if book:
+            return _call("book_appointment", doctor_id=self._first_found_doctor(llm_request), patient_name=patient_name,
+                         date=book.group("date"), time=book.group("time"))
+        if "appointments" in text.lower():
+            return _call("view_my_appointments", patient_name=patient_name)
+        return _reply("Which specialization and city should I search in?")
+
+    @staticmethod
+    def _first_found_doctor(llm_request):
+        for response in reversed(_function_responses(llm_request)):
+            if response.name != "find_doctors":
+                continue
+            try:
+                data = json.loads((response.response or {}).get("result", "{}"))
+                # The compact format has rows under a header, the json format has doctor objects.
+                ids = [row[0] for row in data["rows"]] if "rows" in data else [d["id"] for d in data.get("doctors") or []]
+            except (AttributeError, KeyError, TypeError, ValueError):
+                continue
+            if ids:
+                return ids[0]
+        return 1
+
+    def _after_tool(self, llm_request, last):
+        response = next(part.function_response for part in last.parts if getattr(part, "function_response", None))
+        result = str((response.response or {}).get("result", response.response))
+        return _reply(f"[{self.agent_name}] {response.name} returned:\n{result[:500]}")
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        content = self._decide(llm_request)
+        prompt_chars = sum(len(_prompt_text(c)) for c in llm_request.contents or []) + len(
+            str(getattr(llm_request.config, "system_instruction", "") or "")
+        )
+        usage_totals["calls"] += 1
+        usage_totals["prompt_tokens"] += prompt_chars // 4
+        delay = max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+                    + prompt_chars / 4000 * self.prompt_ms_per_1k) / 1000
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_chars // 4,
+            candidates_token_count=len(_text(content)) // 4 + 1,
+            total_token_count=prompt_chars // 4 + len(_text(content)) // 4 + 1,
+        )
+
+        text = _text(content)
+        if stream and text:
+            # Spread the latency over the chunks, like a streamed reply.
+            step = max(1, len(text) // self.stream_chunks)
+            for start in range(0, len(text), step):
+                await asyncio.sleep(delay / self.stream_chunks)
+                yield LlmResponse(content=_reply(text[start:start + step]), partial=True)
+        else:
+            await asyncio.sleep(delay)
+        yield LlmResponse(content=content, usage_metadata=usage)
+
+
+def install_stub_models(root_agent, latency_ms=200.0, jitter_ms=0.0, prompt_ms_per_1k=0.0):
+    """Replaces the model of `root_agent` and every sub-agent with a StubLlm."""
+    agents = [root_agent]
+    while agents:
+        agent = agents.pop()
+        agent.model = StubLlm(model=f"stub-{agent.name}", agent_name=agent.name,
+                              latency_ms=latency_ms, jitter_ms=jitter_ms, prompt_ms_per_1k=prompt_ms_per_1k)
+        agents.extend(agent.sub_agents)
+    return root_agent
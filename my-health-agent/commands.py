@@ -0,0 +1,70 @@
+# commands.py
+"""Structured chat commands answered locally, without an LLM round trip."""
+import json
+import re
+
+from orchestrator_agent.sub_agents.appointment_agent.database import appointments_for_patient
+from orchestrator_agent.sub_agents.appointment_agent.results import APPOINTMENT_FIELDS
+
+VIEW_APPOINTMENTS = "view_my_appointments"
+
+# Whole-message patterns only: anything with extra intent ("... and book another")
+# still goes to the agents.
+COMMAND_PATTERNS = {
+    VIEW_APPOINTMENTS: re.compile(
+        r"^\s*(please\s+)?((view|show|list|see|display|check)\s+(me\s+)?|what\s+are\s+)?(all\s+)?my\s+"
+        r"(upcoming\s+)?appointments?(\s+please)?\s*[.!?]*\s*$",
+        re.IGNORECASE,
+    ),
+}
+
+# The agent that would otherwise have answered; used as the history role.
+COMMAND_AGENTS = {VIEW_APPOINTMENTS: "appointment_agent"}
+
+
+def match_command(query: str):
+    """Returns the command name if the whole message is a structured command, else None."""
+    for name, pattern in COMMAND_PATTERNS.items():
+        if pattern.match(query):
+            return name
+    return None
+
+
+def _format_fee(fee):
+    if isinstance(fee, float) and fee.is_integer():
+        return str(int(fee))
+    return str(fee)
+
+
+def render_appointments(result: str) -> str:
+    """Formats the view_my_appointments tool result the way appointment_agent is instructed to."""
+    try:
+        appointments = json.loads(result)
+    except (TypeError, ValueError):
+        # Plain-text results ("No appointments found ...", errors) are shown as-is.
+        return result
+    if isinstance(appointments, dict):
+        # The compact format: one array per appointment under a header.
+        appointments = [dict(zip(APPOINTMENT_FIELDS, row)) for row in appointments.get("rows", [])]
+
+    blocks = [
+        "\n".join([
+            f"- **Doctor:** {appointment.get('doctor_name', 'N/A')}",
+            f"- **Hospital:** {appointment.get('hospital', 'N/A')}",
+            f"- **Date:** {appointment.get('date', 'N/A')}",
+            f"- **Time:** {appointment.get('time', 'N/A')}",
+            f"- **Fee:** Rs. {_format_fee(appointment.get('consultation_fee', 'N/A'))}",
+        ])
+        for appointment in appointments
+    ]
+    return "Here are your appointments:\n\n" + "\n\n".join(blocks)
+
+
+def run_command(command: str, user_context: dict, account_id=None) -> str:
+    """Executes a matched command directly against the database and renders the reply."""
+    if command == VIEW_APPOINTMENTS:
+        patient_name = (user_context or {}).get("user_name")
+        if account_id is None and not patient_name:
+            return "I couldn't find your name in your profile, so I can't look up your appointments."
+        return render_appointments(appointments_for_patient(account_id, patient_name))
+    raise ValueError(f"Unknown command: {command}")
@@ -0,0 +1,128 @@
+# my-health-agent/db/connection.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Idle connections kept per database file. Extra connections are opened on demand
+# under bursts and closed again when they are returned to a full pool.
+POOL_SIZE = 8
+# Prepared statements cached per connection (sqlite3's default is 128).
+STATEMENT_CACHE_SIZE = 256
+MMAP_SIZE = 256 * 1024 * 1024
+BUSY_TIMEOUT_MS = 5000
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA mmap_size={MMAP_SIZE}",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class ConnectionPool:
+    """A small pool of configured SQLite connections for a single database file.
+
+    Connections are opened in autocommit mode (isolation_level=None); writes that
+    need atomicity use the `transaction()` helper below.
+    """
+
+    def __init__(self, db_file, size=POOL_SIZE):
+        self.db_file = str(db_file)
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_file,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._open()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Absolute paths as callers pass them -> pool, so the hot path skips Path.resolve().
+_pools_by_path = {}
+
+
+def get_pool(db_file) -> ConnectionPool:
+    """Returns the process-wide pool for a database file, creating it on first use."""
+    pool = _pools_by_path.get(db_file)
+    if pool is not None:
+        return pool
+    key = str(Path(db_file).resolve())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(key)
+        # Relative paths depend on the working directory and are resolved every time.
+        if os.path.isabs(db_file):
+            _pools_by_path[db_file] = pool
+        return pool
+
+
+@contextmanager
+def connection(db_file):
+    """Borrows a pooled connection to `db_file` for the duration of the block."""
+    with get_pool(db_file).connection() as conn:
+        yield conn
+
+
+@contextmanager
+def transaction(conn, mode="DEFERRED"):
+    """Runs the block inside BEGIN <mode> ... COMMIT, rolling back on any exception."""
+    conn.execute(f"BEGIN {mode}")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
@@ -0,0 +1,64 @@
+# my-health-agent/db/executor.py
+import asyncio
+import functools
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+
+# Threads dedicated to blocking sqlite3 work, so DB tools never run on the event loop.
+DB_MAX_WORKERS = int(os.getenv("AROGYA_DB_WORKERS", "8"))
+# Maximum DB calls in flight per event loop; extra callers wait without holding a thread.
+DB_MAX_CONCURRENCY = int(os.getenv("AROGYA_DB_CONCURRENCY", str(DB_MAX_WORKERS * 4)))
+
+_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="arogya-db")
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(DB_MAX_CONCURRENCY)
+    return semaphore
+
+
+async def run_in_db_executor(func, *args, **kwargs):
+    """Runs a blocking DB function on the DB thread pool with bounded concurrency."""
+    with tracing.span("db", getattr(func, "__name__", None)) as span:
+        requested = time.perf_counter()
+        async with _semaphore():
+            acquired = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            if not tracing.TRACE_ENABLED:
+                return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+            started = []
+
+            def timed():
+                started.append(time.perf_counter())
+                return func(*args, **kwargs)
+
+            try:
+                return await loop.run_in_executor(_executor, timed)
+            finally:
+                # Time spent waiting for a concurrency slot and then for a free thread.
+                span.set(
+                    semaphore_wait_ms=round((acquired - requested) * 1000, 3),
+                    queue_wait_ms=round(((started[0] if started else time.perf_counter()) - acquired) * 1000, 3),
+                )
+
+
+def async_db_tool(func):
+    """Wraps a blocking DB tool function in a coroutine function.
+
+    functools.wraps keeps the name, signature and docstring, so the ADK
+    FunctionTool declaration the model sees is unchanged.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with tracing.span("tool", func.__name__):
+            return await run_in_db_executor(func, *args, **kwargs)
+    return wrapper
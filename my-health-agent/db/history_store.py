@@ -0,0 +1,152 @@
+# my-health-agent/db/history_store.py
+import sqlite3
+import time
+from pathlib import Path
+
+from db import session_cache
+from db.connection import connection, transaction
+from history_manager import WINDOW_SIZE, fold_into_summary
+
+# Kept next to the user profiles so a login and its history share one database.
+DB_FILE = Path(__file__).parent / "user_profiles.db"
+
+
+def create_history_tables(conn):
+    """Create the append-only interaction history and its rolling summary table."""
+    try:
+        # Keyed by (user_id, session_id, seq): appends and windowed reads are both
+        # seeks on the primary key, independent of how long the session is.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS interaction_history (
+                user_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (user_id, session_id, seq)
+            ) WITHOUT ROWID;
+        """)
+        # Entries up to summarized_seq have been folded into summary.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS interaction_summaries (
+                user_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                summary TEXT NOT NULL DEFAULT '',
+                summarized_seq INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, session_id)
+            ) WITHOUT ROWID;
+        """)
+    except sqlite3.Error as e:
+        print(f"Error creating interaction history tables: {e}")
+
+
+def _append(conn, user_id, session_id, entries, window_size):
+    last_seq = conn.execute(
+        "SELECT COALESCE(MAX(seq), 0) FROM interaction_history WHERE user_id = ? AND session_id = ?",
+        (user_id, session_id),
+    ).fetchone()[0]
+    now = time.time()
+    conn.executemany(
+        "INSERT INTO interaction_history (user_id, session_id, seq, role, content, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (user_id, session_id, last_seq + offset, entry.get("role", "system"), str(entry.get("content", "")), now)
+            for offset, entry in enumerate(entries, 1)
+        ],
+    )
+    last_seq += len(entries)
+
+    # Fold the entries that just left the window into the rolling summary.
+    row = conn.execute(
+        "SELECT summary, summarized_seq FROM interaction_summaries WHERE user_id = ? AND session_id = ?",
+        (user_id, session_id),
+    ).fetchone()
+    summary, summarized_seq = row if row else ("", 0)
+    window_start = last_seq - window_size
+    if window_start > summarized_seq:
+        evicted = conn.execute(
+            "SELECT role, content FROM interaction_history "
+            "WHERE user_id = ? AND session_id = ? AND seq > ? AND seq <= ? ORDER BY seq",
+            (user_id, session_id, summarized_seq, window_start),
+        ).fetchall()
+        summary = fold_into_summary(summary, [{"role": role, "content": content} for role, content in evicted])
+        conn.execute(
+            "INSERT OR REPLACE INTO interaction_summaries (user_id, session_id, summary, summarized_seq) VALUES (?, ?, ?, ?)",
+            (user_id, session_id, summary, window_start),
+        )
+    return last_seq
+
+
+def append_entries(user_id, session_id, entries, window_size=WINDOW_SIZE):
+    """Appends history entries ({"role", "content"} dicts) and returns the last sequence number."""
+    if not entries:
+        return None
+    try:
+        with connection(DB_FILE) as conn, transaction(conn, "IMMEDIATE"):
+            last_seq = _append(conn, user_id, session_id, entries, window_size)
+    except sqlite3.Error as e:
+        print(f"Error appending interaction history: {e}")
+        return None
+    session_cache.note_history(user_id, session_id, entries)
+    return last_seq
+
+
+def recent_entries(user_id, session_id, limit=WINDOW_SIZE):
+    """Returns the newest `limit` entries in chronological order."""
+    try:
+        with connection(DB_FILE) as conn:
+            rows = conn.execute(
+                "SELECT role, content FROM interaction_history WHERE user_id = ? AND session_id = ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (user_id, session_id, limit),
+            ).fetchall()
+    except sqlite3.Error as e:
+        print(f"Error reading interaction history: {e}")
+        return []
+    return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+
+def load_window(user_id, session_id, window_size=WINDOW_SIZE):
+    """Returns (recent entries, rolling summary) for prompt rendering in a single connection checkout."""
+    try:
+        with connection(DB_FILE) as conn:
+            rows = conn.execute(
+                "SELECT role, content FROM interaction_history WHERE user_id = ? AND session_id = ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (user_id, session_id, window_size),
+            ).fetchall()
+            summary_row = conn.execute(
+                "SELECT summary FROM interaction_summaries WHERE user_id = ? AND session_id = ?",
+                (user_id, session_id),
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Error reading interaction history: {e}")
+        return [], ""
+    entries = [{"role": role, "content": content} for role, content in reversed(rows)]
+    return entries, summary_row[0] if summary_row else ""
+
+
+def import_legacy_history(user_id, session_id, state, window_size=WINDOW_SIZE):
+    """Copies an `interaction_history` list kept in old session state into the store, once."""
+    legacy = [entry for entry in (state or {}).get("interaction_history") or [] if isinstance(entry, dict)]
+    if not legacy:
+        return 0
+    try:
+        with connection(DB_FILE) as conn, transaction(conn, "IMMEDIATE"):
+            exists = conn.execute(
+                "SELECT 1 FROM interaction_history WHERE user_id = ? AND session_id = ? LIMIT 1",
+                (user_id, session_id),
+            ).fetchone()
+            if exists:
+                return 0
+            summary = (state or {}).get("interaction_summary")
+            if summary:
+                conn.execute(
+                    "INSERT OR REPLACE INTO interaction_summaries (user_id, session_id, summary, summarized_seq) VALUES (?, ?, ?, 0)",
+                    (user_id, session_id, summary),
+                )
+            _append(conn, user_id, session_id, legacy, window_size)
+    except sqlite3.Error as e:
+        print(f"Error importing interaction history: {e}")
+        return 0
+    return len(legacy)
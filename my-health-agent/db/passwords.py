@@ -0,0 +1,209 @@
+# my-health-agent/db/passwords.py
+"""Password hashing and login checks.
+
+Hashes are salted scrypt, stored as
+    scrypt$<log2 n>$<r>$<p>$<salt hex>$<key hex>
+so the cost can be raised later: needs_rehash() flags hashes made with other
+parameters and unsalted legacy SHA-256 hex digests, and the login path
+rewrites them after a successful check.
+
+A single scrypt check costs tens of milliseconds of CPU by design. Three
+things keep logins cheap:
+  * a short-lived cache of successful verifications, keyed by stored hash
+    and holding an HMAC of the password under a per-process random key, so
+    re-logins skip the KDF;
+  * a dedicated thread pool (hashlib releases the GIL while hashing), so
+    async callers never run the KDF on the event loop;
+  * per-user throttling, so a storm of wrong guesses for one account stops
+    costing KDF work after MAX_FAILED_LOGINS.
+"""
+import asyncio
+import functools
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+# scrypt cost: n = 2**SCRYPT_LOG2_N, memory is about 128 * r * n bytes (32 MiB at the defaults).
+SCRYPT_LOG2_N = int(os.getenv("AROGYA_SCRYPT_LOG2_N", "15"))
+SCRYPT_R = int(os.getenv("AROGYA_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("AROGYA_SCRYPT_P", "1"))
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# Threads for KDF work; more than one per core only adds memory.
+KDF_WORKERS = int(os.getenv("AROGYA_KDF_WORKERS", str(os.cpu_count() or 1)))
+
+VERIFY_CACHE_TTL_S = 15 * 60
+VERIFY_CACHE_SIZE = 1024
+
+# Failed logins allowed per user within the window before further attempts are refused.
+MAX_FAILED_LOGINS = 5
+FAILED_LOGIN_WINDOW_S = 5 * 60
+
+_kdf_executor = ThreadPoolExecutor(max_workers=KDF_WORKERS, thread_name_prefix="arogya-kdf")
+
+
+def _scrypt(password: str, salt: bytes, log2_n: int, r: int, p: int) -> bytes:
+    n = 1 << log2_n
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * r * n, dklen=KEY_BYTES)
+
+
+def hash_password(password: str) -> str:
+    """Hashes a password with salted scrypt at the configured cost."""
+    salt = secrets.token_bytes(SALT_BYTES)
+    key = _scrypt(password, salt, SCRYPT_LOG2_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_LOG2_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${key.hex()}"
+
+
+def _is_legacy(stored_hash: str) -> bool:
+    return len(stored_hash) == 64 and "$" not in stored_hash
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """True for legacy SHA-256 hashes and scrypt hashes made with other cost parameters."""
+    return not stored_hash.startswith(f"scrypt${SCRYPT_LOG2_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+def _check(stored_hash: str, password: str) -> bool:
+    if _is_legacy(stored_hash):
+        return hmac.compare_digest(stored_hash, hashlib.sha256(password.encode()).hexdigest())
+    try:
+        scheme, log2_n, r, p, salt_hex, key_hex = stored_hash.split("$")
+        if scheme != "scrypt":
+            return False
+        key = _scrypt(password, bytes.fromhex(salt_hex), int(log2_n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(key, bytes.fromhex(key_hex))
+
+
+class _VerificationCache:
+    """Remembers recent successful verifications without keeping the passwords themselves."""
+
+    def __init__(self, ttl_s, size):
+        self.ttl_s = ttl_s
+        self.size = size
+        self._key = secrets.token_bytes(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tag(self, stored_hash, password):
+        return hmac.new(self._key, f"{stored_hash}\0{password}".encode(), hashlib.sha256).digest()
+
+    def hit(self, stored_hash, password) -> bool:
+        with self._lock:
+            entry = self._entries.get(stored_hash)
+            if entry is None:
+                return False
+            tag, expires = entry
+            if expires < time.monotonic():
+                del self._entries[stored_hash]
+                return False
+        return hmac.compare_digest(tag, self._tag(stored_hash, password))
+
+    def add(self, stored_hash, password):
+        tag = self._tag(stored_hash, password)
+        with self._lock:
+            self._entries[stored_hash] = (tag, time.monotonic() + self.ttl_s)
+            self._entries.move_to_end(stored_hash)
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+verification_cache = _VerificationCache(VERIFY_CACHE_TTL_S, VERIFY_CACHE_SIZE)
+
+
+def verify_password(stored_hash: str, provided_password: str) -> bool:
+    """Verifies a provided password against a stored scrypt or legacy SHA-256 hash."""
+    if not stored_hash:
+        return False
+    if verification_cache.hit(stored_hash, provided_password):
+        return True
+    ok = _check(stored_hash, provided_password)
+    if ok:
+        verification_cache.add(stored_hash, provided_password)
+    return ok
+
+
+async def run_in_kdf_executor(func, *args, **kwargs):
+    """Runs a password check (or anything else that hashes) on the KDF thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_kdf_executor, functools.partial(func, *args, **kwargs))
+
+
+class LoginThrottle:
+    """Counts failed logins per user in a sliding window; usernames are compared case-insensitively.
+
+    Past max_users, users whose failures have all left the window are
+    forgotten. A user with a failure still in the window is never dropped,
+    so flooding the table with throwaway names cannot reset a lockout; the
+    table then grows until those failures expire.
+    """
+
+    def __init__(self, max_failures=MAX_FAILED_LOGINS, window_s=FAILED_LOGIN_WINDOW_S, max_users=10_000):
+        self.max_failures = max_failures
+        self.window_s = window_s
+        self.max_users = max_users
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _retry_after(self, failures, now) -> float:
+        while failures and failures[0] <= now - self.window_s:
+            failures.popleft()
+        if len(failures) < self.max_failures:
+            return 0.0
+        return failures[0] + self.window_s - now
+
+    def retry_after(self, username) -> float:
+        """Seconds until `username` may try again; 0 if a login attempt is allowed now."""
+        now = time.monotonic()
+        with self._lock:
+            failures = self._failures.get(username.lower())
+            return self._retry_after(failures, now) if failures else 0.0
+
+    def reserve(self, username) -> bool:
+        """Claims a login attempt for `username`, or returns False while the user is throttled.
+
+        The attempt is counted as a failure at once, under the same lock as
+        the check, so concurrent guesses cannot all pass the check before any
+        failure is recorded. record(username, True) clears it on success.
+        """
+        username = username.lower()
+        now = time.monotonic()
+        with self._lock:
+            failures = self._failures.setdefault(username, deque(maxlen=self.max_failures))
+            if self._retry_after(failures, now):
+                return False
+            self._add_failure(username, failures, now)
+            return True
+
+    def _add_failure(self, username, failures, now):
+        failures.append(now)
+        self._failures.move_to_end(username)
+        # Entries are in order of their latest failure, so the expired ones are at the front.
+        while len(self._failures) > self.max_users:
+            oldest = next(iter(self._failures.values()))
+            if oldest and oldest[-1] > now - self.window_s:
+                break
+            self._failures.popitem(last=False)
+
+    def record(self, username, success):
+        username = username.lower()
+        with self._lock:
+            if success:
+                self._failures.pop(username, None)
+                return
+            failures = self._failures.setdefault(username, deque(maxlen=self.max_failures))
+            self._add_failure(username, failures, time.monotonic())
+
+
+login_throttle = LoginThrottle()
@@ -0,0 +1,217 @@
+# my-health-agent/db/session_cache.py
+"""Login-time cache: profile, password hash, latest session id and recent history per user.
+
+Accounts are identified by users.id. New sessions live under the ADK user id
+str(users.id), and the account id is stored in their state under
+ACCOUNT_ID_KEY. Sessions created before that keep the name-derived id
+(legacy_user_id) under which ADK stored them; user_sessions records which
+ADK user id each session lives under.
+
+`resume()` answers a login with a single SQL statement over users,
+user_sessions and interaction_history. It does not go through ADK's
+list_sessions/get_session, which load whole session states. The result is
+kept in a bounded in-process LRU. Every write that changes an entry keeps the
+cache in step:
+  * add_user / update_user_profile drop the user's entries;
+  * record_session drops the account's entries, since the session changed;
+  * history_store.append_entries appends the new entries to the cached history.
+Other processes writing the same database are not seen until the entry is evicted.
+"""
+import copy
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from db.connection import connection, transaction
+from profile_renderer import PROFILE_VERSION_KEY, stamp_profile_version
+
+# Same database as the users and their interaction history.
+DB_FILE = Path(__file__).parent / "user_profiles.db"
+
+CACHE_SIZE = 512
+RESUME_HISTORY_LIMIT = 50
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+cache_stats = {"hits": 0, "misses": 0}
+
+
+# Session state key holding the users.id of the session's owner.
+ACCOUNT_ID_KEY = "account_id"
+
+
+def legacy_user_id(username: str) -> str:
+    """The name-derived ADK user id used before sessions were keyed by users.id."""
+    return re.sub(r'\W+', '_', username).lower()
+
+
+def legacy_user_id_accounts(user_id):
+    """The ids of the accounts whose usernames map to legacy ADK user id `user_id`.
+
+    The mapping is not one-to-one: "bob.smith" and "bob_smith" are both "bob_smith".
+    """
+    try:
+        with connection(DB_FILE) as conn:
+            rows = conn.execute("SELECT id, username FROM users").fetchall()
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return []
+    return [account_id for account_id, username in rows if legacy_user_id(username) == user_id]
+
+
+def create_session_tables(conn):
+    """Create the table recording each account's latest session per app."""
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(user_sessions)")}
+        if columns and "account_id" not in columns:
+            _migrate_name_keyed_sessions(conn)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_sessions (
+                app_name TEXT NOT NULL,
+                account_id INTEGER NOT NULL,
+                user_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (app_name, account_id)
+            ) WITHOUT ROWID;
+        """)
+    except sqlite3.Error as e:
+        print(f"Error creating user sessions table: {e}")
+
+
+def _migrate_name_keyed_sessions(conn):
+    # The first layout was keyed by the name-derived user id; map each row to its account.
+    accounts = {legacy_user_id(username): account_id for account_id, username in conn.execute("SELECT id, username FROM users")}
+    rows = conn.execute("SELECT app_name, user_id, session_id, updated_at FROM user_sessions").fetchall()
+    with transaction(conn, "IMMEDIATE"):
+        conn.execute("DROP TABLE user_sessions")
+        conn.execute("""
+            CREATE TABLE user_sessions (
+                app_name TEXT NOT NULL,
+                account_id INTEGER NOT NULL,
+                user_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (app_name, account_id)
+            ) WITHOUT ROWID;
+        """)
+        conn.executemany(
+            "INSERT OR REPLACE INTO user_sessions (app_name, account_id, user_id, session_id, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(app_name, accounts[user_id], user_id, session_id, updated_at)
+             for app_name, user_id, session_id, updated_at in rows if user_id in accounts],
+        )
+
+
+def record_session(app_name, account_id, user_id, session_id):
+    """Marks `session_id`, stored by ADK under `user_id`, as the session a login of the account resumes."""
+    try:
+        with connection(DB_FILE) as conn, transaction(conn):
+            conn.execute(
+                "INSERT OR REPLACE INTO user_sessions (app_name, account_id, user_id, session_id, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (app_name, account_id, user_id, session_id, time.time()),
+            )
+    except sqlite3.Error as e:
+        print(f"Error recording session: {e}")
+    invalidate_user(account_id)
+
+
+def _load(app_name, username, history_limit):
+    try:
+        with connection(DB_FILE) as conn:
+            row = conn.execute(
+                """
+                SELECT u.id, u.username, u.profile_json, u.password_hash, s.user_id, s.session_id,
+                       (SELECT json_group_array(json_array(role, content)) FROM (
+                            SELECT role, content FROM interaction_history h
+                            WHERE h.user_id = s.user_id AND h.session_id = s.session_id
+                            ORDER BY seq DESC LIMIT ?))
+                FROM users u
+                LEFT JOIN user_sessions s ON s.app_name = ? AND s.account_id = u.id
+                WHERE u.username = ? COLLATE NOCASE
+                ORDER BY u.id LIMIT 1
+                """,
+                (history_limit, app_name, username),
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return None
+    if row is None:
+        return None
+    account_id, stored_username, profile_json, password_hash, user_id, session_id, history_json = row
+    profile = json.loads(profile_json)
+    if PROFILE_VERSION_KEY not in profile:
+        stamp_profile_version(profile)  # saved before profiles were versioned
+    history = [{"role": role, "content": content} for role, content in reversed(json.loads(history_json or "[]"))]
+    return {
+        "account_id": account_id,
+        "username": stored_username,
+        # New sessions are created under the account id.
+        "user_id": user_id or str(account_id),
+        "profile": profile,
+        "password_hash": password_hash,
+        "session_id": session_id,
+        "history": history,
+        "history_limit": history_limit,
+    }
+
+
+def resume(app_name, username, history_limit=RESUME_HISTORY_LIMIT):
+    """Returns {"account_id", "username", "user_id", "profile", "password_hash", "session_id", "history", ...}.
+
+    Returns None for an unknown user. Usernames match case-insensitively, and
+    "username" is the spelling stored at registration. `user_id` is the ADK
+    user id of the session. `session_id` is None when the account has no
+    recorded session yet. The caller owns the returned profile and history and
+    may modify them.
+    """
+    key = (app_name, username.lower())
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry["history_limit"] >= history_limit:
+            _cache.move_to_end(key)
+            cache_stats["hits"] += 1
+            return _copy(entry, history_limit)
+        cache_stats["misses"] += 1
+
+    entry = _load(app_name, username, history_limit)
+    if entry is None:
+        return None
+    with _cache_lock:
+        _cache[key] = entry
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return _copy(entry, history_limit)
+
+
+def _copy(entry, history_limit):
+    history = entry["history"]
+    return dict(entry, profile=copy.deepcopy(entry["profile"]), history=history[max(0, len(history) - history_limit):])
+
+
+def invalidate_user(account_id):
+    """Drops every cached entry for the account; call after its profile or password hash changes."""
+    with _cache_lock:
+        for key in [key for key, entry in _cache.items() if entry["account_id"] == account_id]:
+            del _cache[key]
+
+
+def note_history(user_id, session_id, entries):
+    """Write-through for history appends: extends the cached history of `session_id`, if cached."""
+    with _cache_lock:
+        for entry in _cache.values():
+            if entry["user_id"] == user_id and entry["session_id"] == session_id:
+                history = entry["history"] + [
+                    {"role": item.get("role", "system"), "content": str(item.get("content", ""))} for item in entries
+                ]
+                entry["history"] = history[max(0, len(history) - entry["history_limit"]):]
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+        cache_stats.update(hits=0, misses=0)
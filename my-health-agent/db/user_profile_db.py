@@ -1,35 +1,57 @@
 # my-health-agent/db/user_profile_db.py
 import sqlite3
 import json
-import hashlib
 import random
 from pathlib import Path
 
+from db.connection import connection, transaction
+from db.history_store import create_history_tables
+from db.passwords import hash_password, login_throttle, needs_rehash, run_in_kdf_executor, verify_password
+from db.session_cache import create_session_tables, invalidate_user
+from profile_renderer import PROFILE_VERSION_KEY, stamp_profile_version
+
 # Place this database in the project's root `db` directory
 DB_FILE = Path(__file__).parent / "user_profiles.db"
 
-def create_connection():
-    """Create a database connection to the SQLite database."""
-    conn = None
-    try:
-        conn = sqlite3.connect(DB_FILE, check_same_thread=False)
-    except sqlite3.Error as e:
-        print(e)
-    return conn
+def _account_id(conn, username):
+    row = conn.execute("SELECT id FROM users WHERE username = ? COLLATE NOCASE ORDER BY id LIMIT 1", (username,)).fetchone()
+    return row[0] if row else None
 
-def hash_password(password: str) -> str:
-    """Hashes a password using SHA-256 for secure storage."""
-    return hashlib.sha256(password.encode()).hexdigest()
+def verify_login(username, stored_hash, password) -> bool:
+    """Checks a login attempt for `username` against its stored hash.
 
-def verify_password(stored_hash: str, provided_password: str) -> bool:
-    """Verifies a provided password against a stored hash."""
-    return stored_hash == hash_password(provided_password)
+    Refused without hashing while the user is throttled (see
+    passwords.login_throttle); the attempt is reserved before hashing, so
+    parallel guesses on the KDF threads cannot exceed the limit. A successful
+    check of a legacy or outdated hash stores a fresh one.
+    """
+    if not login_throttle.reserve(username):
+        return False
+    ok = verify_password(stored_hash, password)
+    if ok:
+        login_throttle.record(username, True)
+    if ok and needs_rehash(stored_hash):
+        _store_password_hash(username, hash_password(password))
+    return ok
+
+async def verify_login_async(username, stored_hash, password) -> bool:
+    """verify_login on the KDF thread pool, for callers running on an event loop."""
+    return await run_in_kdf_executor(verify_login, username, stored_hash, password)
+
+def _store_password_hash(username, password_hash):
+    try:
+        with connection(DB_FILE) as conn, transaction(conn):
+            account_id = _account_id(conn, username)
+            conn.execute("UPDATE users SET password_hash = ? WHERE id = ?", (password_hash, account_id))
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return
+    invalidate_user(account_id)
 
 def create_user_table(conn):
     """Create the users table if it doesn't exist."""
     try:
-        cursor = conn.cursor()
-        cursor.execute("""
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS users (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT UNIQUE NOT NULL,
@@ -37,58 +59,84 @@ def create_user_table(conn):
                 profile_json TEXT NOT NULL
             );
         """)
-        conn.commit()
     except sqlite3.Error as e:
         print(f"Error creating user table: {e}")
+        return
+    # Usernames are matched case-insensitively, so "Asha Rao" and "asha rao" are one account.
+    try:
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username_nocase ON users (username COLLATE NOCASE)")
+    except sqlite3.IntegrityError:
+        # Accounts registered before this index that differ only in case: keep them
+        # reachable, resolved to the oldest, and tell the operator.
+        print("Warning: some usernames differ only in case; they are resolved to the oldest account.")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_users_username_nocase_dup ON users (username COLLATE NOCASE, id)")
 
-def add_user(username, password, profile_data) -> bool:
-    """Adds a new user to the database with a hashed password."""
-    conn = create_connection()
-    if not conn: return False
-    
+def add_user(username, password, profile_data):
+    """Adds a new user to the database with a hashed password; returns the new account id, or None."""
     hashed_pass = hash_password(password)
-    profile_str = json.dumps(profile_data)
+    profile_str = json.dumps(stamp_profile_version(profile_data))
     
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO users (username, password_hash, profile_json) VALUES (?, ?, ?)",
-            (username, hashed_pass, profile_str)
-        )
-        conn.commit()
-        return True
+        with connection(DB_FILE) as conn, transaction(conn):
+            if _account_id(conn, username) is not None:
+                # Also catches names that only differ in case when the unique index could not be built.
+                raise sqlite3.IntegrityError("username taken")
+            account_id = conn.execute(
+                "INSERT INTO users (username, password_hash, profile_json) VALUES (?, ?, ?)",
+                (username, hashed_pass, profile_str)
+            ).lastrowid
+        invalidate_user(account_id)
+        return account_id
     except sqlite3.IntegrityError:
         # This error occurs if the username is already taken
         print(f"Error: Username '{username}' already exists.")
-        return False
+        return None
     except sqlite3.Error as e:
         print(f"Database error: {e}")
-        return False
-    finally:
-        conn.close()
+        return None
 
 def get_user(username: str):
     """Retrieves a user's profile and hashed password from the database."""
-    conn = create_connection()
-    if not conn: return None, None
-
-    cursor = conn.cursor()
-    cursor.execute("SELECT profile_json, password_hash FROM users WHERE username = ?", (username,))
-    row = cursor.fetchone()
-    conn.close()
+    try:
+        with connection(DB_FILE) as conn:
+            row = conn.execute(
+                "SELECT profile_json, password_hash FROM users WHERE username = ? COLLATE NOCASE ORDER BY id LIMIT 1",
+                (username,)
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return None, None
 
     if row:
         profile_data = json.loads(row[0])
+        if PROFILE_VERSION_KEY not in profile_data:
+            stamp_profile_version(profile_data)  # saved before profiles were versioned
         password_hash = row[1]
         return profile_data, password_hash
     
     return None, None
 
+def update_user_profile(username, profile_data) -> bool:
+    """Replaces a user's stored profile; cached logins see the new profile on their next resume."""
+    profile_str = json.dumps(stamp_profile_version(profile_data))
+    try:
+        with connection(DB_FILE) as conn, transaction(conn):
+            account_id = _account_id(conn, username)
+            conn.execute("UPDATE users SET profile_json = ? WHERE id = ?", (profile_str, account_id))
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return False
+    invalidate_user(account_id)
+    return account_id is not None
+
 def initialize_user_database():
     """Initializes the user database and creates the necessary table."""
     print("Initializing user profile database...")
-    conn = create_connection()
-    if conn:
-        create_user_table(conn)
-        conn.close()
-        print("User profile database is ready.")
\ No newline at end of file
+    try:
+        with connection(DB_FILE) as conn:
+            create_user_table(conn)
+            create_history_tables(conn)
+            create_session_tables(conn)
+        print("User profile database is ready.")
+    except sqlite3.Error as e:
+        print(f"Error! cannot create the database connection: {e}")
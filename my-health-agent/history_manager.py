@@ -0,0 +1,88 @@
+# history_manager.py
+"""Keeps the interaction history that is injected into agent prompts bounded.
+
+The prompt sees two things:
+  * a sliding window of the most recent entries, and
+  * a rolling, compressed digest of the entries that fell out of the window.
+
+Both are kept by db/history_store.py. Each agent renders them into its prompt
+under its own byte budget, so prompt size stays flat no matter how long the
+conversation gets.
+"""
+
+# Number of most recent entries (user messages and agent replies) kept verbatim.
+WINDOW_SIZE = 12
+# Upper bound for the rolling summary of older turns.
+SUMMARY_MAX_CHARS = 1500
+# Each evicted entry is compressed to a single line of at most this many characters.
+SUMMARY_LINE_CHARS = 90
+SUMMARY_TRUNCATED_MARKER = "[earlier turns omitted]"
+
+# Prompt budget (UTF-8 bytes, roughly 4 bytes per token) for the rendered history per agent.
+DEFAULT_BUDGET_BYTES = 3000
+AGENT_BUDGET_BYTES = {
+    "arogya_mitra_orchestrator": 1500,
+    "symptom_bot": 4000,
+    "med_coach": 3000,
+    "faq_bot": 1000,
+    "appointment_agent": 3000,
+}
+ENTRY_MAX_CHARS = 600
+
+
+def _one_line(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    if len(text) > limit:
+        text = text[: limit - 3].rstrip() + "..."
+    return text
+
+
+def _compress_entry(entry) -> str:
+    role = entry.get("role", "system")
+    return _one_line(f"{role}: {entry.get('content', '')}", SUMMARY_LINE_CHARS)
+
+
+def fold_into_summary(summary: str, entries) -> str:
+    """Appends compressed lines for `entries` to the summary, dropping the oldest lines past the limit."""
+    lines = [line for line in (summary or "").split("\n") if line and line != SUMMARY_TRUNCATED_MARKER]
+    lines.extend(_compress_entry(entry) for entry in entries)
+
+    truncated = bool(summary) and summary.startswith(SUMMARY_TRUNCATED_MARKER)
+    while lines and sum(len(line) + 1 for line in lines) > SUMMARY_MAX_CHARS:
+        lines.pop(0)
+        truncated = True
+    if truncated:
+        lines.insert(0, SUMMARY_TRUNCATED_MARKER)
+    return "\n".join(lines)
+
+
+def render_history(history, summary="", agent_name=None, budget_bytes=None) -> str:
+    """Renders the summary and the newest entries that fit into the agent's byte budget."""
+    if budget_bytes is None:
+        budget_bytes = AGENT_BUDGET_BYTES.get(agent_name, DEFAULT_BUDGET_BYTES)
+    summary = summary or ""
+    history = history or []
+
+    recent = []
+    used = 0
+    for entry in reversed(history):
+        line = f"{entry.get('role', 'system')}: {_one_line(entry.get('content', ''), ENTRY_MAX_CHARS)}"
+        size = len(line.encode("utf-8")) + 1
+        if used + size > budget_bytes:
+            break
+        recent.append(line)
+        used += size
+    recent.reverse()
+
+    parts = []
+    remaining = budget_bytes - used
+    if summary and remaining > 0:
+        encoded = summary.encode("utf-8")
+        if len(encoded) > remaining:
+            # Keep the newest part of the summary.
+            summary = encoded[-remaining:].decode("utf-8", errors="ignore").split("\n", 1)[-1]
+        if summary:
+            parts.append(f"Summary of earlier conversation:\n{summary}")
+    if recent:
+        parts.append("Recent turns:\n" + "\n".join(recent))
+    return "\n\n".join(parts) if parts else "No previous interactions."
@@ -1,20 +1,23 @@
+from startup_profile import profiler
+
 import asyncio
 import uuid
-import re
 import random
 import getpass
 
-from db.user_profile_db import (
-    initialize_user_database, add_user, get_user, verify_password
-)
+from db.user_profile_db import initialize_user_database, add_user, verify_login
+from db.passwords import login_throttle
 
-from orchestrator_agent.agent import root_agent as orchestrator_agent
 from orchestrator_agent.sub_agents.appointment_agent.database import initialize_database
 
 from dotenv import load_dotenv
-from google.adk.runners import Runner
-from google.adk.sessions import DatabaseSessionService
-from utils import add_user_query_to_history, call_agent_async
+# The agent graph, google.adk and google.genai are imported by AgentRuntime
+# after login, so the login prompt does not wait for them.
+from agent_runtime import AgentRuntime
+from orchestrator_agent.router import ROUTER_ENABLED, intent_router
+from orchestrator_agent.sub_agents.faq_bot.cache import faq_cache
+from orchestrator_agent.sub_agents.appointment_agent.doctor_cache import doctor_cache
+from utils import call_agent_async
 
 load_dotenv()
 
@@ -47,7 +50,6 @@ def gather_health_profile(user_name: str):
             "diagnosedConditions": diagnosed_conditions,
             "currentMedications": current_medications,
         },
-        "interaction_history": [],
     }
     return user_profile_state
 
@@ -81,20 +83,24 @@ def display_user_profile(user_state):
     print("---------------------------\n")
 
 
-def login_flow():
-    """Handles the login process for an existing user."""
+def login_flow(runtime):
+    """Handles the login process for an existing user; returns the username, profile, account id and resume info."""
     print("\n--- User Login ---")
     username = input("Enter your full name: > ").strip()
     password = getpass.getpass("Enter your 4-digit password: > ").strip()
 
-    profile_data, stored_hash = get_user(username)
+    resumed = runtime.resume(username)
     
-    if profile_data and verify_password(stored_hash, password):
+    if resumed and verify_login(username, resumed["password_hash"], password):
         print("\n✅ Login successful!")
-        return username, profile_data
+        resumed = runtime.adopt_legacy_session(resumed)
+        return resumed["username"], resumed["profile"], resumed["account_id"], resumed
+    elif login_throttle.retry_after(username):
+        print(f"\n❌ Too many failed attempts. Please try again in {login_throttle.retry_after(username):.0f} seconds.")
+        return None, None, None, None
     else:
         print("\n❌ Login failed. Please check your name or password.")
-        return None, None
+        return None, None, None, None
 
 # MODIFIED: This function now follows the Name -> Password -> Details flow.
 def register_flow():
@@ -105,7 +111,7 @@ def register_flow():
     username = input("👤 What is your full name? > ").strip()
     if not username:
         print("Name cannot be empty.")
-        return None, None
+        return None, None, None, None
         
     # Step 2: Get and confirm the password
     password = ""
@@ -126,28 +132,57 @@ def register_flow():
     profile_data = gather_health_profile(username)
     
     # Step 4: Save everything to the database
-    if add_user(username, password, profile_data):
+    account_id = add_user(username, password, profile_data)
+    if account_id:
         print("\n✅ Registration successful! Your profile has been saved.")
-        return username, profile_data
+        return username, profile_data, account_id, None
     else:
         # add_user prints its own error message (e.g., username taken)
-        return None, None
+        return None, None, None, None
+
+def print_session_report():
+    """Prints how many turns were answered without extra model calls (pre-router, FAQ cache) and doctor-search cache use."""
+    report = intent_router.stats.report()
+    if ROUTER_ENABLED and report["turns"]:
+        print(f"\n--- Pre-router: {report['routed_locally']}/{report['turns']} turns routed locally "
+              f"({report['hit_rate']:.0%}), avg classify {report['avg_classify_ms']:.2f} ms ---")
+        if report["saved_ms_per_routed_turn"] is not None:
+            print(f"    Estimated latency saved per routed turn: {report['saved_ms_per_routed_turn']:.0f} ms")
+
+    cache_stats = faq_cache.stats()
+    if cache_stats["hits"] or cache_stats["misses"]:
+        print(f"--- FAQ cache: {cache_stats['hits']} hits, "
+              f"{cache_stats['misses']} misses, hit rate {cache_stats['hit_rate']:.0%} ---")
+
+    search_stats = doctor_cache.stats()
+    if search_stats["hits"] or search_stats["misses"]:
+        print(f"--- Doctor search cache: {search_stats['hits']} hits, {search_stats['misses']} misses, "
+              f"hit rate {search_stats['hit_rate']:.0%}, {search_stats['entries']} entries "
+              f"({search_stats['bytes'] / 1024:.1f} KiB) ---")
 
 async def main_async():
+    profiler.mark("imports")
     # Initialize both databases
-    initialize_user_database()
-    initialize_database()
+    with profiler.phase("db init"):
+        initialize_user_database()
+        initialize_database()
+    profiler.mark("ready for login")
+
+    APP_NAME = "Arogya Mitra"
+    runtime = AgentRuntime(APP_NAME, "sqlite:///./arogyamitra.db")
 
     user_state = None
     username = None
+    account_id = None
+    resumed = None
     
     # Loop until a user is successfully logged in or registered
     while not user_state:
         choice = input("\nWelcome to Arogya Mitra!\n1. Login\n2. Register\n3. Exit\n> ").strip()
         if choice == '1':
-            username, user_state = login_flow()
+            username, user_state, account_id, resumed = login_flow(runtime)
         elif choice == '2':
-            username, user_state = register_flow()
+            username, user_state, account_id, resumed = register_flow()
         elif choice == '3':
             return
         else:
@@ -156,23 +191,16 @@ async def main_async():
     # Display the user's profile right after successful login/registration.
     display_user_profile(user_state)
 
-    APP_NAME = "Arogya Mitra"
-    # Create a safe and consistent USER_ID from the username
-    USER_ID = re.sub(r'\W+', '_', username).lower()
-
-    session_service = DatabaseSessionService(db_url="sqlite:///./arogyamitra.db")
-
-    list_sessions_response = session_service.list_sessions(app_name=APP_NAME, user_id=USER_ID)
-
-    if list_sessions_response.sessions:
-        session_id = list_sessions_response.sessions[0].id
+    if resumed and resumed["session_id"]:
+        # The ADK user id the session was stored under (the account id, or the old name-derived id).
+        USER_ID, session_id = resumed["user_id"], resumed["session_id"]
         print(f"Continuing your previous chat session...")
     else:
-        session_id = str(uuid.uuid4())
-        session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id, state=user_state)
+        USER_ID, session_id = runtime.start_session(account_id, user_state, str(uuid.uuid4()))
         print(f"Created a new chat session for you.")
 
-    runner = Runner(agent=orchestrator_agent, app_name=APP_NAME, session_service=session_service)
+    # Build the agent graph while the user types the first message.
+    runtime.warm_up()
     
     print("\n--- Arogya Mitra Health Assistant ---")
     print("Type 'view my appointments', ask about symptoms, or book a new appointment.")
@@ -182,9 +210,11 @@ async def main_async():
         user_input = input(f"{username}: ")
         if user_input.lower() in ["exit", "quit"]:
             print("Ending conversation. Goodbye! Your session is saved.")
+            print_session_report()
+            profiler.report()
             break
-        add_user_query_to_history(session_service, APP_NAME, USER_ID, session_id, user_input)
-        await call_agent_async(runner, USER_ID, session_id, user_input)
+        # call_agent_async records both the query and the reply in the history.
+        await call_agent_async(runtime.runner, USER_ID, session_id, user_input)
 
 def main():
     """Entry point for the application."""
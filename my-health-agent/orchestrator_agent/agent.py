@@ -1,5 +1,7 @@
 from google.adk.agents import Agent
 
+from .prompting import build_instruction
+
 from .sub_agents.symptom_bot.agent import symptom_bot
 from .sub_agents.med_coach.agent import med_coach
 from .sub_agents.faq_bot.agent import faq_bot
@@ -10,7 +12,7 @@ root_agent = Agent(
     name="arogya_mitra_orchestrator",
     model="gemini-2.0-flash",  
     description="The main orchestrator for the Arogya Mitra health assistant.",
-    instruction="""
+    instruction=build_instruction("arogya_mitra_orchestrator", """
     You are the primary orchestrator for the 'Arogya Mitra' health assistant.
     Your main role is to understand the user's needs and route their request to the correct specialized agent.
     You must manage the conversation history and the user's health context.
@@ -45,7 +47,7 @@ root_agent = Agent(
        - You should typically route to this agent ONLY when the SymptomBot determines that expert medical care is needed.
 
     Your primary job is to delegate. Analyze the user's prompt and the conversation history, then pass the control to the most appropriate sub-agent. If you are unsure, ask a clarifying question.
-    """,
+    """),
     sub_agents=[symptom_bot, med_coach, faq_bot, appointment_agent],
     tools=[],
 )
\ No newline at end of file
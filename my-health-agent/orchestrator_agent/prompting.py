@@ -0,0 +1,58 @@
+# my-health-agent/orchestrator_agent/prompting.py
+import contextvars
+
+from db.executor import run_in_db_executor
+from db.history_store import load_window
+from history_manager import render_history
+from profile_renderer import cached_profile_block
+
+HISTORY_PLACEHOLDER = "{interaction_history}"
+PROFILE_PLACEHOLDER = "{user_context}"
+
+# (entries, summary) of the session whose turn is running; set by load_turn_window.
+_turn_window = contextvars.ContextVar("arogya_turn_window", default=None)
+
+
+def _neutralize_braces(text: str) -> str:
+    # ADK substitutes {state_key} placeholders in the returned instruction, so user
+    # text such as "{name}" must not look like one.
+    return text.replace("{", "(").replace("}", ")")
+
+
+async def load_turn_window(user_id, session_id):
+    """Reads the session's history window on the DB thread pool for the turn about to run.
+
+    Call before runner.run_async, in the task that runs the turn. The window
+    does not change during a turn (the turn is recorded after it ends), so
+    the instruction providers of every model call in it render this copy
+    instead of reading SQLite on the event loop.
+    """
+    _turn_window.set(await run_in_db_executor(load_window, user_id, session_id))
+
+
+def build_instruction(agent_name: str, template: str):
+    """Returns an ADK instruction provider for `template`.
+
+    `{user_context}` is replaced with the cached profile block holding the
+    fields this agent needs, and `{interaction_history}` with the bounded
+    history loaded for the turn by load_turn_window, rendered under the
+    agent's own budget. Every other placeholder is left for ADK to fill.
+    """
+    has_profile = PROFILE_PLACEHOLDER in template
+    has_history = HISTORY_PLACEHOLDER in template
+
+    def instruction_provider(context) -> str:
+        if not (has_profile or has_history):
+            return template
+        instruction = template
+        if has_profile:
+            profile = cached_profile_block(context.state, agent_name)
+            instruction = instruction.replace(PROFILE_PLACEHOLDER, _neutralize_braces(profile))
+        if has_history:
+            entries, summary = _turn_window.get() or ([], "")
+            history = render_history(entries, summary, agent_name)
+            instruction = instruction.replace(HISTORY_PLACEHOLDER, _neutralize_braces(history))
+        return instruction
+
+    instruction_provider.__name__ = f"{agent_name}_instruction"
+    return instruction_provider
@@ -0,0 +1,228 @@
+# my-health-agent/orchestrator_agent/router.py
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+# NumPy is imported on the first message that no rule matches, not at startup.
+np = None
+
+ORCHESTRATOR = "arogya_mitra_orchestrator"
+ROUTER_ENABLED = os.getenv("AROGYA_PREROUTER", "1") != "0"
+# Decisions below this confidence are left to the LLM orchestrator.
+CONFIDENCE_THRESHOLD = 0.8
+
+_SPECIALISTS = (
+    r"doctor|physician|gp|cardiologist|neurologist|dermatologist|orthopa?edic|surgeon|"
+    r"pa?ediatrician|oncologist|endocrinologist|gastroenterologist|specialist"
+)
+
+# (agent, confidence, pattern). Patterns are matched against the lower-cased message.
+RULES = [
+    ("appointment_agent", 0.95, r"\b(view|show|see|list|check|display)\b.*\bmy\s+appointments?\b"),
+    ("appointment_agent", 0.95, r"^\s*(my|upcoming)\s+appointments?\s*\??\s*$"),
+    ("appointment_agent", 0.9, r"\bbook\b.*\b(appointment|doctor|slot|consultation)\b"),
+    ("appointment_agent", 0.9, rf"\b(find|search|need|looking for|recommend)\b.*\b({_SPECIALISTS})s?\b"),
+    ("appointment_agent", 0.85, rf"\b({_SPECIALISTS})s?\s+(in|near|at)\s+[a-z]+"),
+    ("symptom_bot", 0.9, r"\bi\s+(have|am having|'ve had|have been having|feel|am feeling|keep getting)\b.*"
+                         r"\b(pain|ache|aches|headache|fever|nausea|cough|cold|dizzy|dizziness|vomiting|rash|"
+                         r"sore|itch|itchy|tired|fatigue|breathless|swelling|cramps?|diarrh?oea|bleeding)\b"),
+    ("symptom_bot", 0.9, r"\bmy\s+\w+\s+(hurts|is hurting|has been hurting|aches|is swollen|is itching)\b"),
+    ("med_coach", 0.9, r"\b(calories|steps|workout|work out|exercise|exercised|jog|jogged|walked|ran|"
+                       r"diet plan|meal plan|healthy (breakfast|lunch|dinner|snack)|fitness)\b"),
+    ("faq_bot", 0.85, r"^\s*(what|what's|whats)\s+(is|are)\s+(a|an|the)?\s*[a-z][a-z\s-]*\??\s*$"),
+    ("faq_bot", 0.85, r"^\s*(what are the|what're the)\s+(symptoms|causes|benefits|side effects|risks)\s+of\b"),
+    ("faq_bot", 0.85, r"^\s*(how is|how are)\s+[a-z\s-]+\s+(treated|diagnosed|prevented|spread)\b"),
+]
+_COMPILED_RULES = [(agent, confidence, re.compile(pattern)) for agent, confidence, pattern in RULES]
+# Personal pronouns turn a general question into a personalized one.
+_PERSONAL = re.compile(r"\b(i|i'm|im|my|me|mine)\b")
+
+# Seed examples for the optional TF-IDF model.
+TRAINING_EXAMPLES = {
+    "appointment_agent": [
+        "view my appointments", "show my upcoming appointments", "find a cardiologist in pune",
+        "book an appointment with a dermatologist", "i need a doctor in mumbai", "list doctors in delhi",
+        "book doctor for tomorrow morning", "cancel or check my booking",
+    ],
+    "symptom_bot": [
+        "i have a headache and nausea", "my stomach has been hurting for two days", "i feel dizzy and tired",
+        "i have fever and cough", "my back hurts when i bend", "i keep getting chest pain at night",
+        "there is a rash on my arm", "i feel anxious and cannot sleep",
+    ],
+    "med_coach": [
+        "how many calories did i burn today", "suggest a healthy breakfast", "i went for a 30 minute walk",
+        "plan my workout for the week", "how many steps should i walk daily", "give me a diet plan for weight loss",
+        "i ran 5 km this morning", "motivate me to exercise",
+    ],
+    "faq_bot": [
+        "what is hypertension", "what are the benefits of meditation", "what are the symptoms of the flu",
+        "what foods should be avoided with diabetes", "how is malaria spread", "what causes migraine",
+        "is coffee bad for health", "what is a normal blood pressure",
+    ],
+}
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    agent_name: str
+    confidence: float
+    source: str  # "rule", "tfidf" or "fallback"
+
+    @property
+    def is_confident(self) -> bool:
+        return self.agent_name != ORCHESTRATOR and self.confidence >= CONFIDENCE_THRESHOLD
+
+
+def _features(text):
+    tokens = _TOKEN.findall(text.lower())
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class TfidfModel:
+    """Nearest-centroid classifier over TF-IDF vectors of unigrams and bigrams."""
+
+    def __init__(self, examples):
+        documents = [(label, _features(text)) for label, texts in examples.items() for text in texts]
+        document_frequency = Counter(term for _, terms in documents for term in set(terms))
+        self.vocabulary = {term: i for i, term in enumerate(sorted(document_frequency))}
+        self.idf = np.array(
+            [math.log((1 + len(documents)) / (1 + document_frequency[term])) + 1 for term in sorted(document_frequency)]
+        )
+        self.labels = sorted(examples)
+        centroids = np.zeros((len(self.labels), len(self.vocabulary)))
+        for label, terms in documents:
+            centroids[self.labels.index(label)] += self._vector(terms)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = centroids / np.where(norms == 0, 1, norms)
+
+    def _vector(self, terms):
+        vector = np.zeros(len(self.vocabulary))
+        for term, count in Counter(terms).items():
+            index = self.vocabulary.get(term)
+            if index is not None:
+                vector[index] = count
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def predict(self, text):
+        """Returns (label, similarity, margin over the runner-up)."""
+        scores = self.centroids @ self._vector(_features(text))
+        order = np.argsort(scores)[::-1]
+        best, second = scores[order[0]], scores[order[1]]
+        return self.labels[order[0]], float(best), float(best - second)
+
+
+class RouterStats:
+    """Counts routing hits and estimates the latency saved by skipping the orchestrator hop."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.hits = defaultdict(int)
+        self.classify_seconds = 0.0
+        self.orchestrator_hops = 0
+        self.orchestrator_seconds = 0.0
+
+    def record_decision(self, decision, elapsed):
+        with self._lock:
+            self.turns += 1
+            self.classify_seconds += elapsed
+            if decision.is_confident:
+                self.hits[decision.agent_name] += 1
+
+    def record_orchestrator_hop(self, elapsed):
+        """Records how long the LLM orchestrator took to hand a turn over to a sub-agent."""
+        with self._lock:
+            self.orchestrator_hops += 1
+            self.orchestrator_seconds += elapsed
+
+    def report(self) -> dict:
+        with self._lock:
+            routed = sum(self.hits.values())
+            classify_ms = self.classify_seconds * 1000 / self.turns if self.turns else 0.0
+            hop_ms = self.orchestrator_seconds * 1000 / self.orchestrator_hops if self.orchestrator_hops else None
+            return {
+                "turns": self.turns,
+                "routed_locally": routed,
+                "hit_rate": routed / self.turns if self.turns else 0.0,
+                "hits_by_agent": dict(self.hits),
+                "avg_classify_ms": classify_ms,
+                "avg_orchestrator_hop_ms": hop_ms,
+                "saved_ms_per_routed_turn": hop_ms - classify_ms if hop_ms is not None else None,
+            }
+
+
+def _numpy_available() -> bool:
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # The TF-IDF fallback is optional; the keyword rules work without it.
+            return False
+        np = numpy
+    return True
+
+
+class IntentRouter:
+    """Deterministic pre-router that picks a sub-agent for obvious messages.
+
+    Keyword/regex rules are tried first; if none fires and NumPy is available, a
+    small TF-IDF model gets a vote. Anything below CONFIDENCE_THRESHOLD is sent
+    to the LLM orchestrator as before.
+    """
+
+    def __init__(self, use_tfidf=True, tfidf_min_similarity=0.25, tfidf_min_margin=0.15):
+        self.use_tfidf = use_tfidf
+        self._model = None
+        self._model_lock = threading.Lock()
+        self.tfidf_min_similarity = tfidf_min_similarity
+        self.tfidf_min_margin = tfidf_min_margin
+        self.stats = RouterStats()
+
+    @property
+    def model(self):
+        """The TF-IDF model, trained on first use; None without NumPy or with use_tfidf=False."""
+        if self._model is None and self.use_tfidf:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = TfidfModel(TRAINING_EXAMPLES) if _numpy_available() else False
+        return self._model or None
+
+    def classify(self, text: str) -> RouteDecision:
+        lowered = text.lower().strip()
+        matches = {}
+        for agent, confidence, pattern in _COMPILED_RULES:
+            if pattern.search(lowered):
+                matches[agent] = max(confidence, matches.get(agent, 0.0))
+        if matches.get("faq_bot") and _PERSONAL.search(lowered):
+            del matches["faq_bot"]
+
+        if len(matches) == 1:
+            agent, confidence = next(iter(matches.items()))
+            return RouteDecision(agent, confidence, "rule")
+        if len(matches) > 1:
+            # Several intents in one message - let the orchestrator decide.
+            return RouteDecision(ORCHESTRATOR, 0.0, "rule")
+
+        model = self.model
+        if model is not None:
+            agent, similarity, margin = model.predict(lowered)
+            if similarity >= self.tfidf_min_similarity and margin >= self.tfidf_min_margin:
+                return RouteDecision(agent, CONFIDENCE_THRESHOLD, "tfidf")
+        return RouteDecision(ORCHESTRATOR, 0.0, "fallback")
+
+    def route(self, text: str) -> RouteDecision:
+        start = time.perf_counter()
+        decision = self.classify(text)
+        self.stats.record_decision(decision, time.perf_counter() - start)
+        return decision
+
+
+intent_router = IntentRouter()
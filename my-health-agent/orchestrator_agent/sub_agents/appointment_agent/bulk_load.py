@@ -0,0 +1,213 @@
+# my-health-agent/orchestrator_agent/sub_agents/appointment_agent/bulk_load.py
+"""Bulk seeding and import of doctor rows.
+
+Rows are inserted with executemany in chunked transactions. The search indexes,
+FTS triggers and doctor-cache generation triggers are dropped for the duration
+of the load and rebuilt once at the end, which is much cheaper than
+maintaining them row by row.
+
+Run from the my-health-agent directory:
+    python -m orchestrator_agent.sub_agents.appointment_agent.bulk_load seed --count 1000000
+    python -m orchestrator_agent.sub_agents.appointment_agent.bulk_load import doctors.csv
+    python -m orchestrator_agent.sub_agents.appointment_agent.bulk_load import doctors.parquet
+"""
+import argparse
+import csv
+import json
+import random
+import sqlite3
+import time
+from functools import lru_cache
+from itertools import combinations, islice
+from pathlib import Path
+
+from db.connection import connection, transaction
+from .doctor_cache import GENERATION_TRIGGERS, bump_generation, create_generation_triggers
+from .search import (
+    SEARCH_INDEXES, create_fts_triggers, create_search_indexes, location_key, rebuild_fts, specialization_key
+)
+
+CHUNK_SIZE = 50_000
+FTS_TRIGGERS = ("doctors_fts_ai", "doctors_fts_ad", "doctors_fts_au")
+# Columns accepted from CSV/Parquet files; the search keys are always computed here.
+IMPORT_COLUMNS = (
+    "name", "specialization", "experience_years", "location", "hospital_name", "consultation_fee", "visiting_hours"
+)
+
+SPECIALIZATIONS = ['Cardiologist', 'Neurologist', 'Dermatologist', 'Orthopedic Surgeon', 'General Physician', 'Pediatrician', 'Oncologist', 'Endocrinologist', 'Gastroenterologist']
+LOCATIONS = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad']
+HOSPITALS = ["City Hospital", "Apollo Clinic", "Fortis Health", "Manipal Center", "Max Healthcare", "Global Medical", "Sunrise Institute"]
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+NAME_POOL_SIZE = 500
+
+
+@lru_cache(maxsize=1)
+def _name_pool():
+    """First and last names drawn from Faker once; Faker is only imported when seeding is needed."""
+    from faker import Faker
+
+    fake = Faker('en_IN')
+    return (
+        [fake.first_name() for _ in range(NAME_POOL_SIZE)],
+        [fake.last_name() for _ in range(NAME_POOL_SIZE)],
+    )
+
+
+@lru_cache(maxsize=1)
+def _visiting_hours_pool():
+    """Every visiting-hours JSON the generator can produce, grouped by number of visiting days."""
+    by_day_count = {}
+    for k in range(3, 6):
+        by_day_count[k] = [
+            json.dumps({",".join(visiting_days): f"{start_hour:02d}:00-{start_hour + length:02d}:00"})
+            for visiting_days in combinations(DAYS, k)
+            for start_hour in range(9, 15)
+            for length in range(2, 5)
+        ]
+    return by_day_count
+
+
+def generate_doctors(count, seed=None):
+    """Yields `count` generated doctor rows (the IMPORT_COLUMNS tuple).
+
+    Names, hospitals and visiting hours are picked from pools built once, which
+    keeps generation from dominating a multi-million row seed.
+    """
+    rng = random.Random(seed)
+    first_names, last_names = _name_pool()
+    hours_by_day_count = _visiting_hours_pool()
+    hospitals = {loc: [f"{hospital}, {loc}" for hospital in HOSPITALS] for loc in LOCATIONS}
+    choice, randint = rng.choice, rng.randint
+    for _ in range(count):
+        loc = choice(LOCATIONS)
+        yield (
+            f"Dr. {choice(first_names)} {choice(last_names)}",
+            choice(SPECIALIZATIONS),
+            randint(5, 25),
+            loc,
+            choice(hospitals[loc]),
+            randint(8, 25) * 100,
+            choice(hours_by_day_count[randint(3, 5)]),
+        )
+
+
+def read_csv(path):
+    """Yields doctor rows from a CSV file with an IMPORT_COLUMNS header."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for record in csv.DictReader(f):
+            yield tuple(record.get(column) or None for column in IMPORT_COLUMNS)
+
+
+def read_parquet(path, batch_size=CHUNK_SIZE):
+    """Yields doctor rows from a Parquet file; needs the optional pyarrow package."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Importing Parquet files needs pyarrow: pip install pyarrow")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=list(IMPORT_COLUMNS)):
+        yield from zip(*(batch.column(column).to_pylist() for column in IMPORT_COLUMNS))
+
+
+def _with_keys(rows):
+    # The key functions are pure, so cache them across the (few) distinct values.
+    spec_keys, loc_keys = {}, {}
+    for row in rows:
+        spec, loc = row[1], row[3]
+        if spec not in spec_keys:
+            spec_keys[spec] = specialization_key(spec)
+        if loc not in loc_keys:
+            loc_keys[loc] = location_key(loc)
+        # experience_years is NOT NULL; CSV and Parquet imports may leave it out.
+        experience = 0 if row[2] is None else row[2]
+        yield (*row[:2], experience, *row[3:], spec_keys[spec], loc_keys[loc])
+
+
+def drop_deferred_objects(conn):
+    """Drops the search indexes and triggers so inserts only touch the table itself."""
+    with transaction(conn):
+        for name in SEARCH_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        for name in FTS_TRIGGERS + GENERATION_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def restore_deferred_objects(conn):
+    """Recreates the search indexes and triggers, rebuilds the FTS table and invalidates cached searches."""
+    with transaction(conn):
+        create_search_indexes(conn)
+        create_fts_triggers(conn)
+        rebuild_fts(conn)
+        create_generation_triggers(conn)
+        bump_generation(conn)
+    conn.execute("ANALYZE doctors")
+
+
+def load_doctors(conn, rows, chunk_size=CHUNK_SIZE, progress=None):
+    """Inserts doctor rows in chunked transactions with indexes deferred; returns the row count.
+
+    The doctors tables must already exist (see create_tables).
+    """
+    rows = _with_keys(rows)
+    loaded = 0
+    drop_deferred_objects(conn)
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            with transaction(conn):
+                conn.executemany("""
+                    INSERT INTO doctors (name, specialization, experience_years, location, hospital_name, consultation_fee, visiting_hours, specialization_key, location_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, chunk)
+            loaded += len(chunk)
+            if progress:
+                progress(loaded)
+    finally:
+        # Also after a failed chunk: earlier chunks are committed and must be searchable.
+        restore_deferred_objects(conn)
+    return loaded
+
+
+def seed_doctors(conn, count, seed=None, chunk_size=CHUNK_SIZE, progress=None):
+    """Generates and loads `count` doctors."""
+    return load_doctors(conn, generate_doctors(count, seed), chunk_size, progress)
+
+
+def main():
+    from .database import DB_FILE, create_tables
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", type=Path, default=DB_FILE, help="SQLite file to load into (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed_parser = commands.add_parser("seed", help="generate doctors with Faker names")
+    seed_parser.add_argument("--count", type=int, default=1000)
+    seed_parser.add_argument("--seed", type=int, default=None)
+    import_parser = commands.add_parser("import", help="import doctors from a .csv or .parquet file")
+    import_parser.add_argument("path", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "import":
+        reader = read_parquet if args.path.suffix.lower() in (".parquet", ".pq") else read_csv
+        rows = reader(args.path)
+    else:
+        rows = generate_doctors(args.count, args.seed)
+
+    def progress(loaded):
+        print(f"  {loaded:,} rows inserted ({loaded / (time.perf_counter() - started):,.0f} rows/sec)")
+
+    try:
+        with connection(args.db) as conn:
+            create_tables(conn)
+            started = time.perf_counter()
+            loaded = load_doctors(conn, rows, args.chunk_size, progress)
+            elapsed = time.perf_counter() - started
+    except sqlite3.Error as e:
+        raise SystemExit(f"Bulk load failed: {e}")
+    print(f"Loaded {loaded:,} doctors into {args.db} in {elapsed:.1f} s "
+          f"({loaded / elapsed if elapsed else 0:,.0f} rows/sec, including index and FTS rebuild)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,31 @@
 # my-health-agent/orchestrator_agent/sub_agents/appointment_agent/database.py
 import sqlite3
 import json
+import base64
+import hashlib
 from pathlib import Path
-from faker import Faker
-import random
-from datetime import date, timedelta
+from datetime import timedelta
+# The booking tools take a `date` argument, which shadows the class inside them.
+from datetime import date as _date
+
+from db import user_profile_db
+from db.connection import connection, transaction
+from db.session_cache import ACCOUNT_ID_KEY
+from .bulk_load import seed_doctors
+from .dates import ISO_DATE_GLOB, ISO_TIME_GLOB, WEEKDAY_NAMES, now_starts_at, parse_date, starts_at_for
+from .directory import day_mask, directory_available, directory_search, doctor_directory, ensure_directory_schema
+from . import results
+from .doctor_cache import doctor_cache, doctors_generation, ensure_generation_schema, search_key
+from .search import canonical_key, ensure_search_schema, search_doctors_page, specialization_key, location_key
+from .slots import (
+    MAX_RANGE_DAYS, SlotUnavailableError, available_slots, book_slot, ensure_slot_schema, normalize_time
+)
 
 # Define the path for the database in the same directory
 DB_FILE = Path(__file__).parent / "doctors.db"
 
-def create_connection():
-    """Create a database connection to the SQLite database."""
-    conn = None
-    try:
-        # check_same_thread=False is needed for multi-threaded access if your app grows
-        conn = sqlite3.connect(DB_FILE, check_same_thread=False)
-    except sqlite3.Error as e:
-        print(e)
-    return conn
+# Doctors per find_doctors page.
+PAGE_SIZE = 5
 
 def create_tables(conn):
     """Create doctors and appointments tables."""
@@ -29,11 +37,13 @@ def create_tables(conn):
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
                 specialization TEXT NOT NULL,
-                experience_years INTEGER,
+                experience_years INTEGER NOT NULL DEFAULT 0,
                 location TEXT,
                 hospital_name TEXT,
                 consultation_fee REAL,
-                visiting_hours TEXT
+                visiting_hours TEXT,
+                specialization_key TEXT,
+                location_key TEXT
             );
         """)
         # Appointments Table
@@ -42,112 +52,278 @@ def create_tables(conn):
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 doctor_id INTEGER NOT NULL,
                 patient_name TEXT NOT NULL,
+                patient_id INTEGER,
                 appointment_date TEXT NOT NULL,
                 appointment_time TEXT NOT NULL,
                 status TEXT NOT NULL DEFAULT 'Booked',
+                starts_at TEXT,
                 FOREIGN KEY (doctor_id) REFERENCES doctors (id)
             );
         """)
-        conn.commit()
+        ensure_starts_at_schema(conn)
+        ensure_patient_schema(conn)
+        ensure_search_schema(conn)
+        ensure_generation_schema(conn)
+        ensure_directory_schema(conn)
+        ensure_slot_schema(conn)
     except sqlite3.Error as e:
         print(f"Error creating tables: {e}")
 
+def ensure_starts_at_schema(conn):
+    """Adds appointments.starts_at ('YYYY-MM-DDTHH:MM', local time; see dates.py) and the per-doctor index on it.
+
+    When the column is new, it is filled for existing bookings before the
+    indexes on it exist. A trigger fills it for rows inserted without one
+    whose date and time are already 'YYYY-MM-DD' and 'HH:MM'; book_slot sets
+    it itself.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(appointments)")}
+    if "starts_at" not in columns:
+        conn.execute("ALTER TABLE appointments ADD COLUMN starts_at TEXT")
+        backfill_starts_at(conn)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS appointments_starts_at_ai AFTER INSERT ON appointments
+        WHEN NEW.starts_at IS NULL AND NEW.appointment_date GLOB '{ISO_DATE_GLOB}' AND NEW.appointment_time GLOB '{ISO_TIME_GLOB}'
+        BEGIN
+            UPDATE appointments SET starts_at = NEW.appointment_date || 'T' || NEW.appointment_time WHERE id = NEW.id;
+        END;
+    """)
+    # A doctor's bookings in a time range.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_appointments_doctor_starts ON appointments (doctor_id, starts_at)")
+
+def backfill_starts_at(conn):
+    """Fills starts_at for bookings that have none; returns the rows filled.
+
+    Dates and times that are already ISO are concatenated by one UPDATE.
+    Free-text ones from before times were normalized ('10 AM', '23/10/2026')
+    go through dates.starts_at_for. Rows that cannot be parsed keep a NULL
+    starts_at: they sort first in "my appointments" and are outside every range.
+    """
+    with transaction(conn, "IMMEDIATE"):
+        filled = conn.execute(f"""
+            UPDATE appointments SET starts_at = appointment_date || 'T' || appointment_time
+            WHERE starts_at IS NULL AND appointment_date GLOB '{ISO_DATE_GLOB}' AND appointment_time GLOB '{ISO_TIME_GLOB}'
+        """).rowcount
+        parsed = []
+        for appointment_id, day, time in conn.execute(
+                "SELECT id, appointment_date, appointment_time FROM appointments WHERE starts_at IS NULL"):
+            value = starts_at_for(day, time)
+            if value:
+                parsed.append((value, appointment_id))
+        conn.executemany("UPDATE appointments SET starts_at = ? WHERE id = ?", parsed)
+    return filled + len(parsed)
+
+def ensure_patient_schema(conn):
+    """Adds appointments.patient_id (the booking account's users.id) and the per-patient indexes.
+
+    When the column is new, existing bookings are linked before
+    idx_appointments_patient_starts exists: every row changes patient_id, and
+    keeping the index up to date during that UPDATE costs more than building it after.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(appointments)")}
+    if "patient_id" not in columns:
+        conn.execute("ALTER TABLE appointments ADD COLUMN patient_id INTEGER")
+        linked = backfill_patient_ids(conn, user_profile_db.DB_FILE)
+        if linked:
+            print(f"Linked {linked} appointments to patient accounts.")
+    # Covers "my appointments" in time order without a sort, and upcoming/date-range lookups as one range scan.
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_appointments_patient_starts
+        ON appointments (patient_id, starts_at)
+    """)
+    # Bookings for people without an account are still looked up by name.
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_appointments_patient_name_starts
+        ON appointments (patient_name COLLATE NOCASE, starts_at)
+    """)
+    # The same indexes on the old text date and time columns, which starts_at replaces.
+    conn.execute("DROP INDEX IF EXISTS idx_appointments_patient")
+    conn.execute("DROP INDEX IF EXISTS idx_appointments_patient_name")
+
+def backfill_patient_ids(conn, users_db):
+    """Links appointments booked by name to the matching account in the user database; returns the rows linked.
+
+    Runs once, when ensure_patient_schema adds the column. Bookings made after
+    that keep patient_id NULL when the session had no account id, and must not
+    be linked later by name. The user database is ATTACHed, so the whole
+    backfill is one UPDATE.
+    """
+    if not Path(users_db).exists():
+        return 0
+    if conn.execute("SELECT 1 FROM appointments WHERE patient_id IS NULL LIMIT 1").fetchone() is None:
+        return 0
+    conn.execute("ATTACH DATABASE ? AS users_db", (str(users_db),))
+    try:
+        with transaction(conn, "IMMEDIATE"):
+            return conn.execute("""
+                UPDATE appointments
+                SET patient_id = (
+                    SELECT u.id FROM users_db.users u
+                    WHERE u.username = appointments.patient_name COLLATE NOCASE ORDER BY u.id LIMIT 1
+                )
+                WHERE patient_id IS NULL AND EXISTS (
+                    SELECT 1 FROM users_db.users u WHERE u.username = appointments.patient_name COLLATE NOCASE
+                )
+            """).rowcount
+    finally:
+        conn.execute("DETACH DATABASE users_db")
+
 def generate_and_populate_doctors(conn, count=1000):
-    """Populate the doctors table with generated data using Faker if it's empty."""
+    """Populate the doctors table with generated data if it's empty.
+
+    Faker is only imported (by bulk_load) when rows actually need generating.
+    """
     cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM doctors")
-    if cursor.fetchone()[0] > 0:
+    # LIMIT 1 instead of COUNT(*): a full count walks the whole table on every startup.
+    cursor.execute("SELECT 1 FROM doctors LIMIT 1")
+    if cursor.fetchone() is not None:
         return
 
     print(f"Doctor database is empty. Generating {count} new doctor records...")
-    fake = Faker('en_IN')
-
-    specializations = ['Cardiologist', 'Neurologist', 'Dermatologist', 'Orthopedic Surgeon', 'General Physician', 'Pediatrician', 'Oncologist', 'Endocrinologist', 'Gastroenterologist']
-    locations = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad']
-    hospitals = ["City Hospital", "Apollo Clinic", "Fortis Health", "Manipal Center", "Max Healthcare", "Global Medical", "Sunrise Institute"]
-    days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
-
-    doctors_data = []
-    for _ in range(count):
-        spec = random.choice(specializations)
-        name = f"Dr. {fake.first_name()} {fake.last_name()}"
-        exp = random.randint(5, 25)
-        loc = random.choice(locations)
-        hosp = f"{random.choice(hospitals)}, {loc}"
-        fee = random.randint(8, 25) * 100
-        
-        start_hour = random.randint(9, 14)
-        end_hour = start_hour + random.randint(2, 4)
-        visiting_days = sorted(random.sample(days, k=random.randint(3, 5)))
-        hours = {",".join(visiting_days): f"{start_hour:02d}:00-{end_hour:02d}:00"}
-
-        doctors_data.append((name, spec, exp, loc, hosp, fee, json.dumps(hours)))
-
-    cursor.executemany("""
-        INSERT INTO doctors (name, specialization, experience_years, location, hospital_name, consultation_fee, visiting_hours)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, doctors_data)
-    conn.commit()
+    seed_doctors(conn, count)
     print(f"Successfully populated database with {count} doctors.")
 
 
 def _parse_date(date_str: str) -> str:
-    """Converts natural language dates like 'today' or 'tomorrow' to YYYY-MM-DD format."""
+    """Converts dates like 'today', 'next Friday' or '23 Oct' to YYYY-MM-DD format (see dates.parse_date).
+
+    Anything that cannot be parsed is returned unchanged, for the caller to reject.
+    """
     if not isinstance(date_str, str):
         return str(date_str)
-        
-    today = date.today()
-    if date_str.lower() == 'today':
-        return today.strftime('%Y-%m-%d')
-    if date_str.lower() == 'tomorrow':
-        tomorrow = today + timedelta(days=1)
-        return tomorrow.strftime('%Y-%m-%d')
-    return date_str
+    try:
+        return parse_date(date_str).isoformat()
+    except ValueError:
+        return date_str
+
 
+def _weekday(value: str) -> int:
+    """Weekday number (Mon=0) of a day name ('Friday', 'fri') or of a date; raises ValueError otherwise."""
+    name = value.strip().lower()
+    for weekday, full in enumerate(WEEKDAY_NAMES):
+        # Only whole names and their 3-letter abbreviations: "Monkey" is not Monday.
+        if name in (full, full[:3]):
+            return weekday
+    return _date.fromisoformat(_parse_date(value)).weekday()
+
+
+def _encode_cursor(search, source, after) -> str:
+    payload = json.dumps({"search": search, "source": source, "after": after}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> dict:
+    """The cursor's payload; raises ValueError for anything that is not a find_doctors cursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (TypeError, ValueError) as e:
+        raise ValueError(str(e))
+    if not isinstance(payload, dict) or not isinstance(payload.get("after"), list):
+        raise ValueError("not a find_doctors cursor")
+    return payload
 
-def _find_doctors_in_db(specialization: str, location: str):
-    """Searches for doctors based on medical specialization and location. For example, 'find a physician in Mumbai'. Returns a list of the top 5 matching doctors with their details.
+
+def _find_doctors_in_db(specialization: str, location: str, preferred_date: str, available_only: bool,
+                        hospital: str, hospital_only: bool, max_fee: float, min_experience: int, cursor: str):
+    """Searches for doctors based on medical specialization and location, with optional filters. For example, 'find a physician in Mumbai under Rs. 1000'. Returns one page of up to 5 matching doctors, best match first, and a `next_cursor` for the next page (null on the last page).
+
+    Doctors are ranked by experience and fee; doctors who visit on the preferred date and doctors at the preferred hospital come first.
 
     Args:
         specialization: The medical field of the doctor (e.g., 'Cardiologist', 'Physician').
         location: The city where the user is looking for a doctor (e.g., 'Mumbai', 'Delhi').
+        preferred_date: The day the user wants to visit: 'YYYY-MM-DD', 'today', 'tomorrow' or a weekday name (e.g., 'Friday'). Use an empty string if the user has no preferred day.
+        available_only: True to list only doctors who visit on preferred_date; False to just rank them first.
+        hospital: The hospital the user prefers (e.g., 'Apollo'). Use an empty string if the user has no preference.
+        hospital_only: True to list only doctors at that hospital; False to just rank them first.
+        max_fee: The highest consultation fee in rupees the user accepts. Use 0 for no limit.
+        min_experience: The minimum years of experience the user wants. Use 0 for any.
+        cursor: The next_cursor of the previous find_doctors result, to show more doctors for the same search. Use an empty string for a new search.
     """
-    conn = create_connection()
-    if not conn:
-        return "Error: Could not connect to the database."
-    
-    cursor = conn.cursor()
-    query = "SELECT id, name, specialization, experience_years, hospital_name, consultation_fee, visiting_hours FROM doctors WHERE 1=1"
-    params = []
-    
-    if specialization:
-        search_term = 'General Physician' if 'physician' in specialization.lower() else specialization
-        query += " AND specialization LIKE ?"
-        params.append(f"%{search_term}%")
-    if location:
-        query += " AND location LIKE ?"
-        params.append(f"%{location}%")
-    
-    query += " ORDER BY experience_years DESC LIMIT 5"
-        
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    
+    weekday = None
+    if preferred_date:
+        try:
+            weekday = _weekday(preferred_date)
+        except ValueError:
+            return "Error: Dates must be in the YYYY-MM-DD format or a weekday name."
+    spec_key = specialization_key(specialization) if specialization else ""
+    loc_key = location_key(location) if location else ""
+    hospital = canonical_key(hospital)
+    available_only = bool(available_only) and weekday is not None
+    hospital_only = bool(hospital_only) and bool(hospital)
+    max_fee = float(max_fee) if max_fee and float(max_fee) > 0 else None
+    min_experience = int(min_experience) if min_experience and int(min_experience) > 0 else None
+    # The ranking only depends on the weekday, so every Monday shares a cache entry.
+    search = search_key(spec_key, loc_key, PAGE_SIZE, weekday=weekday, hospital=hospital, available_only=available_only,
+                        hospital_only=hospital_only, max_fee=max_fee, min_experience=min_experience)
+    # Cursors carry a fingerprint of their search, so one cannot page through a different search.
+    fingerprint = hashlib.sha256(repr(search).encode()).hexdigest()[:16]
+    after, source = None, None
+    if cursor:
+        try:
+            payload = _decode_cursor(cursor)
+        except ValueError:
+            return "Error: Invalid cursor. Start a new search with an empty cursor."
+        if payload.get("search") != fingerprint:
+            return "Error: This cursor belongs to a different search. Repeat the search with the same arguments, or use an empty cursor."
+        after, source = payload["after"], payload.get("source")
+    key = search + (("cursor", cursor), ("format", results.RESULT_FORMAT))
+
+    try:
+        with connection(DB_FILE) as conn:
+            generation = doctors_generation(conn)
+            cached = doctor_cache.get(generation, key)
+            if cached is not None:
+                return cached
+            # One extra row tells whether there is a next page.
+            rows, keys = None, None
+            if source in (None, "rank"):
+                rows, keys = directory_search(
+                    conn, generation, spec_key, loc_key, PAGE_SIZE + 1, weekday, hospital, max_fee=max_fee,
+                    min_experience=min_experience, available_only=available_only, hospital_only=hospital_only,
+                    after=tuple(after) if source == "rank" else None)
+            if rows is not None:
+                source = "rank"
+            elif source == "rank":
+                return "Error: This cursor has expired. Repeat the search with an empty cursor."
+            else:
+                def accept(row):
+                    # What the SQL query cannot filter on.
+                    if available_only and not day_mask(row[6]) >> weekday & 1:
+                        return False
+                    return not hospital_only or all(term in canonical_key(row[4]).split() for term in hospital.split())
+
+                rows, source = search_doctors_page(
+                    conn, specialization, location, PAGE_SIZE + 1, max_fee, min_experience,
+                    accept if available_only or hospital_only else None, tuple(after) if after else None, source)
+                keys = [(row[3], row[0]) for row in rows]
+    except sqlite3.Error as e:
+        return f"Error: Could not search for doctors. Reason: {e}"
+
     if not rows:
-        return "No doctors found matching your criteria. Please try a different specialization or location."
-        
-    results = []
-    for row in rows:
-        results.append({
-            "id": row[0], "name": row[1], "specialization": row[2],
-            "experience_years": row[3], "hospital_name": row[4],
-            "consultation_fee": row[5], "visiting_hours": json.loads(row[6])
-        })
-    return json.dumps(results, indent=2)
+        if cursor:
+            result = "No more doctors match this search."
+        else:
+            result = "No doctors found matching your criteria. Please try a different specialization or location."
+    else:
+        next_cursor = None
+        if len(rows) > PAGE_SIZE:
+            next_cursor = _encode_cursor(fingerprint, source, list(keys[PAGE_SIZE - 1]))
+        result = results.doctors_result(rows[:PAGE_SIZE], next_cursor)
+    doctor_cache.put(generation, key, result)
+    return result
+
+def _patient_id(tool_context):
+    """The account id of the session's user, or None.
+
+    `patient_name` comes from the model and is never resolved to an account:
+    without an account id in state, bookings keep patient_id NULL and
+    lookups match unlinked appointments by name.
+    """
+    return tool_context.state.get(ACCOUNT_ID_KEY) if tool_context is not None else None
 
-def _book_appointment_in_db(doctor_id: int, patient_name: str, date: str, time: str):
-    """Books an appointment with a specific doctor for a user after parsing the date.
+def _book_appointment_in_db(doctor_id: int, patient_name: str, date: str, time: str, tool_context):
+    """Books an appointment with a specific doctor for a user after parsing the date. The time must be one of the doctor's free 30-minute slots; use find_available_slots to list them.
 
     Args:
         doctor_id: The unique ID of the doctor, which is found using the find_doctors tool.
@@ -155,29 +331,27 @@ def _book_appointment_in_db(doctor_id: int, patient_name: str, date: str, time:
         date: The desired date for the appointment in 'YYYY-MM-DD' or natural language format (e.g., 'today').
         time: The desired time for the appointment (e.g., '10 AM', '15:00').
     """
-    conn = create_connection()
-    if not conn:
-        return "Error: Could not connect to the database."
+    parsed_date = _parse_date(date)
+    try:
+        day = _date.fromisoformat(parsed_date)
+    except ValueError:
+        return f"Error: '{date}' is not a valid date. Please use the YYYY-MM-DD format."
+    if day < _date.today():
+        return f"Error: {day.isoformat()} is in the past. Please choose today or a later date."
+    slot_time = normalize_time(time)
+    if not slot_time:
+        return f"Error: '{time}' is not a valid time. Please use a time such as '10:30 AM' or '15:00'."
 
     try:
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT name, visiting_hours FROM doctors WHERE id = ?", (doctor_id,))
-        doctor = cursor.fetchone()
-        if not doctor:
-            conn.close()
-            return f"Error: No doctor found with ID {doctor_id}."
-        
-        doctor_name = doctor[0]
-        parsed_date = _parse_date(date)
-
-        cursor.execute(
-            "INSERT INTO appointments (doctor_id, patient_name, appointment_date, appointment_time) VALUES (?, ?, ?, ?)",
-            (doctor_id, patient_name, parsed_date, time)
-        )
-        conn.commit()
-        appointment_id = cursor.lastrowid
-        conn.close()
+        with connection(DB_FILE) as conn:
+            doctor = conn.execute("SELECT name, visiting_hours FROM doctors WHERE id = ?", (doctor_id,)).fetchone()
+            if not doctor:
+                return f"Error: No doctor found with ID {doctor_id}."
+
+            doctor_name, visiting_hours = doctor
+            appointment_id = book_slot(
+                conn, doctor_id, visiting_hours, patient_name, _patient_id(tool_context), day, slot_time
+            )
         
         return json.dumps({
             "status": "Success",
@@ -186,57 +360,122 @@ def _book_appointment_in_db(doctor_id: int, patient_name: str, date: str, time:
             "doctor_name": doctor_name,
             "patient_name": patient_name,
             "date": parsed_date,
-            "time": time
+            "time": slot_time
         })
+    except SlotUnavailableError as e:
+        return f"Error: Could not book appointment. {e} Use find_available_slots to see the free slots."
     except sqlite3.Error as e:
-        conn.close()
         return f"Error: Could not book appointment. Reason: {e}"
 
-def _get_appointments_for_user_db(patient_name: str):
+def _find_available_slots_in_db(doctor_id: int, start_date: str, end_date: str):
+    """Lists a doctor's free 30-minute appointment slots for each day in a date range.
+
+    Args:
+        doctor_id: The unique ID of the doctor, which is found using the find_doctors tool.
+        start_date: The first day to check, in 'YYYY-MM-DD' or natural language format (e.g., 'today').
+        end_date: The last day to check (inclusive), in 'YYYY-MM-DD' format. Use the same value as start_date to check a single day.
+    """
+    try:
+        start = _date.fromisoformat(_parse_date(start_date))
+        end = _date.fromisoformat(_parse_date(end_date)) if end_date else start
+    except ValueError:
+        return "Error: Dates must be in the YYYY-MM-DD format."
+    if end < start:
+        start, end = end, start
+    if (end - start).days >= MAX_RANGE_DAYS:
+        end = start + timedelta(days=MAX_RANGE_DAYS - 1)
+
+    try:
+        with connection(DB_FILE) as conn:
+            doctor = conn.execute("SELECT name, visiting_hours FROM doctors WHERE id = ?", (doctor_id,)).fetchone()
+            if not doctor:
+                return f"Error: No doctor found with ID {doctor_id}."
+            free = available_slots(conn, doctor_id, doctor[1], start, end)
+    except sqlite3.Error as e:
+        return f"Error: Could not look up available slots. Reason: {e}"
+
+    if not free:
+        return f"No free slots for doctor {doctor_id} between {start.isoformat()} and {end.isoformat()}."
+    return json.dumps({"doctor_id": doctor_id, "doctor_name": doctor[0], "available_slots": free}, indent=2)
+
+def _get_appointments_for_user_db(patient_name: str, tool_context):
     """Views all past and upcoming appointments for a specific patient, including doctor's fee.
 
     Args:
         patient_name: The full name of the patient to retrieve appointments for.
     """
-    conn = create_connection()
-    if not conn:
-        return "Error: Could not connect to the database."
+    return appointments_for_patient(_patient_id(tool_context), patient_name)
 
-    cursor = conn.cursor()
-    query = """
-        SELECT d.name, d.hospital_name, a.appointment_date, a.appointment_time, d.consultation_fee
+def _get_upcoming_appointments_db(patient_name: str, start_date: str, end_date: str, tool_context):
+    """Views a patient's appointments in a date range, soonest first. For example, 'do I have appointments next week?'. With empty dates it lists only the upcoming appointments.
+
+    Args:
+        patient_name: The full name of the patient to retrieve appointments for.
+        start_date: The first day, in 'YYYY-MM-DD' or natural language format (e.g., 'today', 'next Monday', '23 Oct'). Use an empty string to start from now.
+        end_date: The last day (inclusive), in the same formats. Use an empty string for no end.
+    """
+    try:
+        start = parse_date(start_date) if start_date else None
+        end = parse_date(end_date) if end_date else None
+    except ValueError:
+        return "Error: Dates must be in the YYYY-MM-DD format or a day such as 'today', 'Friday' or '23 Oct'."
+    if start and end and end < start:
+        start, end = end, start
+    # starts_at is 'YYYY-MM-DDTHH:MM', so day bounds are plain string bounds.
+    lower = f"{start.isoformat()}T00:00" if start else now_starts_at()
+    upper = f"{(end + timedelta(days=1)).isoformat()}T00:00" if end else None
+    return appointments_for_patient(_patient_id(tool_context), patient_name, lower, upper)
+
+def appointments_for_patient(patient_id, patient_name, starts_from=None, starts_before=None):
+    """Appointments of account `patient_id`, or the unlinked ones booked under `patient_name`, in start-time order.
+
+    `starts_from` and `starts_before` bound starts_at (inclusive, exclusive),
+    so the lookup is one range scan of idx_appointments_patient_starts (or of
+    the name index) with no sort.
+    """
+    if patient_id is not None:
+        where, params = "a.patient_id = ?", [patient_id]
+    else:
+        where, params = "a.patient_name = ? COLLATE NOCASE AND a.patient_id IS NULL", [patient_name]
+    if starts_from is not None:
+        where += " AND a.starts_at >= ?"
+        params.append(starts_from)
+    if starts_before is not None:
+        where += " AND a.starts_at < ?"
+        params.append(starts_before)
+    # Rows whose starts_at could not be parsed keep their original text date and time.
+    query = f"""
+        SELECT d.name, d.hospital_name, COALESCE(substr(a.starts_at, 1, 10), a.appointment_date),
+               COALESCE(substr(a.starts_at, 12), a.appointment_time), d.consultation_fee
         FROM appointments a
         JOIN doctors d ON a.doctor_id = d.id
-        WHERE a.patient_name = ?
-        ORDER BY a.appointment_date, a.appointment_time
+        WHERE {where}
+        ORDER BY a.starts_at, a.id
     """
-    cursor.execute(query, (patient_name,))
-    rows = cursor.fetchall()
-    conn.close()
+    try:
+        with connection(DB_FILE) as conn:
+            rows = conn.execute(query, params).fetchall()
+    except sqlite3.Error as e:
+        return f"Error: Could not retrieve appointments. Reason: {e}"
 
     if not rows:
+        if starts_from is not None or starts_before is not None:
+            return f"No appointments found for {patient_name} in that period."
         return f"No appointments found for {patient_name}."
 
-    appointments = []
-    for row in rows:
-        appointments.append({
-            "doctor_name": row[0],
-            "hospital": row[1],
-            "date": row[2],
-            "time": row[3],
-            "consultation_fee": row[4]
-        })
-    
-    return json.dumps(appointments, indent=2)
+    return results.appointments_result(rows)
 
 def initialize_database():
     """Initializes the database, creating tables and populating if needed."""
     print("Initializing doctor database...")
-    conn = create_connection()
-    if conn is not None:
-        create_tables(conn)
-        generate_and_populate_doctors(conn, 1000)
-        conn.close()
+    try:
+        with connection(DB_FILE) as conn:
+            create_tables(conn)
+            generate_and_populate_doctors(conn, 1000)
+            if directory_available():
+                doctor_directory.load(conn, doctors_generation(conn))
+                print(f"Doctor directory: {len(doctor_directory)} doctors in memory "
+                      f"({doctor_directory.stats['load_ms']:.0f} ms).")
         print("Doctor database ready.")
-    else:
-        print("Error! cannot create the database connection.")
\ No newline at end of file
+    except sqlite3.Error as e:
+        print(f"Error! cannot create the database connection: {e}")
@@ -0,0 +1,133 @@
+# my-health-agent/orchestrator_agent/sub_agents/appointment_agent/dates.py
+"""Parsing of the dates users type, and the normalized appointment start time.
+
+An appointment's starts_at is 'YYYY-MM-DDTHH:MM' in the clinic's local time.
+Visiting hours and slots are local wall-clock times already, and India has no
+daylight saving time, so this text sorts chronologically. It is compared and
+range-scanned as a plain string.
+"""
+import re
+from datetime import date, datetime, timedelta
+
+from .slots import normalize_time
+
+STARTS_AT_FORMAT = "%Y-%m-%dT%H:%M"
+# SQLite GLOBs for values that are already 'YYYY-MM-DD' and 'HH:MM'.
+ISO_DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-1][0-9]-[0-3][0-9]"
+ISO_TIME_GLOB = "[0-2][0-9]:[0-5][0-9]"
+
+MONTH_NAMES = ("january", "february", "march", "april", "may", "june", "july", "august", "september", "october",
+               "november", "december")
+WEEKDAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+# Years are written with 4 digits, or 2 in the day-first form; '1/2/3' is not a date.
+_YEAR_FIRST = re.compile(r"^(\d{4})[/.-](\d{1,2})[/.-](\d{1,2})$")
+_DAY_FIRST = re.compile(r"^(\d{1,2})[/.-](\d{1,2})[/.-](\d{2}|\d{4})$")
+_DAY_MONTH = re.compile(r"^(\d{1,2})(?:st|nd|rd|th)?(?: of)? ([a-z]+)\.?(?: (\d{4}))?$")
+_MONTH_DAY = re.compile(r"^([a-z]+)\.? (\d{1,2})(?:st|nd|rd|th)?(?: (\d{4}))?$")
+_IN_DAYS = re.compile(r"^in (a|an|one|\d+) (day|week)s?$")
+_WEEKDAY = re.compile(r"^(?:(this|next|coming) )?([a-z]+)$")
+_RELATIVE_DAYS = {"today": 0, "tomorrow": 1, "day after tomorrow": 2, "the day after tomorrow": 2, "yesterday": -1}
+
+
+def _prefix_of(name, names):
+    # "oct", "octob" and "october" all name October; "fri" and "friday" name Friday.
+    for index, full in enumerate(names):
+        if len(name) >= 3 and full.startswith(name):
+            return index
+    return None
+
+
+def _month(name):
+    index = _prefix_of(name, MONTH_NAMES)
+    if index is None:
+        raise ValueError(f"unknown month: {name!r}")
+    return index + 1
+
+
+def _clean(value) -> str:
+    return " ".join(str(value).strip().lower().rstrip(".").replace(",", " ").split())
+
+
+def _absolute(text, today):
+    # The year may be left out of "23 Oct" and "October 23rd"; that means the next such day from `today`.
+    numeric = _YEAR_FIRST.match(text)
+    if numeric:
+        year, month, day = numeric.groups()
+        return date(int(year), int(month), int(day))
+    numeric = _DAY_FIRST.match(text)
+    if numeric:
+        # Day first, as dates are written in India: 23/10/2026 or 23/10/26.
+        day, month, year = numeric.groups()
+        return date(int(year) + (2000 if len(year) == 2 else 0), int(month), int(day))
+    match = _DAY_MONTH.match(text)
+    if match:
+        day, month, year = int(match.group(1)), _month(match.group(2)), match.group(3)
+    else:
+        match = _MONTH_DAY.match(text)
+        if not match:
+            raise ValueError(f"not a date: {text!r}")
+        day, month, year = int(match.group(2)), _month(match.group(1)), match.group(3)
+    if year:
+        return date(int(year), month, day)
+    if today is None:
+        raise ValueError(f"no year in {text!r}")
+    candidate = date(today.year, month, day)
+    return candidate if candidate >= today else date(today.year + 1, month, day)
+
+
+def parse_date(value, today=None) -> date:
+    """Parses the ways people write a date; raises ValueError for anything else.
+
+    Accepts 'YYYY-MM-DD', 'DD/MM/YYYY', 'DD/MM/YY', '23 Oct', '23rd October 2026',
+    'Oct 23', 'today', 'tomorrow', 'day after tomorrow', 'in 3 days',
+    'in a week', 'next week' and weekday names. 'Friday' and 'this Friday'
+    are the next Friday on or after `today`; 'next Friday' is strictly after
+    it. `today` defaults to the current date.
+    """
+    text = _clean(value)
+    if text.startswith("on "):
+        text = text[3:]
+    today = today or date.today()
+    if text in _RELATIVE_DAYS:
+        return today + timedelta(days=_RELATIVE_DAYS[text])
+    if text == "next week":
+        return today + timedelta(days=7)
+    match = _IN_DAYS.match(text)
+    if match:
+        count = 1 if match.group(1) in ("a", "an", "one") else int(match.group(1))
+        return today + timedelta(days=count * (7 if match.group(2) == "week" else 1))
+    match = _WEEKDAY.match(text)
+    weekday = _prefix_of(match.group(2), WEEKDAY_NAMES) if match else None
+    if weekday is not None:
+        ahead = (weekday - today.weekday()) % 7
+        if match.group(1) == "next" and ahead == 0:
+            ahead = 7
+        return today + timedelta(days=ahead)
+    return _absolute(text, today)
+
+
+def starts_at(day: date, time: str) -> str:
+    """The starts_at value of an appointment at 'HH:MM' on `day`."""
+    return f"{day.isoformat()}T{time}"
+
+
+def starts_at_for(date_text, time_text):
+    """starts_at for a stored (appointment_date, appointment_time), or None if either cannot be parsed.
+
+    Only absolute dates are accepted: a stored 'tomorrow' was relative to a
+    booking day that is no longer known.
+    """
+    time = normalize_time(time_text)
+    if not time:
+        return None
+    try:
+        day = _absolute(_clean(date_text), None)
+    except ValueError:
+        return None
+    return starts_at(day, time)
+
+
+def now_starts_at() -> str:
+    """The current local time as a starts_at value."""
+    return datetime.now().strftime(STARTS_AT_FORMAT)
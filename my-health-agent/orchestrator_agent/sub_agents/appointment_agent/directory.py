@@ -0,0 +1,405 @@
+# my-health-agent/orchestrator_agent/sub_agents/appointment_agent/directory.py
+"""Read-optimized in-memory snapshot of the doctors table for multi-criteria ranking.
+
+find_doctors in SQL can only order by experience_years. Ranking on fee,
+hospital and whether the doctor visits on the requested weekday would mean
+decoding every candidate's visiting_hours JSON per query. The directory keeps
+the ranking inputs as NumPy columns instead:
+  * specialization / location / hospital as interned integer codes;
+  * experience and fee, folded into a precomputed base score (float32);
+  * visiting weekdays as a uint8 bitmask (bit 0 = Monday).
+Rows are stored sorted by (specialization, location, base score), so the
+candidates of a specialization + city are one contiguous slice, best base
+score first. Specialization-only, city-only and open searches use int32
+posting lists in the same best-first order. A query scores a prefix of its
+candidates and stops as soon as no later candidate can reach the current
+top k, even with every bonus. Only the ids of the top k go back to SQLite for
+the full rows.
+
+The snapshot is loaded once at startup and refreshed incrementally when the
+doctors generation (see doctor_cache) moves: rows with a larger id are
+appended (this covers bulk loads, which only insert) and rows listed in
+doctor_changes, which triggers fill on UPDATE and DELETE, are re-read.
+Refreshes build a new snapshot and swap it in, so concurrent searches always
+see consistent columns.
+
+NumPy is optional; without it (or with AROGYA_DOCTOR_DIRECTORY=0)
+find_doctors keeps the SQL search.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .search import DOCTOR_COLUMNS, canonical_key
+from .slots import parse_visiting_hours
+
+np = None
+
+DIRECTORY_ENABLED = os.getenv("AROGYA_DOCTOR_DIRECTORY", "1") != "0"
+# Change-log rows kept at startup; a snapshot that fell further behind reloads in full.
+CHANGE_LOG_KEEP = 10_000
+# Hospital preferences whose match table is kept per snapshot.
+HOSPITAL_MATCH_CACHE = 256
+# Candidates scored in the first pass of a query; each further pass scores four times as many.
+FIRST_PASS_ROWS = 2048
+
+# Score = sum of weight * feature, every feature in [0, 1]. Visiting on the
+# requested day outranks the preferred hospital, which outranks any mix of
+# experience (more is better) and fee (less is better).
+WEIGHTS = {"availability": 4.0, "hospital": 2.0, "experience": 0.6, "fee": 0.4}
+
+_LOAD_QUERY = ("SELECT id, specialization_key, location_key, hospital_name, experience_years, consultation_fee, "
+               "visiting_hours FROM doctors")
+
+
+def _numpy_available() -> bool:
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+def directory_available() -> bool:
+    return DIRECTORY_ENABLED and _numpy_available()
+
+
+def ensure_directory_schema(conn):
+    """Creates the doctor_changes log and its triggers, and trims old log rows."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS doctor_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            doctor_id INTEGER NOT NULL
+        );
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS doctor_changes_au AFTER UPDATE ON doctors BEGIN
+            INSERT INTO doctor_changes (doctor_id) VALUES (old.id);
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS doctor_changes_ad AFTER DELETE ON doctors BEGIN
+            INSERT INTO doctor_changes (doctor_id) VALUES (old.id);
+        END;
+    """)
+    conn.execute("DELETE FROM doctor_changes WHERE seq <= (SELECT MAX(seq) FROM doctor_changes) - ?", (CHANGE_LOG_KEEP,))
+
+
+def _last_change(conn) -> int:
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM doctor_changes").fetchone()[0]
+
+
+def day_mask(visiting_hours) -> int:
+    """Bitmask of the weekdays (bit 0 = Monday) with visiting hours."""
+    mask = 0
+    for weekday in parse_visiting_hours(visiting_hours):
+        mask |= 1 << weekday
+    return mask
+
+
+class _Interner:
+    """Maps category strings to dense integer codes; code 0 is the empty value."""
+
+    def __init__(self, values=None):
+        self.codes = dict(values.codes) if values else {"": 0}
+
+    def code(self, value) -> int:
+        value = value or ""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+
+class _Snapshot:
+    """One immutable version of the columns, sorted by (specialization, location, base score desc, id)."""
+
+    def __init__(self, columns, specs, locs, hospitals, weights, generation, last_change):
+        ids, spec, loc, hospital, experience, fee, days = columns
+        # Scores are only comparable between snapshots with the same scale; page keys carry it.
+        self.scale = _scale(experience, fee)
+        base_score = _base_score(experience, fee, weights, self.scale)
+        order = np.lexsort((ids, -base_score, loc, spec))
+        self.ids, self.spec, self.loc, self.hospital = ids[order], spec[order], loc[order], hospital[order]
+        self.experience, self.fee, self.days = experience[order], fee[order], days[order]
+        self.base_score = base_score[order]
+        self.specs, self.locs, self.hospitals = specs, locs, hospitals
+        self.generation, self.last_change = generation, last_change
+        self.max_id = int(ids.max()) if len(ids) else 0
+        self._hospital_matches = OrderedDict()
+        self._index()
+
+    def columns(self):
+        return self.ids, self.spec, self.loc, self.hospital, self.experience, self.fee, self.days
+
+    def _index(self):
+        self.by_pair = _ranges(self.spec.astype(np.int64) << 32 | self.loc)
+        # Positions in best-first order per specialization, per location and overall.
+        self.by_spec = _postings(self.spec, self.base_score, self.ids)
+        self.by_loc = _postings(self.loc, self.base_score, self.ids)
+        self.ranked = np.lexsort((self.ids, -self.base_score)).astype(np.int32)
+
+    def hospital_match(self, hospital):
+        """Boolean table over hospital codes: does the hospital name contain every term of `hospital`?"""
+        match = self._hospital_matches.get(hospital)
+        if match is None:
+            terms = canonical_key(hospital).split()
+            match = np.zeros(len(self.hospitals.codes), dtype=bool)
+            for name, code in self.hospitals.codes.items():
+                match[code] = bool(name) and all(term in name.split() for term in terms)
+            self._hospital_matches[hospital] = match
+            if len(self._hospital_matches) > HOSPITAL_MATCH_CACHE:
+                self._hospital_matches.popitem(last=False)
+        return match
+
+    def nbytes(self) -> int:
+        arrays = [*self.columns(), self.base_score, self.ranked, *self.by_spec.values(), *self.by_loc.values()]
+        return sum(array.nbytes for array in arrays)
+
+
+def _scale(experience, fee):
+    """(max experience, min fee, fee range): the table-wide constants that normalize the base score."""
+    max_experience = float(experience.max()) if len(experience) else 1.0
+    known_fee = fee[~np.isnan(fee)]
+    min_fee = float(known_fee.min()) if len(known_fee) else 0.0
+    fee_range = float(known_fee.max()) - min_fee if len(known_fee) else 1.0
+    return max_experience, min_fee, fee_range
+
+
+def _base_score(experience, fee, weights, scale):
+    """The experience and fee part of the score, which does not depend on the query."""
+    max_experience, min_fee, fee_range = scale
+    cheapness = np.nan_to_num(1.0 - (fee - min_fee) / (fee_range or 1.0), nan=0.0)
+    return (experience * (weights["experience"] / (max_experience or 1.0)) + cheapness * weights["fee"]).astype(np.float32)
+
+
+def _postings(keys, base_score, ids) -> dict:
+    """{key: int32 positions of its rows, best base score first}."""
+    order = np.lexsort((ids, -base_score, keys))
+    return {key: order[start:end].astype(np.int32) for key, (start, end) in _ranges(keys[order]).items()}
+
+
+def _ranges(sorted_keys) -> dict:
+    """{key: (start, end)} of each run of equal keys in a sorted array."""
+    if not len(sorted_keys):
+        return {}
+    bounds = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(sorted_keys)]))
+    return {int(sorted_keys[start]): (int(start), int(end)) for start, end in zip(starts, ends)}
+
+
+class DoctorDirectory:
+    """Columnar doctor snapshot with vectorized filtering and top-k ranking."""
+
+    def __init__(self, weights=None):
+        self.weights = dict(weights or WEIGHTS)
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.stats = {"loads": 0, "refreshes": 0, "load_ms": 0.0, "refresh_ms": 0.0}
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    def __len__(self):
+        snapshot = self._snapshot
+        return len(snapshot.ids) if snapshot else 0
+
+    def nbytes(self) -> int:
+        snapshot = self._snapshot
+        return snapshot.nbytes() if snapshot else 0
+
+    def load(self, conn, generation):
+        """Builds the snapshot from the whole doctors table; does nothing without NumPy."""
+        if not _numpy_available():
+            return
+        with self._lock:
+            self._load(conn, generation)
+
+    def _load(self, conn, generation):
+        started = time.perf_counter()
+        last_change = _last_change(conn)
+        specs, locs, hospitals = _Interner(), _Interner(), _Interner()
+        columns = _columns(conn.execute(_LOAD_QUERY), specs, locs, hospitals)
+        self._snapshot = _Snapshot(columns, specs, locs, hospitals, self.weights, generation, last_change)
+        self.stats["loads"] += 1
+        self.stats["load_ms"] = (time.perf_counter() - started) * 1000
+
+    def refresh(self, conn, generation):
+        """Brings the snapshot up to `generation`: appends new doctors and re-reads changed or deleted ones."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.generation == generation or not _numpy_available():
+            return
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                return self._load(conn, generation)
+            if snapshot.generation == generation:
+                return
+            first_change = conn.execute("SELECT MIN(seq) FROM doctor_changes").fetchone()[0]
+            if first_change is not None and first_change > snapshot.last_change + 1:
+                # Log rows this snapshot needs were trimmed.
+                return self._load(conn, generation)
+            started = time.perf_counter()
+            changes = conn.execute(
+                "SELECT seq, doctor_id FROM doctor_changes WHERE seq > ? ORDER BY seq", (snapshot.last_change,)
+            ).fetchall()
+            last_change = changes[-1][0] if changes else snapshot.last_change
+            changed = sorted({doctor_id for _, doctor_id in changes if doctor_id <= snapshot.max_id})
+            rows = []
+            if changed:
+                placeholders = ",".join("?" * len(changed))
+                rows = conn.execute(f"{_LOAD_QUERY} WHERE id IN ({placeholders})", changed).fetchall()
+            rows += conn.execute(f"{_LOAD_QUERY} WHERE id > ?", (snapshot.max_id,)).fetchall()
+            self._snapshot = self._patch(snapshot, changed, rows, generation, last_change)
+            self.stats["refreshes"] += 1
+            self.stats["refresh_ms"] = (time.perf_counter() - started) * 1000
+
+    def _patch(self, base, changed, rows, generation, last_change):
+        # Drop every changed doctor, then add back the current rows of those that still exist.
+        specs, locs, hospitals = _Interner(base.specs), _Interner(base.locs), _Interner(base.hospitals)
+        kept = ~np.isin(base.ids, np.array(changed, dtype=np.int64))
+        new = _columns(rows, specs, locs, hospitals)
+        columns = tuple(np.concatenate((column[kept], added)) for column, added in zip(base.columns(), new))
+        return _Snapshot(columns, specs, locs, hospitals, self.weights, generation, last_change)
+
+    def top_k(self, spec_key, loc_key, k=5, weekday=None, hospital=None, **filters):
+        """Ids of the k best-ranked doctors, best first; None if a search term is unknown to the directory."""
+        ranked = self.rank(spec_key, loc_key, k, weekday, hospital, **filters)
+        return None if ranked is None else [doctor_id for doctor_id, _, _, _ in ranked]
+
+    def rank(self, spec_key, loc_key, k=5, weekday=None, hospital=None, max_fee=None, min_experience=None,
+             available_only=False, hospital_only=False, after=None):
+        """The k best-ranked doctors as (id, score, experience, scale), best first; None if a search term is unknown.
+
+        `weekday` (Mon=0) scores doctors who visit that day and `hospital` is a
+        free-text hospital preference; with available_only / hospital_only
+        they filter instead. `max_fee` and `min_experience` filter too.
+        `after` is the (score, experience, id, scale) of the last doctor of the
+        previous page: the page continues strictly after it in ranking order.
+        A refresh that changed the scale (the most experienced doctor, the fee
+        range) since then changes every score, so such an `after` also gives None.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        if after is not None and (len(after) != 4 or tuple(after[3]) != snapshot.scale):
+            return None
+        spec = snapshot.specs.codes.get(spec_key) if spec_key else 0
+        loc = snapshot.locs.codes.get(loc_key) if loc_key else 0
+        if spec is None or loc is None:
+            return None
+        if spec and loc:
+            start, end = snapshot.by_pair.get(spec << 32 | loc, (0, 0))
+            candidates = lambda count: slice(start, min(end, start + count))
+            total = end - start
+        else:
+            if spec:
+                positions = snapshot.by_spec.get(spec)
+            elif loc:
+                positions = snapshot.by_loc.get(loc)
+            else:
+                positions = snapshot.ranked
+            positions = positions if positions is not None else np.empty(0, dtype=np.int32)
+            candidates = lambda count: positions[:count]
+            total = len(positions)
+        if not total:
+            return []
+
+        weights = self.weights
+        availability = np.float32(weights["availability"]) if weekday is not None else np.float32(0)
+        preferred = np.float32(weights["hospital"]) if hospital else np.float32(0)
+        match = snapshot.hospital_match(hospital) if hospital else None
+        count = FIRST_PASS_ROWS
+        while True:
+            rows = candidates(count)
+            score = snapshot.base_score[rows]
+            keep = np.ones(len(score), dtype=bool)
+            if availability:
+                visits = ((snapshot.days[rows] >> weekday) & 1).astype(bool)
+                score = score + visits * availability
+                if available_only:
+                    keep &= visits
+            if preferred:
+                at_hospital = match[snapshot.hospital[rows]]
+                score = score + at_hospital * preferred
+                if hospital_only:
+                    keep &= at_hospital
+            if max_fee is not None:
+                keep &= snapshot.fee[rows] <= max_fee
+            if min_experience is not None:
+                keep &= snapshot.experience[rows] >= min_experience
+            if after is not None:
+                after_score, after_experience, after_id = np.float32(after[0]), after[1], after[2]
+                experience, ids = snapshot.experience[rows], snapshot.ids[rows]
+                keep &= (score < after_score) | (score == after_score) & (
+                    (experience < after_experience) | (experience == after_experience) & (ids > after_id))
+            passing = np.flatnonzero(keep)
+            done = count >= total
+            if len(passing) >= k:
+                # Everything scoring at least the k-th best, so ties at the cut are broken below, not by argpartition.
+                kth = np.partition(score[passing], len(passing) - k)[len(passing) - k]
+                # Candidates are in best-first base order: none after this prefix can score more than this.
+                if done or kth > snapshot.base_score[candidates(count + 1)][-1] + availability + preferred:
+                    best = passing[score[passing] >= kth]
+                    break
+            elif done:
+                best = passing
+                break
+            count *= 4
+        ids, experience = snapshot.ids[rows][best], snapshot.experience[rows][best]
+        # Best score first; ties go to the more experienced doctor, then the lower id.
+        order = np.lexsort((ids, -experience, -score[best]))[:k]
+        return [(int(ids[i]), float(score[best][i]), float(experience[i]), snapshot.scale) for i in order]
+
+
+def _columns(rows, specs, locs, hospitals):
+    """Turns doctor rows (_LOAD_QUERY order) into column arrays, interning categories as it goes."""
+    rows = list(rows)
+    if not rows:
+        return (np.empty(0, dtype=np.int64), *(np.empty(0, dtype=np.int32) for _ in range(3)),
+                np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.uint8))
+    ids, spec_keys, loc_keys, hospital_names, years, fees, visiting_hours = zip(*rows)
+
+    def codes(values, encode, dtype):
+        # Doctors share a few distinct values per column; encode each distinct value once.
+        encoded = {value: encode(value) for value in set(values)}
+        return np.fromiter(map(encoded.__getitem__, values), dtype=dtype, count=len(values))
+
+    return (
+        np.array(ids, dtype=np.int64),
+        codes(spec_keys, specs.code, np.int32),
+        codes(loc_keys, locs.code, np.int32),
+        codes(hospital_names, lambda name: hospitals.code(canonical_key(name)), np.int32),
+        np.array([value or 0 for value in years], dtype=np.float32),
+        np.array([np.nan if value is None else value for value in fees], dtype=np.float32),
+        codes(visiting_hours, day_mask, np.uint8),
+    )
+
+
+doctor_directory = DoctorDirectory()
+
+
+def directory_search(conn, generation, spec_key, loc_key, limit=5, weekday=None, hospital=None, **filters):
+    """Ranked doctor rows (DOCTOR_COLUMNS) and their (score, experience, id, scale) page keys from the directory.
+
+    Returns (None, None) when the SQL search should answer instead, or when
+    `after` comes from a snapshot with another scale.
+    """
+    if not directory_available():
+        return None, None
+    doctor_directory.refresh(conn, generation)
+    ranked = doctor_directory.rank(spec_key, loc_key, limit, weekday, hospital, **filters)
+    if ranked is None or not ranked and filters.get("after") is None:
+        # Unknown or unmatched terms: the SQL search tries its FTS prefix match.
+        return None, None
+    ids = [doctor_id for doctor_id, _, _, _ in ranked]
+    placeholders = ",".join("?" * len(ids))
+    rows = {row[0]: row for row in conn.execute(f"SELECT {DOCTOR_COLUMNS} FROM doctors WHERE id IN ({placeholders})", ids)}
+    keys = [(score, experience, doctor_id, scale) for doctor_id, score, experience, scale in ranked if doctor_id in rows]
+    return [rows[doctor_id] for _, _, doctor_id, _ in keys], keys
@@ -0,0 +1,140 @@
+# my-health-agent/orchestrator_agent/sub_agents/appointment_agent/doctor_cache.py
+"""Result cache for find_doctors, invalidated by a doctors-table generation counter.
+
+The same few (specialization, city) searches make up most find_doctors calls.
+The cache keeps the finished tool result (the JSON text, with visiting_hours
+already decoded and re-encoded) per normalized search key.
+
+Invalidation does not rely on callers remembering to clear the cache. Triggers
+on the doctors table bump doctors_generation.generation on every insert,
+update and delete, from any connection or process. A lookup reads the
+generation (one primary-key read) and drops the whole cache when it changed.
+Bulk loads drop the triggers along with the search indexes and bump the
+generation once at the end (see bulk_load.restore_deferred_objects).
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = int(os.getenv("AROGYA_DOCTOR_CACHE_SIZE", "1024"))
+TTL_SECONDS = int(os.getenv("AROGYA_DOCTOR_CACHE_TTL", "600"))
+
+GENERATION_TRIGGERS = ("doctors_generation_ai", "doctors_generation_au", "doctors_generation_ad")
+
+
+def ensure_generation_schema(conn):
+    """Creates the one-row generation table and the triggers that bump it."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS doctors_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        );
+    """)
+    conn.execute("INSERT OR IGNORE INTO doctors_generation (id, generation) VALUES (1, 0)")
+    create_generation_triggers(conn)
+
+
+def create_generation_triggers(conn):
+    for name, event in zip(GENERATION_TRIGGERS, ("INSERT", "UPDATE", "DELETE")):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON doctors BEGIN
+                UPDATE doctors_generation SET generation = generation + 1 WHERE id = 1;
+            END;
+        """)
+
+
+def bump_generation(conn):
+    """Marks the doctors table as changed; for writes made while the triggers are dropped."""
+    conn.execute("UPDATE doctors_generation SET generation = generation + 1 WHERE id = 1")
+
+
+def doctors_generation(conn) -> int:
+    row = conn.execute("SELECT generation FROM doctors_generation WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def search_key(specialization_key, location_key, limit, **filters):
+    """Cache key of a search: the canonical keys, the limit and any extra filters."""
+    return (specialization_key, location_key, limit, tuple(sorted(filters.items())))
+
+
+class DoctorSearchCache:
+    """Bounded LRU + TTL cache of find_doctors results, valid for one doctors generation."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl_seconds=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (result, stored_at, size in bytes)
+        self._generation = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_generation(self, generation):
+        if generation != self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._generation = generation
+
+    def get(self, generation, key):
+        """Returns the cached result for `key`, or None; `generation` is the current doctors generation."""
+        now = time.monotonic()
+        with self._lock:
+            self._check_generation(generation)
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] > self.ttl_seconds:
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, generation, key, result):
+        size = sys.getsizeof(result) + sys.getsizeof(key)
+        with self._lock:
+            self._check_generation(generation)
+            self._discard(key)
+            self._entries[key] = (result, time.monotonic(), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._generation = None
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+doctor_cache = DoctorSearchCache()
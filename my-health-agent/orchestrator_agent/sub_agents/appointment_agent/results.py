@@ -0,0 +1,92 @@
+# my-health-agent/orchestrator_agent/sub_agents/appointment_agent/results.py
+"""Encoding of the find_doctors and view_my_appointments results for the model.
+
+A tool result goes into the model context, and the session history then
+carries it on every later turn. The "json" format is the original one: a
+list of indented objects that repeats every key and nests visiting_hours as
+an object. The "compact" format sends one header of short column names, then
+one array per row, with no indentation. Visiting hours are pre-formatted as
+text, e.g. "Mon-Wed,Fri 10:00-13:00".
+
+AROGYA_TOOL_RESULT_FORMAT picks the format: "compact" (the default) or "json".
+"""
+import json
+import os
+
+from .slots import parse_visiting_hours
+
+RESULT_FORMAT = os.getenv("AROGYA_TOOL_RESULT_FORMAT", "compact")
+
+DOCTOR_COLUMNS = ("id", "name", "spec", "exp_yrs", "hospital", "fee_rs", "hours")
+APPOINTMENT_COLUMNS = ("doctor", "hospital", "date", "time", "fee_rs")
+# Keys of an appointment in the "json" format, in APPOINTMENT_COLUMNS order.
+APPOINTMENT_FIELDS = ("doctor_name", "hospital", "date", "time", "consultation_fee")
+_DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def compact() -> bool:
+    return RESULT_FORMAT != "json"
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _fee(fee):
+    # 900.0 -> 900
+    return int(fee) if isinstance(fee, float) and fee.is_integer() else fee
+
+
+def _day_runs(weekdays) -> str:
+    # [0, 1, 2, 4] -> "Mon-Wed,Fri"
+    runs = []
+    for weekday in weekdays:
+        if runs and weekday == runs[-1][1] + 1:
+            runs[-1][1] = weekday
+        else:
+            runs.append([weekday, weekday])
+    return ",".join(
+        _DAY_NAMES[first] if first == last else
+        f"{_DAY_NAMES[first]},{_DAY_NAMES[last]}" if last == first + 1 else
+        f"{_DAY_NAMES[first]}-{_DAY_NAMES[last]}"
+        for first, last in runs
+    )
+
+
+def format_hours(visiting_hours) -> str:
+    """'{"Mon,Tue,Wed,Fri": "10:00-13:00"}' -> 'Mon-Wed,Fri 10:00-13:00'; several ranges are joined by '; '."""
+    days_by_range = {}
+    for weekday, ranges in sorted(parse_visiting_hours(visiting_hours).items()):
+        for start, end in ranges:
+            days_by_range.setdefault((start, end), []).append(weekday)
+    if not days_by_range:
+        return visiting_hours if isinstance(visiting_hours, str) else _dumps(visiting_hours)
+    return "; ".join(
+        f"{_day_runs(weekdays)} {start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+        for (start, end), weekdays in days_by_range.items()
+    )
+
+
+def doctors_result(rows, next_cursor) -> str:
+    """One page of find_doctors rows (id, name, specialization, experience_years, hospital_name, fee, visiting_hours)."""
+    if compact():
+        return _dumps({
+            "cols": DOCTOR_COLUMNS,
+            "rows": [[*row[:5], _fee(row[5]), format_hours(row[6])] for row in rows],
+            "next_cursor": next_cursor,
+        })
+    doctors = []
+    for row in rows:
+        doctors.append({
+            "id": row[0], "name": row[1], "specialization": row[2],
+            "experience_years": row[3], "hospital_name": row[4],
+            "consultation_fee": row[5], "visiting_hours": json.loads(row[6])
+        })
+    return json.dumps({"doctors": doctors, "next_cursor": next_cursor}, indent=2)
+
+
+def appointments_result(rows) -> str:
+    """Appointment rows (doctor_name, hospital, date, time, consultation_fee)."""
+    if compact():
+        return _dumps({"cols": APPOINTMENT_COLUMNS, "rows": [[*row[:4], _fee(row[4])] for row in rows]})
+    return json.dumps([dict(zip(APPOINTMENT_FIELDS, row)) for row in rows], indent=2)
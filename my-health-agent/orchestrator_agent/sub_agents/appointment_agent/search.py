@@ -0,0 +1,262 @@
+# my-health-agent/orchestrator_agent/sub_agents/appointment_agent/search.py
+import re
+import sqlite3
+
+from db.connection import transaction
+
+# Free-text terms the model commonly passes, mapped to the canonical key of the
+# specialization/location stored in the doctors table.
+SPECIALIZATION_ALIASES = {
+    "physician": "general physician",
+    "general practitioner": "general physician",
+    "gp": "general physician",
+    "family doctor": "general physician",
+    "cardiology": "cardiologist",
+    "heart specialist": "cardiologist",
+    "neurology": "neurologist",
+    "dermatology": "dermatologist",
+    "skin specialist": "dermatologist",
+    "orthopedic": "orthopedic surgeon",
+    "orthopaedic": "orthopedic surgeon",
+    "orthopaedic surgeon": "orthopedic surgeon",
+    "pediatrics": "pediatrician",
+    "paediatrician": "pediatrician",
+    "child specialist": "pediatrician",
+    "oncology": "oncologist",
+    "cancer specialist": "oncologist",
+    "endocrinology": "endocrinologist",
+    "gastroenterology": "gastroenterologist",
+}
+
+LOCATION_ALIASES = {
+    "bombay": "mumbai",
+    "new delhi": "delhi",
+    "bengaluru": "bangalore",
+    "madras": "chennai",
+    "calcutta": "kolkata",
+    "poona": "pune",
+}
+
+DOCTOR_COLUMNS = "id, name, specialization, experience_years, hospital_name, consultation_fee, visiting_hours"
+
+# Composite indexes covering every shape of the find_doctors query, so that the
+# filter and the ORDER BY experience_years DESC are both answered by an index seek.
+SEARCH_INDEXES = {
+    "idx_doctors_spec_loc_exp": "doctors (specialization_key, location_key, experience_years DESC)",
+    "idx_doctors_spec_exp": "doctors (specialization_key, experience_years DESC)",
+    "idx_doctors_loc_exp": "doctors (location_key, experience_years DESC)",
+    "idx_doctors_exp": "doctors (experience_years DESC)",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def canonical_key(value) -> str:
+    """Lower-cases a free-text term and collapses punctuation/whitespace to single spaces."""
+    if value is None:
+        return ""
+    return _NON_ALNUM.sub(" ", str(value).lower()).strip()
+
+
+def specialization_key(value) -> str:
+    """Returns the canonical lookup key for a specialization (e.g. 'Physician' -> 'general physician')."""
+    key = canonical_key(value)
+    key = SPECIALIZATION_ALIASES.get(key, key)
+    # Keep the historical behaviour: any kind of 'physician' means a General Physician.
+    if "physician" in key.split():
+        return "general physician"
+    return key
+
+
+def location_key(value) -> str:
+    """Returns the canonical lookup key for a city (e.g. 'Bengaluru' -> 'bangalore')."""
+    key = canonical_key(value)
+    return LOCATION_ALIASES.get(key, key)
+
+
+def _column_names(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def ensure_search_schema(conn):
+    """Adds the canonical key columns, composite indexes and the FTS5 table to the doctors table.
+
+    Safe to call on every startup: existing databases are migrated in place and
+    rows without keys are backfilled.
+    """
+    try:
+        cursor = conn.cursor()
+        columns = _column_names(cursor, "doctors")
+        if "specialization_key" not in columns:
+            cursor.execute("ALTER TABLE doctors ADD COLUMN specialization_key TEXT")
+        if "location_key" not in columns:
+            cursor.execute("ALTER TABLE doctors ADD COLUMN location_key TEXT")
+
+        backfill_search_keys(conn)
+        create_search_indexes(conn)
+        backfill_experience(conn)
+
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'doctors_fts'")
+        fts_exists = cursor.fetchone() is not None
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS doctors_fts USING fts5(
+                specialization, location, content='doctors', content_rowid='id'
+            );
+        """)
+        create_fts_triggers(conn)
+        if not fts_exists:
+            rebuild_fts(conn)
+    except sqlite3.Error as e:
+        print(f"Error preparing doctor search schema: {e}")
+
+
+def backfill_search_keys(conn):
+    """Computes specialization/location keys for rows that were inserted without them."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT DISTINCT specialization, location FROM doctors "
+        "WHERE specialization_key IS NULL OR location_key IS NULL"
+    )
+    pairs = cursor.fetchall()
+    if not pairs:
+        return
+    with transaction(conn):
+        cursor.executemany(
+            "UPDATE doctors SET specialization_key = ?, location_key = ? "
+            "WHERE specialization = ? AND location IS ? "
+            "AND (specialization_key IS NULL OR location_key IS NULL)",
+            [(specialization_key(spec), location_key(loc), spec, loc) for spec, loc in pairs],
+        )
+
+
+def backfill_experience(conn):
+    """Sets a missing experience_years to 0.
+
+    Tables created before the column was NOT NULL may hold NULLs, which sort
+    last under experience_years DESC but never pass a page's `<= ?` seek, so
+    paging could not reach them. A seek on idx_doctors_exp finds them.
+    """
+    with transaction(conn):
+        conn.execute("UPDATE doctors SET experience_years = 0 WHERE experience_years IS NULL")
+
+
+def create_search_indexes(conn):
+    cursor = conn.cursor()
+    for name, target in SEARCH_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+def create_fts_triggers(conn):
+    """Keeps the external-content FTS table in sync with inserts, updates and deletes on doctors."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS doctors_fts_ai AFTER INSERT ON doctors BEGIN
+            INSERT INTO doctors_fts (rowid, specialization, location)
+            VALUES (new.id, new.specialization, new.location);
+        END;
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS doctors_fts_ad AFTER DELETE ON doctors BEGIN
+            INSERT INTO doctors_fts (doctors_fts, rowid, specialization, location)
+            VALUES ('delete', old.id, old.specialization, old.location);
+        END;
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS doctors_fts_au AFTER UPDATE OF specialization, location ON doctors BEGIN
+            INSERT INTO doctors_fts (doctors_fts, rowid, specialization, location)
+            VALUES ('delete', old.id, old.specialization, old.location);
+            INSERT INTO doctors_fts (rowid, specialization, location)
+            VALUES (new.id, new.specialization, new.location);
+        END;
+    """)
+
+
+def rebuild_fts(conn):
+    conn.execute("INSERT INTO doctors_fts (doctors_fts) VALUES ('rebuild')")
+
+
+def _fts_match_expression(specialization, location):
+    """Builds a prefix-matching FTS5 query, e.g. specialization : ("cardio"*) AND location : ("mum"*)."""
+    clauses = []
+    for column, value in (("specialization", specialization), ("location", location)):
+        tokens = canonical_key(value).split()
+        if tokens:
+            terms = " ".join(f'"{token}"*' for token in tokens)
+            clauses.append(f"{column} : ({terms})")
+    return " AND ".join(clauses)
+
+
+def search_doctors(conn, specialization, location, limit=5):
+    """Returns up to `limit` doctor rows, most experienced first (the first page of search_doctors_page)."""
+    return search_doctors_page(conn, specialization, location, limit)[0]
+
+
+def search_doctors_page(conn, specialization, location, limit=5, max_fee=None, min_experience=None,
+                        accept=None, after=None, source=None):
+    """Returns (rows, source): a page of doctor rows ordered by experience_years DESC, id.
+
+    Exact canonical keys are tried first and answered from the composite
+    indexes; if nothing matches, partial or misspelled terms fall back to a
+    prefix search on the FTS5 table. `source` ("exact" or "fts") says which
+    answered, and a later page must pass it back with `after`, the
+    (experience_years, id) of the previous page's last row: the next page is
+    a keyset seek, not an OFFSET scan. `accept(row)` filters rows on what SQL
+    cannot express (weekday, hospital); pages are then filled batch by batch.
+    """
+    spec_key = specialization_key(specialization) if specialization else ""
+    loc_key = location_key(location) if location else ""
+
+    filters, params = "", []
+    if max_fee is not None:
+        filters += " AND {p}consultation_fee <= ?"
+        params.append(max_fee)
+    if min_experience is not None:
+        filters += " AND {p}experience_years >= ?"
+        params.append(min_experience)
+
+    if source != "fts":
+        query = f"SELECT {DOCTOR_COLUMNS} FROM doctors WHERE 1=1"
+        exact_params = []
+        if spec_key:
+            query += " AND specialization_key = ?"
+            exact_params.append(spec_key)
+        if loc_key:
+            query += " AND location_key = ?"
+            exact_params.append(loc_key)
+        rows = _keyset_page(conn, query + filters.format(p=""), exact_params + params, "", limit, accept, after)
+        if rows or after is not None or source == "exact" or not (spec_key or loc_key):
+            return rows, "exact"
+
+    match = _fts_match_expression(specialization, location)
+    if not match:
+        return [], "fts"
+    prefixed = ", ".join(f"d.{column.strip()}" for column in DOCTOR_COLUMNS.split(","))
+    query = f"""
+        SELECT {prefixed}
+        FROM doctors_fts
+        JOIN doctors d ON d.id = doctors_fts.rowid
+        WHERE doctors_fts MATCH ?{filters.format(p="d.")}
+    """
+    return _keyset_page(conn, query, [match] + params, "d.", limit, accept, after), "fts"
+
+
+def _keyset_page(conn, query, params, prefix, limit, accept, after):
+    # Ordered by (experience_years DESC, id): the composite indexes end in experience_years DESC and
+    # then the rowid, so "after (e, i)" is a range seek from e, not a scan past the earlier pages.
+    page = []
+    batch_size = limit if accept is None else limit * 4
+    while len(page) < limit:
+        seek, seek_params = "", []
+        if after is not None:
+            seek = f" AND {prefix}experience_years <= ? AND ({prefix}experience_years < ? OR {prefix}id > ?)"
+            seek_params = [after[0], after[0], after[1]]
+        batch = conn.execute(
+            f"{query}{seek} ORDER BY {prefix}experience_years DESC, {prefix}id LIMIT ?",
+            params + seek_params + [batch_size],
+        ).fetchall()
+        page.extend(row for row in batch if accept is None or accept(row))
+        if len(batch) < batch_size:
+            break
+        after = (batch[-1][3], batch[-1][0])
+    return page[:limit]
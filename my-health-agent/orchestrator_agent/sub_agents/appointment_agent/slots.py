@@ -0,0 +1,209 @@
+# my-health-agent/orchestrator_agent/sub_agents/appointment_agent/slots.py
+import json
+import re
+import sqlite3
+from datetime import date, timedelta
+
+from db.connection import transaction
+
+SLOT_MINUTES = 30
+# Upper bound on the date range a single find_available_slots call may scan.
+MAX_RANGE_DAYS = 14
+
+WEEKDAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+_TIME = re.compile(r"^\s*(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?\s*$", re.IGNORECASE)
+_NAMED_TIMES = {"noon": "12:00", "midday": "12:00", "midnight": "00:00"}
+
+
+class SlotUnavailableError(Exception):
+    """Raised when a requested slot is outside visiting hours or already booked."""
+
+
+def normalize_time(value) -> str:
+    """Converts '10 AM', '10:30 am', '3pm', '15:00 hrs' or 'noon' to 'HH:MM'; returns None if it cannot be parsed."""
+    value = str(value).strip().lower()
+    if value in _NAMED_TIMES:
+        return _NAMED_TIMES[value]
+    for suffix in (" o'clock", " hrs", " hours"):
+        value = value.removesuffix(suffix)
+    match = _TIME.match(value)
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2) or 0)
+    meridiem = (match.group(3) or "").lower().replace(".", "")
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def _minutes(hhmm: str) -> int:
+    hour, minute = hhmm.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+def parse_visiting_hours(visiting_hours) -> dict:
+    """Maps weekday number (Mon=0) to a list of (start, end) minute ranges.
+
+    `visiting_hours` is the JSON stored on the doctor, e.g. {"Mon,Wed,Fri": "10:00-13:00"}.
+    """
+    if isinstance(visiting_hours, str):
+        try:
+            visiting_hours = json.loads(visiting_hours)
+        except ValueError:
+            return {}
+    ranges = {}
+    for days, hours in (visiting_hours or {}).items():
+        try:
+            start, end = (_minutes(part.strip()) for part in hours.split("-"))
+        except ValueError:
+            continue
+        for day in days.split(","):
+            weekday = WEEKDAYS.get(day.strip()[:3].lower())
+            if weekday is not None:
+                ranges.setdefault(weekday, []).append((start, end))
+    return ranges
+
+
+def slots_for_day(hours_by_weekday: dict, day: date) -> list:
+    """Returns the 'HH:MM' slot start times a doctor offers on `day`."""
+    times = []
+    for start, end in hours_by_weekday.get(day.weekday(), []):
+        for minute in range(start, end - SLOT_MINUTES + 1, SLOT_MINUTES):
+            times.append(f"{minute // 60:02d}:{minute % 60:02d}")
+    return sorted(set(times))
+
+
+def ensure_slot_schema(conn):
+    """Creates the materialized slot tables and claims slots for existing bookings on first run."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'doctor_slots'")
+        is_new = cursor.fetchone() is None
+        # The primary key doubles as the unique (doctor_id, date, slot) index.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS doctor_slots (
+                doctor_id INTEGER NOT NULL,
+                slot_date TEXT NOT NULL,
+                slot_time TEXT NOT NULL,
+                appointment_id INTEGER,
+                PRIMARY KEY (doctor_id, slot_date, slot_time)
+            ) WITHOUT ROWID;
+        """)
+        # Days whose slots have been materialized, including days with no visiting hours.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS doctor_slot_days (
+                doctor_id INTEGER NOT NULL,
+                slot_date TEXT NOT NULL,
+                PRIMARY KEY (doctor_id, slot_date)
+            ) WITHOUT ROWID;
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_doctor_slots_free
+            ON doctor_slots (doctor_id, slot_date, slot_time) WHERE appointment_id IS NULL
+        """)
+        if is_new:
+            _claim_existing_bookings(conn)
+    except sqlite3.Error as e:
+        print(f"Error creating slot tables: {e}")
+
+
+def _claim_existing_bookings(conn):
+    rows = conn.execute("""
+        SELECT a.id, a.doctor_id, a.appointment_date, a.appointment_time, d.visiting_hours
+        FROM appointments a JOIN doctors d ON d.id = a.doctor_id
+        WHERE a.status = 'Booked'
+        ORDER BY a.id
+    """).fetchall()
+    with transaction(conn, "IMMEDIATE"):
+        for appointment_id, doctor_id, day, time, visiting_hours in rows:
+            slot_time = normalize_time(time)
+            try:
+                slot_day = date.fromisoformat(day)
+            except ValueError:
+                continue
+            if slot_time:
+                materialize_slots(conn, doctor_id, visiting_hours, [slot_day])
+                conn.execute(
+                    "UPDATE doctor_slots SET appointment_id = ? "
+                    "WHERE doctor_id = ? AND slot_date = ? AND slot_time = ? AND appointment_id IS NULL",
+                    (appointment_id, doctor_id, day, slot_time),
+                )
+
+
+def _missing_days(conn, doctor_id, days):
+    wanted = [day.isoformat() for day in days]
+    placeholders = ",".join("?" * len(wanted))
+    done = {row[0] for row in conn.execute(
+        f"SELECT slot_date FROM doctor_slot_days WHERE doctor_id = ? AND slot_date IN ({placeholders})",
+        (doctor_id, *wanted),
+    )}
+    return [day for day in days if day.isoformat() not in done]
+
+
+def materialize_slots(conn, doctor_id, visiting_hours, days):
+    """Inserts the slots for `days` that have not been materialized yet. Run inside a write transaction."""
+    missing = _missing_days(conn, doctor_id, days)
+    if not missing:
+        return
+    hours_by_weekday = parse_visiting_hours(visiting_hours)
+    conn.executemany(
+        "INSERT OR IGNORE INTO doctor_slots (doctor_id, slot_date, slot_time) VALUES (?, ?, ?)",
+        [(doctor_id, day.isoformat(), slot) for day in missing for slot in slots_for_day(hours_by_weekday, day)],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO doctor_slot_days (doctor_id, slot_date) VALUES (?, ?)",
+        [(doctor_id, day.isoformat()) for day in missing],
+    )
+
+
+def available_slots(conn, doctor_id, visiting_hours, start: date, end: date) -> dict:
+    """Returns {date: [free 'HH:MM' slots]} for the doctor between start and end (inclusive)."""
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    # Only take the write lock when some day still needs its slots materialized.
+    if _missing_days(conn, doctor_id, days):
+        with transaction(conn, "IMMEDIATE"):
+            materialize_slots(conn, doctor_id, visiting_hours, days)
+    rows = conn.execute(
+        "SELECT slot_date, slot_time FROM doctor_slots "
+        "WHERE doctor_id = ? AND slot_date BETWEEN ? AND ? AND appointment_id IS NULL "
+        "ORDER BY slot_date, slot_time",
+        (doctor_id, start.isoformat(), end.isoformat()),
+    ).fetchall()
+    free = {}
+    for slot_date, slot_time in rows:
+        free.setdefault(slot_date, []).append(slot_time)
+    return free
+
+
+def book_slot(conn, doctor_id, visiting_hours, patient_name, patient_id, day: date, slot_time: str) -> int:
+    """Atomically claims a slot and inserts the appointment; returns the appointment id.
+
+    BEGIN IMMEDIATE takes the write lock up front, so two concurrent bookings of
+    the same slot are serialized and the loser sees it as taken.
+    """
+    with transaction(conn, "IMMEDIATE"):
+        materialize_slots(conn, doctor_id, visiting_hours, [day])
+        row = conn.execute(
+            "SELECT appointment_id FROM doctor_slots WHERE doctor_id = ? AND slot_date = ? AND slot_time = ?",
+            (doctor_id, day.isoformat(), slot_time),
+        ).fetchone()
+        if row is None:
+            raise SlotUnavailableError(f"{slot_time} on {day.isoformat()} is outside the doctor's visiting hours.")
+        if row[0] is not None:
+            raise SlotUnavailableError(f"The {slot_time} slot on {day.isoformat()} is already booked.")
+        cursor = conn.execute(
+            "INSERT INTO appointments (doctor_id, patient_name, patient_id, appointment_date, appointment_time, starts_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (doctor_id, patient_name, patient_id, day.isoformat(), slot_time, f"{day.isoformat()}T{slot_time}"),
+        )
+        appointment_id = cursor.lastrowid
+        conn.execute(
+            "UPDATE doctor_slots SET appointment_id = ? WHERE doctor_id = ? AND slot_date = ? AND slot_time = ?",
+            (appointment_id, doctor_id, day.isoformat(), slot_time),
+        )
+    return appointment_id
@@ -1,6 +1,15 @@
 from google.adk.tools import FunctionTool
-from .database import _find_doctors_in_db, _book_appointment_in_db, _get_appointments_for_user_db
 
-find_doctors = FunctionTool(_find_doctors_in_db)
-book_appointment = FunctionTool(_book_appointment_in_db)
-view_my_appointments = FunctionTool(_get_appointments_for_user_db)
\ No newline at end of file
+from db.executor import async_db_tool
+from .database import (
+    _find_doctors_in_db, _book_appointment_in_db, _get_appointments_for_user_db, _find_available_slots_in_db,
+    _get_upcoming_appointments_db
+)
+
+# The database functions block on sqlite3, so the tools run them on the DB thread
+# pool instead of stalling the runner's event loop.
+find_doctors = FunctionTool(async_db_tool(_find_doctors_in_db))
+book_appointment = FunctionTool(async_db_tool(_book_appointment_in_db))
+view_my_appointments = FunctionTool(async_db_tool(_get_appointments_for_user_db))
+find_available_slots = FunctionTool(async_db_tool(_find_available_slots_in_db))
+view_upcoming_appointments = FunctionTool(async_db_tool(_get_upcoming_appointments_db))
@@ -1,19 +1,17 @@
 from google.adk.agents import Agent
 
+from ...prompting import build_instruction
+from .callbacks import serve_cached_answer, store_answer
+
 faq_bot = Agent(
     name="faq_bot",
     description="Answers general health and medical questions.",
-    instruction="""
-     **User Health Context:**
-    This information is derived from the user's uploaded medical reports and ongoing interactions.
-    <user_context>
-    {user_context}
-    </user_context>
-
-    **Interaction History:**
-    <interaction_history>
-    {interaction_history}
-    </interaction_history>
+    # Answers are general, so repeated questions are served from a response cache.
+    # The cache is shared by all users, so the prompt carries no interaction history or
+    # profile, and personalized agents must never use these callbacks.
+    before_model_callback=serve_cached_answer,
+    after_model_callback=store_answer,
+    instruction=build_instruction("faq_bot", """
     You are a helpful AI assistant that answers general frequently asked questions about health, diseases, and wellness. For example, 'What foods should I avoid with diabetes?' or 'What are the symptoms of the flu?'. Do not give personalized medical advice.
-    """
+    """)
 )
\ No newline at end of file
@@ -0,0 +1,151 @@
+# my-health-agent/orchestrator_agent/sub_agents/faq_bot/cache.py
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from db.connection import connection, transaction
+
+DB_FILE = Path(__file__).parent / "faq_cache.db"
+
+TTL_SECONDS = int(os.getenv("AROGYA_FAQ_CACHE_TTL", str(7 * 24 * 3600)))
+MAX_ENTRIES = int(os.getenv("AROGYA_FAQ_CACHE_SIZE", "2000"))
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_FILLER = re.compile(r"^(please |can you |could you |tell me |explain |i want to know |do you know )+")
+# Questions about the user themself are personalized and never cached.
+_PERSONAL = re.compile(r"\b(i|im|me|my|mine|myself)\b")
+# Follow-ups that lean on earlier turns ("What are the side effects of that?") are answered
+# from the conversation, so their answers cannot be shared either.
+_CONTEXTUAL = re.compile(r"\b(that|this|these|those|it|its|they|them|their|he|she|him|her|his|hers|above|same)\b")
+_FOLLOW_UP = re.compile(r"^(and|but|so|also|then|what about|how about)\b")
+# Fewer words than this ("why?", "how often?") is a follow-up, not a standalone question.
+MIN_QUESTION_WORDS = 3
+
+
+def normalize_question(question: str) -> str:
+    """Lower-cases, strips punctuation and leading filler so trivially different phrasings share a key."""
+    text = _NON_ALNUM.sub(" ", str(question).lower()).strip()
+    return _FILLER.sub("", text + " ").strip()
+
+
+def is_cacheable(question: str) -> bool:
+    """Whether the question stands on its own: not about the user, not a follow-up to earlier turns."""
+    key = normalize_question(question)
+    return (len(key.split()) >= MIN_QUESTION_WORDS and not _PERSONAL.search(key)
+            and not _CONTEXTUAL.search(key) and not _FOLLOW_UP.match(key))
+
+
+class FaqResponseCache:
+    """LRU + TTL cache of faq_bot answers, persisted to SQLite so it survives restarts.
+
+    Only exact hits on the normalized question are served. Near matches are
+    not: "type 1 diabetes" and "type 2 diabetes", or "hypertension" and
+    "hypotension", differ in one word and need different answers.
+    """
+
+    def __init__(self, db_file=DB_FILE, max_entries=MAX_ENTRIES, ttl_seconds=TTL_SECONDS):
+        self.db_file = db_file
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (answer, created_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                with connection(self.db_file) as conn:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS faq_cache (
+                            question_key TEXT PRIMARY KEY,
+                            answer TEXT NOT NULL,
+                            created_at REAL NOT NULL,
+                            last_used_at REAL NOT NULL
+                        );
+                    """)
+                    rows = conn.execute(
+                        "SELECT question_key, answer, created_at FROM faq_cache "
+                        "WHERE created_at >= ? ORDER BY last_used_at DESC LIMIT ?",
+                        (time.time() - self.ttl_seconds, self.max_entries),
+                    ).fetchall()
+            except sqlite3.Error as e:
+                print(f"Error loading FAQ cache: {e}")
+                rows = []
+            for key, answer, created_at in reversed(rows):
+                self._entries[key] = (answer, created_at)
+            self._loaded = True
+
+    def get(self, question: str):
+        """Returns a cached answer for the question, or None."""
+        if not is_cacheable(question):
+            return None
+        self._ensure_loaded()
+        key = normalize_question(question)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        self._touch(key, now)
+        return entry[0]
+
+    def put(self, question: str, answer: str):
+        if not answer or not is_cacheable(question):
+            return
+        self._ensure_loaded()
+        key = normalize_question(question)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (answer, now)
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            self.evictions += len(evicted)
+        try:
+            with connection(self.db_file) as conn, transaction(conn):
+                conn.execute(
+                    "INSERT OR REPLACE INTO faq_cache (question_key, answer, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                    (key, answer, now, now),
+                )
+                conn.executemany("DELETE FROM faq_cache WHERE question_key = ?", [(k,) for k in evicted])
+        except sqlite3.Error as e:
+            print(f"Error saving FAQ cache entry: {e}")
+
+    def _touch(self, key, now):
+        try:
+            with connection(self.db_file) as conn:
+                conn.execute("UPDATE faq_cache SET last_used_at = ? WHERE question_key = ?", (now, key))
+        except sqlite3.Error as e:
+            print(f"Error updating FAQ cache entry: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+faq_cache = FaqResponseCache()
@@ -0,0 +1,64 @@
+# my-health-agent/orchestrator_agent/sub_agents/faq_bot/callbacks.py
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from .cache import faq_cache
+
+# Question to cache the answer of, for the current invocation only: "temp:" state is never persisted,
+# so nothing outlives a model call that fails before after_model_callback runs.
+PENDING_QUESTION_KEY = "temp:faq_question"
+# ADK rewrites other agents' events (e.g. the orchestrator's transfer) as user contents starting with this.
+_FOR_CONTEXT = "For context:"
+
+
+def _user_question(callback_context: CallbackContext) -> Optional[str]:
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return None
+    text = "".join(part.text for part in content.parts if getattr(part, "text", None))
+    return text.strip() or None
+
+
+def _has_prior_turns(llm_request: LlmRequest) -> bool:
+    # The current question is the only conversation content of a standalone turn; anything
+    # else is earlier turns the answer may draw on.
+    turns = [
+        content for content in llm_request.contents
+        if not (content.parts and (getattr(content.parts[0], "text", None) or "").startswith(_FOR_CONTEXT))
+    ]
+    return len(turns) > 1
+
+
+def serve_cached_answer(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """before_model_callback: answers from the FAQ cache and skips the model call on a hit."""
+    callback_context.state[PENDING_QUESTION_KEY] = None
+    question = _user_question(callback_context)
+    if not question:
+        return None
+    answer = faq_cache.get(question)
+    if answer is not None:
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=answer)]))
+    # The cache is shared by every user, so only answers to standalone questions go into it.
+    if not _has_prior_turns(llm_request):
+        callback_context.state[PENDING_QUESTION_KEY] = question
+    return None
+
+
+def store_answer(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """after_model_callback: caches the final plain-text answer (never function calls or partial chunks)."""
+    content = llm_response.content
+    if llm_response.partial or not content or not content.parts:
+        return None
+    if any(getattr(part, "function_call", None) for part in content.parts):
+        return None
+    question = callback_context.state.get(PENDING_QUESTION_KEY)
+    if not question:
+        return None
+    callback_context.state[PENDING_QUESTION_KEY] = None
+    answer = "".join(part.text for part in content.parts if getattr(part, "text", None)).strip()
+    if answer:
+        faq_cache.put(question, answer)
+    return None
@@ -1,9 +1,11 @@
 from google.adk.agents import Agent
 
+from ...prompting import build_instruction
+
 med_coach = Agent(
     name="med_coach",
     description="Tracks user fitness activities and provides health suggestions.",
-    instruction="""
+    instruction=build_instruction("med_coach", """
      **User Health Context:**
     This information is derived from the user's uploaded medical reports and ongoing interactions.
     <user_context>
@@ -15,5 +17,5 @@ med_coach = Agent(
     {interaction_history}
     </interaction_history>
     You are a motivational fitness and health coach. You track user's daily activities (like steps, calories) and provide suggestions and encouragement to help them stay on their fitness journey. Use the user's health context to provide personalized advice.
-    """
+    """)
 )
\ No newline at end of file
@@ -1,9 +1,11 @@
 from google.adk.agents import Agent
 
+from ...prompting import build_instruction
+
 symptom_bot = Agent(
     name="symptom_bot",
     description="Analyzes user's health symptoms to provide suggestions.",
-    instruction="""
+    instruction=build_instruction("symptom_bot", """
      **User Health Context:**
     This information is derived from the user's uploaded medical reports and ongoing interactions.
     <user_context>
@@ -15,5 +17,5 @@ symptom_bot = Agent(
     {interaction_history}
     </interaction_history>
     You are a helpful AI assistant that analyzes user's health symptoms. Ask clarifying questions to understand the symptoms fully before providing suggestions. If the user needs expert medical care, inform the orchestrator to redirect to the appointment agent.
-    """
+    """)
 )
\ No newline at end of file
@@ -0,0 +1,105 @@
+# profile_renderer.py
+"""Renders the user's health profile into the compact block agents see as {user_context}.
+
+The profile almost never changes during a session, so the block for each
+(profile version, agent) pair is rendered once and cached. The version is a
+hash of the canonical profile JSON. It is stamped into the profile under
+PROFILE_VERSION_KEY whenever the profile is saved or loaded, so a turn only
+does a dictionary lookup. Any profile edit must go through
+stamp_profile_version(): that gives the profile a new version, and the blocks
+rendered for the old one age out of the cache.
+
+Agents only get the fields they use. Agents without a {user_context}
+placeholder (faq_bot) never call the renderer.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+PROFILE_KEY = "user_context"
+PROFILE_VERSION_KEY = "user_context_version"
+
+ALL_FIELDS = ("user_name", "personalInfo", "diagnosedConditions", "currentMedications")
+AGENT_PROFILE_FIELDS = {
+    "arogya_mitra_orchestrator": ("user_name", "personalInfo", "diagnosedConditions"),
+    "symptom_bot": ALL_FIELDS,
+    "med_coach": ALL_FIELDS,
+    "appointment_agent": ("user_name",),
+}
+CACHE_SIZE = 1024
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+cache_stats = {"hits": 0, "misses": 0}
+
+
+def profile_version(user_context) -> str:
+    """Content hash of the profile; equal profiles share a version."""
+    canonical = json.dumps(user_context or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def stamp_profile_version(profile_state: dict) -> dict:
+    """Stores the current version next to the profile; call after every profile change."""
+    profile_state[PROFILE_VERSION_KEY] = profile_version(profile_state.get(PROFILE_KEY))
+    return profile_state
+
+
+def _medication(med) -> str:
+    if not isinstance(med, dict):
+        return str(med)
+    name, dosage = med.get("name", ""), med.get("dosage")
+    return f"{name} ({dosage})" if dosage and dosage != "N/A" else name
+
+
+def _field_line(user_context, field) -> str:
+    if field == "user_name":
+        return f"Name: {user_context.get('user_name') or 'unknown'}"
+    if field == "personalInfo":
+        info = user_context.get("personalInfo") or {}
+        return f"Age: {info.get('age') or 'unknown'}; Sex: {info.get('sex') or 'unknown'}"
+    if field == "diagnosedConditions":
+        conditions = user_context.get("diagnosedConditions") or []
+        return f"Diagnosed conditions: {', '.join(map(str, conditions)) or 'none recorded'}"
+    if field == "currentMedications":
+        meds = user_context.get("currentMedications") or []
+        return f"Current medications: {', '.join(map(_medication, meds)) or 'none recorded'}"
+    return f"{field}: {user_context.get(field)}"
+
+
+def render_profile(user_context, agent_name=None) -> str:
+    """Renders the fields `agent_name` needs as plain lines, with no caching."""
+    user_context = user_context or {}
+    if not user_context:
+        return "No health profile on record."
+    fields = AGENT_PROFILE_FIELDS.get(agent_name, ALL_FIELDS)
+    return "\n".join(_field_line(user_context, field) for field in fields)
+
+
+def cached_profile_block(state, agent_name=None) -> str:
+    """The rendered profile for the session `state`, cached by profile version and agent."""
+    user_context = state.get(PROFILE_KEY)
+    # Sessions created before versions were stamped pay for one hash per turn.
+    version = state.get(PROFILE_VERSION_KEY) or profile_version(user_context)
+    key = (version, agent_name)
+    with _cache_lock:
+        block = _cache.get(key)
+        if block is not None:
+            _cache.move_to_end(key)
+            cache_stats["hits"] += 1
+            return block
+        cache_stats["misses"] += 1
+
+    block = render_profile(user_context, agent_name)
+    with _cache_lock:
+        _cache[key] = block
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return block
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+        cache_stats.update(hits=0, misses=0)
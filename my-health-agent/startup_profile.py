@@ -0,0 +1,144 @@
+# startup_profile.py
+"""Startup instrumentation: wall clock per startup phase and an import-time tree.
+
+Set AROGYA_STARTUP_PROFILE=1 to have main.py / streamlit_app.py print how long
+each phase took (imports up to the login prompt, DB init, session service,
+runner build). For the import breakdown, run the profiler CLI, which replays
+the startup in a child interpreter under `python -X importtime`:
+
+    python -m startup_profile --entry main --min-ms 5 --depth 3
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+STARTUP_PROFILE = os.getenv("AROGYA_STARTUP_PROFILE", "0") == "1"
+
+# Modules each entry point imports before it can show the login screen.
+ENTRY_IMPORTS = {
+    "main": ["main"],
+    "streamlit": ["streamlit", "db.user_profile_db", "db.session_cache", "agent_runtime", "agent_worker", "utils"],
+}
+
+
+class StartupProfiler:
+    """Records named startup phases relative to interpreter start (approximated by this module's import)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, time.perf_counter() - start))
+
+    def mark(self, name):
+        """Records the time from startup until now as phase `name` (e.g. "ready for login")."""
+        with self._lock:
+            self.phases.append((name, time.perf_counter() - self.started))
+
+    def report(self, title="Startup profile"):
+        if not STARTUP_PROFILE:
+            return
+        with self._lock:
+            phases = list(self.phases)
+        print(f"--- {title} ---")
+        for name, seconds in phases:
+            print(f"  {name:<24} {seconds * 1000:>9.1f} ms")
+
+
+profiler = StartupProfiler()
+
+
+def parse_importtime(stderr_text):
+    """Parses `-X importtime` output into a forest of (name, self_ms, cumulative_ms, children)."""
+    pending = {}
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        label = parts[2][1:]
+        level = (len(label) - len(label.lstrip(" "))) // 2
+        # Children are reported before their parent, one level deeper.
+        node = (label.strip(), int(parts[0]) / 1000, int(parts[1]) / 1000, pending.pop(level + 1, []))
+        pending.setdefault(level, []).append(node)
+    return pending.get(0, [])
+
+
+def print_import_tree(nodes, min_ms=5.0, max_depth=3, depth=0):
+    for name, self_ms, cumulative_ms, children in sorted(nodes, key=lambda node: -node[2]):
+        if cumulative_ms < min_ms:
+            continue
+        print(f"{cumulative_ms:>9.1f} ms {self_ms:>8.1f} ms  {'  ' * depth}{name}")
+        if depth + 1 < max_depth:
+            print_import_tree(children, min_ms, max_depth, depth + 1)
+
+
+_CHILD_SCRIPT = """
+import time
+started = time.perf_counter()
+import importlib
+for module in {modules!r}:
+    importlib.import_module(module)
+print("PHASE login-time imports", (time.perf_counter() - started) * 1000)
+
+from agent_runtime import AgentRuntime
+from db.user_profile_db import initialize_user_database
+from orchestrator_agent.sub_agents.appointment_agent.database import initialize_database
+from startup_profile import profiler
+
+with profiler.phase("db init"):
+    initialize_user_database()
+    initialize_database()
+runtime = AgentRuntime("Arogya Mitra", {db_url!r})
+runtime.session_service
+runtime.runner
+for name, seconds in profiler.phases:
+    print("PHASE", name, seconds * 1000)
+"""
+
+
+def main():
+    # Only the CLI needs these; the entry points import this module first thing.
+    import argparse
+    import subprocess
+    import sys
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entry", choices=sorted(ENTRY_IMPORTS), default="main")
+    parser.add_argument("--db-url", default="sqlite:///./arogyamitra.db")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="hide imports cheaper than this (cumulative)")
+    parser.add_argument("--depth", type=int, default=3, help="levels of the import tree to show")
+    args = parser.parse_args()
+
+    script = _CHILD_SCRIPT.format(modules=ENTRY_IMPORTS[args.entry], db_url=args.db_url)
+    env = dict(os.environ, AROGYA_QUIET="1")
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", script], capture_output=True, text=True, env=env)
+    total_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        sys.exit(f"Startup replay failed:\n{result.stderr[-2000:]}")
+
+    print(f"--- Import tree ({args.entry}, cumulative >= {args.min_ms:g} ms) ---")
+    print(f"{'cumulative':>12} {'self':>11}  module")
+    print_import_tree(parse_importtime(result.stderr), args.min_ms, args.depth)
+
+    print("\n--- Startup phases ---")
+    for line in result.stdout.splitlines():
+        if line.startswith("PHASE "):
+            name, ms = line[len("PHASE "):].rsplit(" ", 1)
+            print(f"  {name:<24} {float(ms):>9.1f} ms")
+    print(f"  {'child process total':<24} {total_ms:>9.1f} ms (includes interpreter start and import-time overhead)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,24 @@
+from startup_profile import profiler
+
 import streamlit as st
-import asyncio
 import uuid
 import re
 from pathlib import Path
 import os
 
+# The server console is not read by users: skip per-event output and state dumps.
+os.environ.setdefault("AROGYA_QUIET", "1")
+
 # Assuming these imports are correct for your project structure
-from db.user_profile_db import initialize_user_database, add_user, get_user, verify_password
-from orchestrator_agent.agent import root_agent as orchestrator_agent
+from db.user_profile_db import initialize_user_database, add_user, verify_login
+from db.passwords import login_throttle
 from orchestrator_agent.sub_agents.appointment_agent.database import initialize_database
-from utils import call_agent_async 
+from utils import stream_agent_async, stream_stats
+from agent_worker import AgentWorker
+# The agent graph, google.adk and google.genai are imported by AgentRuntime
+# after login, so the login page does not wait for them.
+from agent_runtime import AgentRuntime
 
-from google.adk.runners import Runner
-from google.adk.sessions import DatabaseSessionService
 from dotenv import load_dotenv
 
 # --- Configuration ---
@@ -20,23 +26,33 @@ from dotenv import load_dotenv
 load_dotenv(Path(__file__).resolve().parent.parent / '.env') 
 
 APP_NAME = "Arogya Mitra"
+# Number of past messages shown when a previous chat session is resumed.
+CHAT_HISTORY_LIMIT = 50
 
 # --- Initialization (Run once on app startup) ---
 @st.cache_resource
 def setup_databases_and_runner():
-    """Initializes databases and sets up the ADK Runner."""
-    print("Initializing user profile database...")
-    initialize_user_database()
-    print("Initializing doctor database...")
-    initialize_database()
+    """Initializes databases, prepares the (lazily built) ADK Runner and starts the agent worker loop.
+
+    Streamlit reruns the script for every message; the worker's event loop lives
+    as long as the process, so model client connections are reused across turns.
+    """
+    profiler.mark("imports")
+    with profiler.phase("db init"):
+        print("Initializing user profile database...")
+        initialize_user_database()
+        print("Initializing doctor database...")
+        initialize_database()
 
     session_db_path = "sqlite:///./arogyamitra_sessions.db"
-    print(f"Initializing session service with DB at: {session_db_path}")
-    session_service = DatabaseSessionService(db_url=session_db_path)
-    runner = Runner(agent=orchestrator_agent, app_name=APP_NAME, session_service=session_service)
-    return session_service, runner
+    print(f"Session service will use the DB at: {session_db_path}")
+    runtime = AgentRuntime(APP_NAME, session_db_path)
+    worker = AgentWorker().start()
+    profiler.mark("ready for login")
+    profiler.report()
+    return runtime, worker
 
-session_service, runner = setup_databases_and_runner()
+runtime, worker = setup_databases_and_runner()
 
 # --- Streamlit Session State Management ---
 if "logged_in" not in st.session_state:
@@ -80,7 +96,6 @@ def gather_health_profile_ui(username_val):
             "diagnosedConditions": diagnosed_conditions,
             "currentMedications": current_medications,
         },
-        "interaction_history": [],
     }
     # Return both the data and the raw inputs for validation
     return profile_data, age, sex, conditions, medications_input
@@ -102,24 +117,29 @@ if not st.session_state.logged_in:
                 if not username_login or not password_login:
                     st.error("Please enter both username and password.")
                 else:
-                    profile_data, stored_hash = get_user(username_login)
-                    if profile_data and verify_password(stored_hash, password_login):
+                    # Profile, latest session id and recent history in one round trip (or from the login cache).
+                    resumed = runtime.resume(username_login, CHAT_HISTORY_LIMIT)
+                    if resumed and verify_login(username_login, resumed["password_hash"], password_login):
+                        resumed = runtime.adopt_legacy_session(resumed)
                         st.session_state.logged_in = True
-                        st.session_state.username = username_login
-                        st.session_state.user_profile = profile_data
-                        st.session_state.user_id = re.sub(r'\W+', '_', username_login).lower()
+                        st.session_state.username = resumed["username"]
+                        st.session_state.user_profile = resumed["profile"]
 
-                        list_sessions_response = session_service.list_sessions(app_name=APP_NAME, user_id=st.session_state.user_id)
-                        if list_sessions_response.sessions:
-                            st.session_state.session_id = list_sessions_response.sessions[0].id
-                            current_session_state = session_service.get_session(app_name=APP_NAME, user_id=st.session_state.user_id, session_id=st.session_state.session_id)
-                            st.session_state.chat_history = current_session_state.state.get("interaction_history", [])
+                        if resumed["session_id"]:
+                            # The ADK user id the session was stored under (the account id, or the old name-derived id).
+                            st.session_state.user_id = resumed["user_id"]
+                            st.session_state.session_id = resumed["session_id"]
+                            st.session_state.chat_history = [
+                                {"role": "user" if entry["role"] == "user" else "assistant", "content": entry["content"]}
+                                for entry in resumed["history"]
+                            ]
                             st.success("Login successful! Continuing your previous chat session.")
                         else:
-                            st.session_state.session_id = str(uuid.uuid4())
-                            session_service.create_session(app_name=APP_NAME, user_id=st.session_state.user_id, session_id=st.session_state.session_id, state=st.session_state.user_profile)
+                            st.session_state.user_id, st.session_state.session_id = runtime.start_session(resumed["account_id"], st.session_state.user_profile, str(uuid.uuid4()))
                             st.success("Login successful! Created a new chat session for you.")
                         st.rerun() # Rerun here is GOOD - it transitions from login page to chat page
+                    elif login_throttle.retry_after(username_login):
+                        st.error(f"Too many failed attempts. Please try again in {login_throttle.retry_after(username_login):.0f} seconds.")
                     else:
                         st.error("Login failed. Please check your name or password.")
 
@@ -148,13 +168,12 @@ if not st.session_state.logged_in:
                      st.error("Please fill in all health profile details.")
                 else:
                     # --- All checks passed, attempt registration ---
-                    if add_user(username_reg, password_reg, profile_data):
+                    account_id = add_user(username_reg, password_reg, profile_data)
+                    if account_id:
                         st.session_state.logged_in = True
                         st.session_state.username = username_reg
                         st.session_state.user_profile = profile_data
-                        st.session_state.user_id = re.sub(r'\W+', '_', username_reg).lower()
-                        st.session_state.session_id = str(uuid.uuid4())
-                        session_service.create_session(app_name=APP_NAME, user_id=st.session_state.user_id, session_id=st.session_state.session_id, state=st.session_state.user_profile)
+                        st.session_state.user_id, st.session_state.session_id = runtime.start_session(account_id, st.session_state.user_profile, str(uuid.uuid4()))
                         st.success("Registration successful! Your profile has been saved.")
                         st.session_state.chat_history = []
                         st.rerun() # Rerun here is GOOD - transitions from register page to chat page
@@ -164,6 +183,8 @@ if not st.session_state.logged_in:
 else:
     # --- Chat Interface (after successful login/registration) ---
     st.title(f"Arogya Mitra for {st.session_state.username}")
+    # Build the agent graph while the user reads the history or types.
+    runtime.warm_up()
 
     # Display previous chat messages from history
     for message in st.session_state.chat_history:
@@ -177,24 +198,26 @@ else:
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        # Call agent and display response
+        # Stream the agent's reply into the chat as it is generated
         with st.chat_message("assistant"):
-            with st.spinner("Arogya Mitra is thinking..."):
-                try:
-                    final_response = asyncio.run(
-                        call_agent_async(
-                            runner,
+            try:
+                final_response = st.write_stream(
+                    worker.iterate(
+                        stream_agent_async(
+                            runtime.runner,
                             st.session_state.user_id,
                             st.session_state.session_id,
                             prompt
                         )
                     )
-                except Exception as e:
-                    st.error(f"An error occurred while contacting the agent: {e}")
-                    final_response = "Sorry, I encountered an error. Please try again."
+                )
+            except Exception as e:
+                st.error(f"An error occurred while contacting the agent: {e}")
+                final_response = "Sorry, I encountered an error. Please try again."
 
-            # Display the final response from the agent and add to chat history
-            st.markdown(final_response)
+            # write_stream returns a list when chunks are not all strings
+            if not isinstance(final_response, str):
+                final_response = "".join(str(chunk) for chunk in final_response)
             st.session_state.chat_history.append({"role": "assistant", "content": final_response})
 
     # Optional: Display user profile in an expandable section
@@ -223,4 +246,11 @@ else:
             del st.session_state[key]
         st.rerun()
 
-    st.sidebar.button("Logout", on_click=logout)
\ No newline at end of file
+    st.sidebar.button("Logout", on_click=logout)
+
+    timing_report = stream_stats.report()
+    if timing_report["p50_first_token_ms"] is not None:
+        st.sidebar.caption(
+            f"Time to first token: p50 {timing_report['p50_first_token_ms']:.0f} ms, "
+            f"p95 {timing_report['p95_first_token_ms']:.0f} ms over {timing_report['turns']} replies"
+        )
\ No newline at end of file
@@ -0,0 +1,94 @@
+# my-health-agent/tests/test_agent_runtime.py
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from agent_runtime import AgentRuntime
+from db import history_store, session_cache, user_profile_db
+from db.connection import close_all_pools, connection
+
+APP_NAME = "Arogya Mitra"
+
+
+class NoSessionService:
+    def __getattr__(self, name):
+        raise AssertionError(f"the session service was used: {name}")
+
+
+@pytest.fixture
+def runtime(tmp_path, monkeypatch):
+    for module in (user_profile_db, history_store, session_cache):
+        monkeypatch.setattr(module, "DB_FILE", tmp_path / "user_profiles.db")
+    user_profile_db.initialize_user_database()
+    session_cache.clear_cache()
+    runtime = AgentRuntime(APP_NAME, "sqlite://")
+    runtime._session_service = NoSessionService()
+    yield runtime
+    session_cache.clear_cache()
+    close_all_pools()
+
+
+def test_resume_is_read_only(runtime):
+    account_id = user_profile_db.add_user("bob.smith", "1234", {"name": "bob.smith"})
+    resumed = runtime.resume("Bob.Smith")
+    assert resumed["account_id"] == account_id and resumed["session_id"] is None
+    with connection(session_cache.DB_FILE) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM user_sessions").fetchone()[0] == 0
+    assert "google.adk" not in sys.modules
+
+
+def test_adopting_leaves_recorded_sessions_alone(runtime):
+    account_id = user_profile_db.add_user("Asha Rao", "4821", {"name": "Asha Rao"})
+    session_cache.record_session(APP_NAME, account_id, str(account_id), "s1")
+    resumed = runtime.resume("Asha Rao")
+    assert runtime.adopt_legacy_session(resumed) is resumed
+
+
+class LegacySessions:
+    """The part of the ADK session service adopt_legacy_session reads, holding one session per user id."""
+
+    def __init__(self, sessions):
+        self.sessions = sessions
+
+    def list_sessions(self, app_name, user_id):
+        session = self.sessions.get(user_id)
+        return SimpleNamespace(sessions=[session] if session else [])
+
+    def get_session(self, app_name, user_id, session_id):
+        return self.sessions.get(user_id)
+
+
+def legacy_session(state):
+    return SimpleNamespace(id="legacy-1", state=state)
+
+
+@pytest.mark.parametrize("state", [
+    {"user_context": {"user_name": "bob_smith"}},
+    {"user_context": {}},
+    {session_cache.ACCOUNT_ID_KEY: 999},
+])
+def test_a_shared_legacy_id_is_not_claimed_by_another_account(runtime, state):
+    user_profile_db.add_user("bob_smith", "1111", {"name": "bob_smith"})
+    user_profile_db.add_user("bob.smith", "2222", {"name": "bob.smith"})
+    runtime._session_service = LegacySessions({"bob_smith": legacy_session(state)})
+    resumed = runtime.adopt_legacy_session(runtime.resume("bob.smith"))
+    assert resumed["session_id"] is None
+    with connection(session_cache.DB_FILE) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM user_sessions").fetchone()[0] == 0
+
+
+@pytest.mark.parametrize("other_user, state", [
+    ("bob_smith", {"user_context": {"user_name": "bob.smith"}}),
+    (None, {"user_context": {}}),  # no other account maps to "bob_smith"
+])
+def test_the_owner_claims_a_legacy_session(runtime, monkeypatch, other_user, state):
+    if other_user:
+        user_profile_db.add_user(other_user, "1111", {"name": other_user})
+    account_id = user_profile_db.add_user("bob.smith", "2222", {"name": "bob.smith"})
+    runtime._session_service = LegacySessions({"bob_smith": legacy_session(state)})
+    stamped = []
+    monkeypatch.setattr(runtime, "_set_account_id", lambda session, account: stamped.append(account))
+    resumed = runtime.adopt_legacy_session(runtime.resume("bob.smith"))
+    assert (resumed["user_id"], resumed["session_id"]) == ("bob_smith", "legacy-1")
+    assert stamped == [account_id]
@@ -0,0 +1,55 @@
+# my-health-agent/tests/test_agent_worker.py
+import asyncio
+import contextvars
+
+import pytest
+
+from agent_worker import AgentWorker
+
+_value = contextvars.ContextVar("test_value", default=0)
+
+
+@pytest.fixture
+def worker():
+    worker = AgentWorker().start()
+    yield worker
+    worker.stop()
+
+
+async def counting():
+    _value.set(1)
+    for index in range(3):
+        await asyncio.sleep(0)
+        yield index, _value.get()
+        _value.set(_value.get() + 1)
+
+
+def test_context_variables_survive_between_items(worker):
+    assert list(worker.iterate(counting())) == [(0, 1), (1, 2), (2, 3)]
+    assert not worker._drivers
+
+
+def test_early_stop_closes_the_generator_on_the_loop(worker):
+    closed = []
+
+    async def endless():
+        try:
+            while True:
+                yield 1
+        finally:
+            closed.append(asyncio.get_running_loop() is worker.loop)
+
+    items = worker.iterate(endless())
+    assert next(items) == 1
+    items.close()
+    assert closed == [True]
+    assert not worker._drivers
+
+
+def test_errors_reach_the_consumer(worker):
+    async def failing():
+        yield 1
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        list(worker.iterate(failing()))
@@ -0,0 +1,81 @@
+# my-health-agent/tests/test_appointments.py
+import json
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from db import user_profile_db
+from db.connection import close_all_pools, connection
+from db.session_cache import ACCOUNT_ID_KEY
+from orchestrator_agent.sub_agents.appointment_agent import database
+from orchestrator_agent.sub_agents.appointment_agent.doctor_cache import doctor_cache
+
+EVERY_DAY = json.dumps({"Mon,Tue,Wed,Thu,Fri,Sat,Sun": "09:00-17:00"})
+
+
+@pytest.fixture
+def doctor_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", tmp_path / "doctors.db")
+    monkeypatch.setattr(user_profile_db, "DB_FILE", tmp_path / "user_profiles.db")
+    doctor_cache.clear()
+    with connection(database.DB_FILE) as conn:
+        database.create_tables(conn)
+        doctor = conn.execute(
+            "INSERT INTO doctors (name, specialization, experience_years, location, hospital_name, consultation_fee, "
+            "visiting_hours) VALUES ('Dr. Mehta', 'Cardiologist', 12, 'Mumbai', 'City Hospital', 900, ?)",
+            (EVERY_DAY,),
+        ).lastrowid
+    yield doctor
+    close_all_pools()
+
+
+def session(account_id=None):
+    return SimpleNamespace(state={} if account_id is None else {ACCOUNT_ID_KEY: account_id})
+
+
+def book(doctor_id, patient_name, tool_context, day=None, time="10:00"):
+    day = day or date.today() + timedelta(days=3)
+    return database._book_appointment_in_db(doctor_id, patient_name, day.isoformat(), time, tool_context)
+
+
+def patient_ids():
+    with connection(database.DB_FILE) as conn:
+        return [row[0] for row in conn.execute("SELECT patient_id FROM appointments ORDER BY id")]
+
+
+def test_booking_links_the_session_account(doctor_id):
+    assert json.loads(book(doctor_id, "Asha Rao", session(7)))["status"] == "Success"
+    assert patient_ids() == [7]
+
+
+def test_patient_name_is_never_resolved_to_an_account(doctor_id):
+    # A session without an account id books "for Asha Rao": the booking is not linked to her account.
+    assert json.loads(book(doctor_id, "Asha Rao", session()))["status"] == "Success"
+    assert patient_ids() == [None]
+
+
+def test_name_lookup_does_not_see_linked_appointments(doctor_id):
+    book(doctor_id, "Asha Rao", session(7), time="10:00")
+    book(doctor_id, "Asha Rao", session(), time="11:00")
+    by_name = json.loads(database._get_appointments_for_user_db("Asha Rao", session()))
+    by_account = json.loads(database._get_appointments_for_user_db("anyone", session(7)))
+    assert [row[3] for row in by_name["rows"]] == ["11:00"]
+    assert [row[3] for row in by_account["rows"]] == ["10:00"]
+
+
+def test_days_before_today_are_rejected(doctor_id):
+    result = book(doctor_id, "Asha Rao", session(7), day=date.today() - timedelta(days=1))
+    assert result.startswith("Error:") and "past" in result
+    assert patient_ids() == []
+
+
+def test_unlinked_bookings_stay_unlinked_across_restarts(doctor_id):
+    with connection(user_profile_db.DB_FILE) as conn:
+        user_profile_db.create_user_table(conn)
+    # An account whose username is the free-text patient name of a booking made from another session.
+    user_profile_db.add_user("Asha Rao", "4821", {"name": "Asha Rao"})
+    book(doctor_id, "Asha Rao", session())
+    database.initialize_database()
+    database.initialize_database()
+    assert patient_ids() == [None]
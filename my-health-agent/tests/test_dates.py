@@ -0,0 +1,47 @@
+# my-health-agent/tests/test_dates.py
+from datetime import date
+
+import pytest
+
+from orchestrator_agent.sub_agents.appointment_agent.dates import parse_date, starts_at_for
+
+TODAY = date(2026, 10, 14)  # a Wednesday
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2026-10-23", date(2026, 10, 23)),
+    ("23/10/2026", date(2026, 10, 23)),
+    ("23/10/26", date(2026, 10, 23)),
+    ("3.1.27", date(2027, 1, 3)),
+    ("23 Oct", date(2026, 10, 23)),
+    ("23rd October 2027", date(2027, 10, 23)),
+    ("Oct 23", date(2026, 10, 23)),
+    ("5 Jan", date(2027, 1, 5)),  # already past this year, so next year's
+    ("today", TODAY),
+    ("tomorrow", date(2026, 10, 15)),
+    ("day after tomorrow", date(2026, 10, 16)),
+    ("in 3 days", date(2026, 10, 17)),
+    ("in 2 weeks", date(2026, 10, 28)),
+    ("in a week", date(2026, 10, 21)),
+    ("next week", date(2026, 10, 21)),
+    ("Friday", date(2026, 10, 16)),
+    ("on Friday", date(2026, 10, 16)),
+    ("next Friday", date(2026, 10, 16)),
+    ("Wednesday", TODAY),
+    ("next Wednesday", date(2026, 10, 21)),
+    ("fri", date(2026, 10, 16)),
+])
+def test_documented_forms(text, expected):
+    assert parse_date(text, today=TODAY) == expected
+
+
+@pytest.mark.parametrize("text", ["1/2/3", "1/2/345", "23/10/202", "2026-10", "31/02/2026", "sunshine", "23 Smarch", ""])
+def test_rejected(text):
+    with pytest.raises(ValueError):
+        parse_date(text, today=TODAY)
+
+
+def test_stored_dates_must_be_absolute():
+    assert starts_at_for("23/10/2026", "10:30 AM") == "2026-10-23T10:30"
+    assert starts_at_for("tomorrow", "10:30") is None
+    assert starts_at_for("1/2/3", "10:30") is None
@@ -0,0 +1,104 @@
+# my-health-agent/tests/test_doctor_search.py
+import json
+import sqlite3
+
+import pytest
+
+from db.connection import close_all_pools, connection, transaction
+from orchestrator_agent.sub_agents.appointment_agent import database
+from orchestrator_agent.sub_agents.appointment_agent.bulk_load import load_doctors
+from orchestrator_agent.sub_agents.appointment_agent.directory import directory_available, doctor_directory
+from orchestrator_agent.sub_agents.appointment_agent.doctor_cache import doctor_cache
+from orchestrator_agent.sub_agents.appointment_agent.search import search_doctors_page
+
+HOURS = json.dumps({"Mon": "10:00-13:00"})
+
+
+def doctor(index, experience):
+    return (f"Dr. {index}", "Cardiologist", experience, "Mumbai", "City Hospital", 500.0, HOURS)
+
+
+def all_pages(conn, limit=2):
+    ids, after, source = [], None, None
+    while True:
+        rows, source = search_doctors_page(conn, "Cardiologist", "Mumbai", limit, after=after, source=source)
+        ids.extend(row[0] for row in rows)
+        if len(rows) < limit:
+            return ids
+        after = (rows[-1][3], rows[-1][0])
+
+
+@pytest.fixture
+def conn(tmp_path):
+    with connection(tmp_path / "doctors.db") as conn:
+        yield conn
+    close_all_pools()
+
+
+def test_imports_without_experience_are_reachable_by_paging(conn):
+    database.create_tables(conn)
+    load_doctors(conn, [doctor(1, 10), doctor(2, None), doctor(3, 5), doctor(4, None), doctor(5, 7)])
+    assert all_pages(conn) == [1, 5, 3, 2, 4]
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO doctors (name, specialization, experience_years) VALUES ('x', 'y', NULL)")
+
+
+def test_missing_experience_in_older_tables_is_backfilled(conn):
+    conn.execute("CREATE TABLE doctors (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+                 "specialization TEXT NOT NULL, experience_years INTEGER, location TEXT, hospital_name TEXT, "
+                 "consultation_fee REAL, visiting_hours TEXT)")
+    conn.executemany("INSERT INTO doctors (name, specialization, experience_years, location, hospital_name, "
+                     "consultation_fee, visiting_hours) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     [doctor(1, 10), doctor(2, None), doctor(3, 5)])
+    database.create_tables(conn)
+    assert all_pages(conn, limit=1) == [1, 3, 2]
+
+
+@pytest.fixture
+def doctors_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", tmp_path / "doctors.db")
+    monkeypatch.setattr(doctor_directory, "_snapshot", None)
+    doctor_cache.clear()
+    with connection(database.DB_FILE) as conn:
+        database.create_tables(conn)
+        load_doctors(conn, [(f"Dr. {index}", "Cardiologist", index % 20, "Mumbai", "City Hospital",
+                             300.0 + index * 10, HOURS) for index in range(1, 31)])
+    yield
+    doctor_cache.clear()
+    close_all_pools()
+
+
+def find(cursor=""):
+    result = json.loads(database._find_doctors_in_db("Cardiologist", "Mumbai", "", False, "", False, 0, 0, cursor))
+    return [row[0] for row in result["rows"]], result["next_cursor"]
+
+
+@pytest.mark.skipif(not directory_available(), reason="the doctor directory needs NumPy")
+def test_ranked_pages_survive_a_refresh_that_keeps_the_scale(doctors_db):
+    first, cursor = find()
+    assert database._decode_cursor(cursor)["source"] == "rank"
+    with connection(database.DB_FILE) as conn, transaction(conn):
+        conn.execute("UPDATE doctors SET hospital_name = 'Apollo' WHERE id = 30")
+    second, _ = find(cursor)
+    assert second and not set(first) & set(second)
+
+
+@pytest.mark.skipif(not directory_available(), reason="the doctor directory needs NumPy")
+def test_ranked_cursors_expire_when_a_refresh_changes_the_scale(doctors_db):
+    _, cursor = find()
+    # A new most experienced doctor renormalizes every score.
+    with connection(database.DB_FILE) as conn, transaction(conn):
+        conn.execute("UPDATE doctors SET experience_years = 40 WHERE id = 30")
+    result = database._find_doctors_in_db("Cardiologist", "Mumbai", "", False, "", False, 0, 0, cursor)
+    assert result.startswith("Error: This cursor has expired")
+
+
+@pytest.mark.parametrize("value, weekday", [("Friday", 4), ("fri", 4), (" SAT ", 5), ("2026-10-19", 0)])
+def test_preferred_day_names(value, weekday):
+    assert database._weekday(value) == weekday
+
+
+@pytest.mark.parametrize("value", ["Monkey", "Satellite", "Wedding", "sunshine", "thursdayy"])
+def test_words_that_only_start_like_a_day_are_rejected(value):
+    with pytest.raises(ValueError):
+        database._weekday(value)
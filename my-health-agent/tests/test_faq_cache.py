@@ -0,0 +1,49 @@
+# my-health-agent/tests/test_faq_cache.py
+import pytest
+
+from db.connection import close_all_pools
+from orchestrator_agent.sub_agents.faq_bot.cache import FaqResponseCache, is_cacheable
+
+
+@pytest.fixture
+def cache(tmp_path):
+    yield FaqResponseCache(db_file=tmp_path / "faq_cache.db")
+    close_all_pools()
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("early warning symptoms of type 1 diabetes in children", "early warning symptoms of type 2 diabetes in children"),
+    ("foods to avoid with hypertension during pregnancy", "foods to avoid with hypotension during pregnancy"),
+])
+def test_near_miss_questions_are_not_served(cache, cached, asked):
+    cache.put(cached, "answer for the cached question")
+    assert cache.get(asked) is None
+    assert cache.get(cached) == "answer for the cached question"
+
+
+def test_rephrasings_share_a_key(cache):
+    cache.put("What are the symptoms of the flu?", "Fever, cough, aches.")
+    assert cache.get("Please tell me what are the symptoms of the flu") == "Fever, cough, aches."
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("question", [
+    "What are the side effects of that?",
+    "Is it contagious?",
+    "How long do they last?",
+    "why?",
+    "and in children?",
+    "What should I eat with diabetes?",
+    "Is my blood pressure too high?",
+])
+def test_personal_and_context_dependent_questions_are_not_cached(cache, question):
+    assert not is_cacheable(question)
+    cache.put(question, "an answer that depends on the conversation")
+    assert cache.get(question) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_answers_survive_a_restart(tmp_path):
+    FaqResponseCache(db_file=tmp_path / "faq_cache.db").put("What causes migraines?", "Several triggers.")
+    assert FaqResponseCache(db_file=tmp_path / "faq_cache.db").get("what causes migraines") == "Several triggers."
+    close_all_pools()
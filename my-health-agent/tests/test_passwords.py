@@ -0,0 +1,133 @@
+# my-health-agent/tests/test_passwords.py
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from db import passwords, session_cache, user_profile_db
+from db.connection import close_all_pools, connection
+from db.passwords import LoginThrottle, needs_rehash, verification_cache
+
+USERNAME, PASSWORD = "Asha Rao", "4821"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(passwords, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def throttle(monkeypatch, clock):
+    throttle = LoginThrottle(max_failures=5, window_s=300)
+    monkeypatch.setattr(user_profile_db, "login_throttle", throttle)
+    return throttle
+
+
+@pytest.fixture
+def kdf_calls(monkeypatch):
+    # A cheap scrypt cost, and a count of the hashes actually checked.
+    monkeypatch.setattr(passwords, "SCRYPT_LOG2_N", 10)
+    calls = []
+    check = passwords._check
+
+    def counted(stored_hash, password):
+        calls.append(stored_hash)
+        return check(stored_hash, password)
+
+    monkeypatch.setattr(passwords, "_check", counted)
+    verification_cache.clear()
+    yield calls
+    verification_cache.clear()
+
+
+@pytest.fixture
+def users_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(user_profile_db, "DB_FILE", tmp_path / "user_profiles.db")
+    monkeypatch.setattr(session_cache, "DB_FILE", tmp_path / "user_profiles.db")
+    with connection(user_profile_db.DB_FILE) as conn:
+        user_profile_db.create_user_table(conn)
+    session_cache.clear_cache()
+    yield
+    session_cache.clear_cache()
+    close_all_pools()
+
+
+def stored_hash():
+    return user_profile_db.get_user(USERNAME)[1]
+
+
+def add_legacy_user():
+    user_profile_db.add_user(USERNAME, PASSWORD, {"name": USERNAME})
+    legacy = hashlib.sha256(PASSWORD.encode()).hexdigest()
+    user_profile_db._store_password_hash(USERNAME, legacy)
+    return legacy
+
+
+def test_legacy_hash_is_verified_and_rehashed(users_db, throttle, kdf_calls):
+    legacy = add_legacy_user()
+    assert needs_rehash(legacy)
+    assert user_profile_db.verify_login(USERNAME, legacy, PASSWORD)
+    fresh = stored_hash()
+    assert fresh.startswith("scrypt$") and not needs_rehash(fresh)
+    assert passwords.verify_password(fresh, PASSWORD)
+    assert not passwords.verify_password(fresh, "0000")
+
+
+def test_verification_cache_after_a_rehash(users_db, throttle, kdf_calls):
+    legacy = add_legacy_user()
+    user_profile_db.verify_login(USERNAME, legacy, PASSWORD)
+    fresh = stored_hash()
+    kdf_calls.clear()
+    # The first login against the new hash runs the KDF once; the next one is a cache hit.
+    assert user_profile_db.verify_login(USERNAME, fresh, PASSWORD)
+    assert user_profile_db.verify_login(USERNAME, fresh, PASSWORD)
+    assert kdf_calls == [fresh]
+    # A cached verification never vouches for another password.
+    assert not user_profile_db.verify_login(USERNAME, fresh, "0000")
+    assert kdf_calls == [fresh, fresh]
+
+
+def test_lockout_and_its_expiry(throttle, kdf_calls, clock):
+    good = passwords.hash_password(PASSWORD)
+    for _ in range(5):
+        assert not user_profile_db.verify_login(USERNAME, good, "0000")
+    # Locked: even the right password is refused, without hashing.
+    kdf_calls.clear()
+    assert not user_profile_db.verify_login(USERNAME.lower(), good, PASSWORD)
+    assert kdf_calls == []
+    assert throttle.retry_after(USERNAME) == pytest.approx(300)
+
+    clock[0] += 301
+    assert throttle.retry_after(USERNAME) == 0
+    assert user_profile_db.verify_login(USERNAME, good, PASSWORD)
+    # A success clears the failures.
+    assert not user_profile_db.verify_login(USERNAME, good, "0000")
+    assert throttle.retry_after(USERNAME) == 0
+
+
+def test_parallel_guesses_cannot_exceed_the_limit(throttle, kdf_calls):
+    good = passwords.hash_password(PASSWORD)
+    guesses = [f"{pin:04d}" for pin in range(40)]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda guess: user_profile_db.verify_login(USERNAME, good, guess), guesses))
+    assert not any(results)
+    assert len(kdf_calls) == 5
+
+
+def test_throwaway_usernames_cannot_flush_a_lockout(clock):
+    throttle = LoginThrottle(max_failures=5, window_s=300, max_users=100)
+    for _ in range(5):
+        assert throttle.reserve(USERNAME)
+    for index in range(1000):
+        throttle.reserve(f"throwaway {index}")
+    assert not throttle.reserve(USERNAME)
+    assert throttle.retry_after(USERNAME) > 0
+
+    # Once their failures leave the window, entries are forgotten again.
+    clock[0] += 301
+    throttle.reserve("late user")
+    assert len(throttle._failures) <= 100
+    assert throttle.reserve(USERNAME)
@@ -0,0 +1,48 @@
+# my-health-agent/tests/test_prompting.py
+import asyncio
+from types import MappingProxyType, SimpleNamespace
+
+import pytest
+
+from db import history_store
+from db.connection import close_all_pools, connection
+from orchestrator_agent import prompting
+
+TEMPLATE = "History:\n{interaction_history}\nAnswer the question."
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_store, "DB_FILE", tmp_path / "user_profiles.db")
+    with connection(history_store.DB_FILE) as conn:
+        history_store.create_history_tables(conn)
+    yield
+    close_all_pools()
+
+
+def context():
+    # The provider only uses the public ReadonlyContext.state.
+    return SimpleNamespace(state=MappingProxyType({}))
+
+
+def test_provider_renders_the_window_loaded_for_the_turn(store, monkeypatch):
+    history_store.append_entries("u1", "s1", [{"role": "user", "content": "What is {name}?"}])
+    provider = prompting.build_instruction("faq_bot", TEMPLATE)
+
+    async def turn():
+        await prompting.load_turn_window("u1", "s1")
+
+        def fail(*args):
+            raise AssertionError("the provider must not read the database")
+
+        monkeypatch.setattr(prompting, "load_window", fail)
+        return provider(context())
+
+    instruction = asyncio.run(turn())
+    assert "What is (name)?" in instruction
+    assert "{interaction_history}" not in instruction
+
+
+def test_provider_outside_a_turn_renders_empty_history(store):
+    instruction = prompting.build_instruction("faq_bot", TEMPLATE)(context())
+    assert "{interaction_history}" not in instruction
@@ -0,0 +1,242 @@
+# tracing.py
+"""Per-turn latency tracing.
+
+Spans (turn, route, model, tool, db, session_load, history_save, command) are
+appended as JSON lines to TRACE_FILE when AROGYA_TRACE=1. Each span carries the
+turn's trace id, its parent span and a kind-specific set of attributes, e.g.
+token counts on model spans and executor queue wait on db spans. Tracing is
+off by default and costs one flag check per span when disabled.
+
+Report p50/p95/p99 per span type:
+    python -m tracing report
+    python -m tracing report --by kind --file traces.jsonl
+"""
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+TRACE_ENABLED = os.getenv("AROGYA_TRACE", "0") == "1"
+TRACE_FILE = Path(os.getenv("AROGYA_TRACE_FILE", Path(__file__).parent / "traces.jsonl"))
+
+_trace_id = contextvars.ContextVar("arogya_trace_id", default=None)
+_parent_id = contextvars.ContextVar("arogya_span_id", default=None)
+
+
+class JsonlSink:
+    """Appends one JSON object per line; safe to share between threads."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+sink = JsonlSink(TRACE_FILE)
+
+
+class Span:
+    """A span in progress; attributes set with `set()` are written when it ends."""
+
+    __slots__ = ("kind", "name", "span_id", "attrs")
+
+    def __init__(self, kind, name, attrs):
+        self.kind = kind
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class _NoopSpan:
+    __slots__ = ()
+    span_id = None
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def record(kind, name, duration_ms, start=None, span_id=None, **attrs):
+    """Writes a finished span whose timing was measured elsewhere (e.g. between runner events)."""
+    if not TRACE_ENABLED:
+        return
+    sink.write({
+        "trace_id": _trace_id.get(),
+        "span_id": span_id or uuid.uuid4().hex[:16],
+        "parent_id": _parent_id.get(),
+        "kind": kind,
+        "name": name,
+        "start": start if start is not None else time.time() - duration_ms / 1000,
+        "duration_ms": round(duration_ms, 3),
+        **attrs,
+    })
+
+
+@contextmanager
+def span(kind, name=None, **attrs):
+    """Times the enclosed block as a span; nested spans become its children."""
+    if not TRACE_ENABLED:
+        yield _NOOP
+        return
+    current = Span(kind, name, attrs)
+    start_wall, start = time.time(), time.perf_counter()
+    token = _parent_id.set(current.span_id)
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        _parent_id.reset(token)
+        record(kind, name, (time.perf_counter() - start) * 1000, start_wall, current.span_id, **current.attrs)
+
+
+@contextmanager
+def turn(**attrs):
+    """Starts a new trace for one chat turn; everything recorded inside shares its trace id."""
+    if not TRACE_ENABLED:
+        yield _NOOP
+        return
+    token = _trace_id.set(uuid.uuid4().hex)
+    try:
+        with span("turn", **attrs) as current:
+            yield current
+    finally:
+        _trace_id.reset(token)
+
+
+def usage_attrs(event):
+    """Token counts from an event's usage metadata, if the model reported any."""
+    usage = getattr(event, "usage_metadata", None)
+    if usage is None:
+        return {}
+    counts = {
+        "prompt_tokens": getattr(usage, "prompt_token_count", None),
+        "output_tokens": getattr(usage, "candidates_token_count", None),
+        "total_tokens": getattr(usage, "total_token_count", None),
+    }
+    return {key: value for key, value in counts.items() if value is not None}
+
+
+class ModelCallTimer:
+    """Turns the runner's event stream into model spans.
+
+    A model span for an agent runs from the previous complete event (or the
+    start of the run) to the complete event carrying that agent's reply or
+    function calls. Function-response events only move the mark forward: the
+    tool itself is timed by its own span.
+    """
+
+    def __init__(self):
+        self.mark = time.perf_counter()
+
+    def observe(self, event):
+        if not TRACE_ENABLED or getattr(event, "partial", False):
+            return
+        now = time.perf_counter()
+        if not event.get_function_responses() and event.content:
+            calls = [call.name for call in event.get_function_calls()]
+            attrs = usage_attrs(event)
+            if calls:
+                attrs["function_calls"] = calls
+            record("model", event.author, (now - self.mark) * 1000, **attrs)
+        self.mark = now
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def load_spans(path):
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue  # a line cut short by a crash
+    return spans
+
+
+def summarize(spans, by="name"):
+    """Groups spans by kind (or kind and name) and returns latency percentiles and token averages per group."""
+    groups = {}
+    for item in spans:
+        key = item.get("kind") if by == "kind" else f"{item.get('kind')}:{item.get('name') or '-'}"
+        groups.setdefault(key, []).append(item)
+    rows = []
+    for key, items in groups.items():
+        durations = sorted(item["duration_ms"] for item in items)
+        tokens = [item["total_tokens"] for item in items if item.get("total_tokens") is not None]
+        rows.append({
+            "span": key,
+            "count": len(items),
+            "p50_ms": percentile(durations, 0.50),
+            "p95_ms": percentile(durations, 0.95),
+            "p99_ms": percentile(durations, 0.99),
+            "total_ms": sum(durations),
+            "avg_tokens": sum(tokens) / len(tokens) if tokens else None,
+            "errors": sum(1 for item in items if item.get("error")),
+        })
+    rows.sort(key=lambda row: -row["total_ms"])
+    return rows
+
+
+def print_report(rows):
+    print(f"{'span':<42} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'total s':>9} {'avg tok':>8} {'errors':>6}")
+    for row in rows:
+        tokens = f"{row['avg_tokens']:.0f}" if row["avg_tokens"] is not None else "-"
+        print(f"{row['span']:<42} {row['count']:>7} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+              f"{row['p99_ms']:>9.1f} {row['total_ms'] / 1000:>9.2f} {tokens:>8} {row['errors']:>6}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    report_parser = commands.add_parser("report", help="print latency percentiles per span type")
+    report_parser.add_argument("--file", type=Path, default=TRACE_FILE)
+    report_parser.add_argument("--by", choices=["name", "kind"], default="name",
+                               help="group by span kind and name (default) or by kind only")
+    args = parser.parse_args()
+
+    if not args.file.exists():
+        raise SystemExit(f"No trace file at {args.file}. Run the app with AROGYA_TRACE=1 first.")
+    spans = load_spans(args.file)
+    turns = sum(1 for item in spans if item.get("kind") == "turn")
+    print(f"{len(spans):,} spans from {turns:,} turns in {args.file}\n")
+    print_report(summarize(spans, args.by))
+
+
+if __name__ == "__main__":
+    main()
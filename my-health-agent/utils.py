@@ -1,8 +1,28 @@
 # utils.py
+from contextlib import contextmanager
 from datetime import datetime
-from google.genai import types
+import os
+import statistics
+import threading
+import time
 import json
 
+import tracing
+from commands import COMMAND_AGENTS, match_command, run_command
+from db import history_store
+from db.session_cache import ACCOUNT_ID_KEY
+from orchestrator_agent.prompting import load_turn_window
+from orchestrator_agent.router import ROUTER_ENABLED, intent_router
+
+# google.adk and google.genai are imported inside the functions that run a turn:
+# by then the runner (and with it both packages) has been built, and the login
+# screen does not pay for them.
+
+# Production mode: no per-event console output, only errors.
+QUIET = os.getenv("AROGYA_QUIET", "0") == "1"
+# Full state dumps before and after every turn cost extra session loads; opt-in only.
+DEBUG_STATE = os.getenv("AROGYA_DEBUG_STATE", "0") == "1"
+
 # ANSI color codes for terminal output
 class Colors:
     RESET = "\033[0m"
@@ -18,6 +38,25 @@ class Colors:
     BG_GREEN = "\033[42m"
     BG_RED = "\033[41m"
 
+def print_final_response(final_response):
+    """Prints a final response in a frame so it stands out from the event log."""
+    # Use colors and formatting to make the final response stand out
+    print(
+        f"\n{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╔══ AGENT RESPONSE ═════════════════════════════════════════{Colors.RESET}"
+    )
+    print(f"{Colors.CYAN}{Colors.BOLD}{final_response}{Colors.RESET}")
+    print(
+        f"{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╚═════════════════════════════════════════════════════════════{Colors.RESET}\n"
+    )
+
+
+def _final_text(event):
+    """Returns the stripped text of a final response event, or None."""
+    if event.content and event.content.parts and getattr(event.content.parts[0], "text", None):
+        return event.content.parts[0].text.strip()
+    return None
+
+
 async def process_agent_response(event):
     """Process and display agent response events."""
     print(f"Event ID: {event.id}, Author: {event.author}")
@@ -39,14 +78,7 @@ async def process_agent_response(event):
             and event.content.parts[0].text
         ):
             final_response = event.content.parts[0].text.strip()
-            # Use colors and formatting to make the final response stand out
-            print(
-                f"\n{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╔══ AGENT RESPONSE ═════════════════════════════════════════{Colors.RESET}"
-            )
-            print(f"{Colors.CYAN}{Colors.BOLD}{final_response}{Colors.RESET}")
-            print(
-                f"{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╚═════════════════════════════════════════════════════════════{Colors.RESET}\n"
-            )
+            print_final_response(final_response)
         else:
             print(
                 f"\n{Colors.BG_RED}{Colors.WHITE}{Colors.BOLD}==> Final Agent Response: [No text content in final event]{Colors.RESET}\n"
@@ -54,6 +86,100 @@ async def process_agent_response(event):
 
     return final_response
 
+class TurnTimings:
+    """Wall-clock time spent per phase of one chat turn (db, model, render).
+
+    "model" covers the whole runner loop, including the runner's own session
+    I/O and tool calls; "db" is the session and history I/O done here.
+    """
+
+    def __init__(self):
+        self.phases = {"db": 0.0, "model": 0.0, "render": 0.0}
+        self.started = time.perf_counter()
+        self.first_token = None
+
+    def mark_first_token(self):
+        """Records the time to first token; later calls are ignored."""
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.started
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def summary(self) -> str:
+        total = time.perf_counter() - self.started
+        parts = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases.items())
+        if self.first_token is not None:
+            parts += f", first token {self.first_token * 1000:.0f} ms"
+        return f"Turn took {total * 1000:.0f} ms ({parts})"
+
+
+class StreamingStats:
+    """Time to first token and total time of streamed turns, for the UI and session reports."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.first_token_ms = []
+        self.total_ms = []
+
+    def record(self, timings):
+        with self._lock:
+            if timings.first_token is not None:
+                self.first_token_ms.append(timings.first_token * 1000)
+            self.total_ms.append((time.perf_counter() - timings.started) * 1000)
+
+    @staticmethod
+    def _percentile(values, fraction):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else None
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "turns": len(self.total_ms),
+                "p50_first_token_ms": statistics.median(self.first_token_ms) if self.first_token_ms else None,
+                "p95_first_token_ms": self._percentile(self.first_token_ms, 0.95),
+                "p50_total_ms": statistics.median(self.total_ms) if self.total_ms else None,
+            }
+
+
+stream_stats = StreamingStats()
+
+
+class SessionSnapshot:
+    """Loads a session at most once and hands the same copy to every consumer in a turn.
+
+    `refresh()` drops the cached copy; call it after the runner has written new
+    events, since appending to a stale copy is rejected by DatabaseSessionService.
+    """
+
+    def __init__(self, session_service, app_name, user_id, session_id, timings=None):
+        self.session_service = session_service
+        self.app_name = app_name
+        self.user_id = user_id
+        self.session_id = session_id
+        self.timings = timings or TurnTimings()
+        self._session = None
+        self.loads = 0
+
+    def get(self):
+        if self._session is None:
+            with self.timings.phase("db"), tracing.span("session_load"):
+                self._session = self.session_service.get_session(
+                    app_name=self.app_name, user_id=self.user_id, session_id=self.session_id
+                )
+            self.loads += 1
+        return self._session
+
+    def refresh(self):
+        self._session = None
+
+
 def add_user_query_to_history(session_service, app_name, user_id, session_id, query):
     """Adds a user query to the interaction history."""
     entry = {"role": "user", "content": query}
@@ -72,35 +198,45 @@ def add_agent_response_to_history(
     )
 
 
+def add_turn_to_history(
+    session_service, app_name, user_id, session_id, query, agent_name, response
+):
+    """Records a user query and the agent's reply in one history store transaction."""
+    entries = [{"role": "user", "content": query}]
+    if response:
+        entries.append({"role": agent_name, "content": response})
+    _append_history_entries(session_service, app_name, user_id, session_id, entries)
+
+
 def _update_interaction_history(
     session_service, app_name, user_id, session_id, entry
 ):
-    """Internal function to update the interaction history in state."""
-    try:
-        session = session_service.get_session(
-            app_name=app_name, user_id=user_id, session_id=session_id
-        )
-        if not session:
-            return
+    """Internal function to record an entry in the bounded interaction history."""
+    _append_history_entries(session_service, app_name, user_id, session_id, [entry])
 
-        # Get the history list from the session's state
-        history = session.state.get("interaction_history", [])
-        # Append the new entry
-        history.append(entry)
-        # The change is automatically reflected since we are modifying the object by reference
-        
-        # REMOVED: session_service.save_session(session) - This line was incorrect and is not needed.
 
+def _append_history_entries(
+    session_service, app_name, user_id, session_id, entries
+):
+    """Appends history entries to the history store.
+
+    The history no longer lives in session state, so recording a turn neither
+    loads the session nor appends a state-delta event to it.
+    """
+    try:
+        with tracing.span("history_save", entries=len(entries)):
+            history_store.append_entries(user_id, session_id, entries)
     except Exception as e:
         print(f"{Colors.RED}Error updating interaction history: {e}{Colors.RESET}")
 
 
-def display_state(session_service, app_name, user_id, session_id, label="Current State"):
+def display_state(session_service, app_name, user_id, session_id, label="Current State", session=None):
     """Displays the current session state, adapted for the health app."""
     try:
-        session = session_service.get_session(
-            app_name=app_name, user_id=user_id, session_id=session_id
-        )
+        if session is None:
+            session = session_service.get_session(
+                app_name=app_name, user_id=user_id, session_id=session_id
+            )
         if not session:
             print(f"{Colors.RED}Could not retrieve session to display state.{Colors.RESET}")
             return
@@ -127,10 +263,10 @@ def display_state(session_service, app_name, user_id, session_id, label="Current
             for med in meds:
                 print(f"   - {med.get('name', 'N/A')} ({med.get('dosage', 'N/A')})")
 
-        interaction_history = session.state.get("interaction_history", [])
+        interaction_history = history_store.recent_entries(user_id, session_id, 5)
         if interaction_history:
             print(f"📝 {Colors.BOLD}Interaction History:{Colors.RESET}")
-            for idx, entry in enumerate(interaction_history[-5:], 1):
+            for idx, entry in enumerate(interaction_history, 1):
                 role = entry.get("role", "system")
                 content = entry.get("content", "")
                 if len(content) > 100:
@@ -147,59 +283,283 @@ def display_state(session_service, app_name, user_id, session_id, label="Current
         print(f"{Colors.RED}Error displaying state: {e}{Colors.RESET}")
 
 
+_sub_agent_runners = {}
+
+
+def _runner_for_agent(runner, agent_name):
+    """Returns a Runner rooted at one of the orchestrator's sub-agents, sharing its session service.
+
+    Transfers still resolve through the full agent tree, so the sub-agent can hand
+    the conversation back to the orchestrator if the pre-router guessed wrong.
+    """
+    key = (id(runner), agent_name)
+    if key not in _sub_agent_runners:
+        agent = runner.agent.find_agent(agent_name)
+        if agent is None:
+            return runner
+        from google.adk.runners import Runner
+
+        _sub_agent_runners[key] = Runner(
+            agent=agent, app_name=runner.app_name, session_service=runner.session_service
+        )
+    return _sub_agent_runners[key]
+
+
+def _is_transfer_event(event):
+    return any(call.name == "transfer_to_agent" for call in event.get_function_calls())
+
+
+def _select_runner(runner, query):
+    """Returns the sub-agent runner the pre-router is confident about, or the orchestrator's runner."""
+    if ROUTER_ENABLED:
+        with tracing.span("route") as span:
+            decision = intent_router.route(query)
+            span.set(agent=decision.agent_name, source=decision.source, confidence=decision.confidence)
+        if decision.is_confident:
+            if not QUIET:
+                print(f"{Colors.YELLOW}Pre-routed to {decision.agent_name} ({decision.source}, confidence {decision.confidence:.2f}){Colors.RESET}")
+            return _runner_for_agent(runner, decision.agent_name)
+    return runner
+
+
+def _run_command_turn(runner, user_id, session_id, query, command, snapshot):
+    """Answers a structured command straight from the database and records it in the history."""
+    started = time.perf_counter()
+    session = snapshot.get()
+    state = session.state if session else {}
+    with snapshot.timings.phase("db"), tracing.span("command", command):
+        response = run_command(command, state.get("user_context", {}), state.get(ACCOUNT_ID_KEY))
+        add_turn_to_history(
+            runner.session_service,
+            runner.app_name,
+            user_id,
+            session_id,
+            query,
+            COMMAND_AGENTS[command],
+            response,
+        )
+    if not QUIET:
+        with snapshot.timings.phase("render"):
+            print_final_response(response)
+            print(f"{Colors.YELLOW}Answered '{command}' locally in {(time.perf_counter() - started) * 1000:.1f} ms{Colors.RESET}")
+    return response
+
+
 async def call_agent_async(runner, user_id, session_id, query: str):
-    """Calls the agent, streams the response, and displays state changes."""
-    print(
-        f"\n{Colors.BG_GREEN}{Colors.WHITE}{Colors.BOLD}--- Running Query: {query} ---{Colors.RESET}"
-    )
+    """Calls the agent, streams the response, and records the turn in the history.
+
+    Structured commands such as 'view my appointments' are answered locally.
+    Messages the local intent router is confident about go straight to the
+    matching sub-agent; everything else goes through the LLM orchestrator.
+
+    The turn is recorded in the history store, so an agent turn does not load
+    the session here at all; commands load it once for the user profile, and
+    AROGYA_DEBUG_STATE=1 loads it for the state dumps. With AROGYA_TRACE=1 the
+    turn and its route, model, tool and DB spans are written by `tracing`.
+    """
+    with tracing.turn(mode="call"):
+        return await _call_agent_turn(runner, user_id, session_id, query)
+
+
+async def _call_agent_turn(runner, user_id, session_id, query):
+    timings = TurnTimings()
+    snapshot = SessionSnapshot(runner.session_service, runner.app_name, user_id, session_id, timings)
+    if not QUIET:
+        print(
+            f"\n{Colors.BG_GREEN}{Colors.WHITE}{Colors.BOLD}--- Running Query: {query} ---{Colors.RESET}"
+        )
+    command = match_command(query)
+    if command:
+        try:
+            response = _run_command_turn(runner, user_id, session_id, query, command, snapshot)
+            if not QUIET:
+                print(timings.summary())
+            return response
+        except Exception as e:
+            print(f"{Colors.RED}Command '{command}' failed, falling back to the agent: {e}{Colors.RESET}")
+            snapshot.refresh()
+
     final_response_text = None
     agent_name = "agent"
 
-    display_state(
-        runner.session_service,
-        runner.app_name,
-        user_id,
-        session_id,
-        "State BEFORE processing",
-    )
+    active_runner = _select_runner(runner, query)
+
+    if DEBUG_STATE:
+        display_state(
+            runner.session_service,
+            runner.app_name,
+            user_id,
+            session_id,
+            "State BEFORE processing",
+            snapshot.get(),
+        )
+        # The runner is about to append events, which makes this copy stale.
+        snapshot.refresh()
 
     try:
+        from google.genai import types
+
         content = types.Content(role="user", parts=[types.Part(text=query)])
         
-        print(f"{Colors.CYAN}{Colors.BOLD}Arogya Mitra:{Colors.RESET} ", end="", flush=True)
-        async for chunk in runner.run_async(
-            user_id=user_id, session_id=session_id, new_message=content
-        ):
-            if chunk.author:
-                agent_name = chunk.author
+        if not QUIET:
+            print(f"{Colors.CYAN}{Colors.BOLD}Arogya Mitra:{Colors.RESET} ", end="", flush=True)
+        with timings.phase("db"):
+            await load_turn_window(user_id, session_id)
+        started = time.perf_counter()
+        hop_recorded = active_runner is not runner
+        model_timer = tracing.ModelCallTimer()
+        with timings.phase("model"):
+            async for chunk in active_runner.run_async(
+                user_id=user_id, session_id=session_id, new_message=content
+            ):
+                model_timer.observe(chunk)
+                if chunk.author:
+                    agent_name = chunk.author
 
-            if chunk.content:
-                print(chunk.content, end="", flush=True)
+                if not hop_recorded and chunk.author == runner.agent.name and _is_transfer_event(chunk):
+                    intent_router.stats.record_orchestrator_hop(time.perf_counter() - started)
+                    hop_recorded = True
 
-            if chunk.is_final_response and chunk.content:
-                 final_response_text = await process_agent_response(chunk)
+                if chunk.is_final_response() and chunk.content:
+                    if QUIET:
+                        final_response_text = _final_text(chunk)
+                    else:
+                        render_started = time.perf_counter()
+                        final_response_text = await process_agent_response(chunk)
+                        timings.phases["render"] += time.perf_counter() - render_started
+                elif not QUIET:
+                    print(f"Event ID: {chunk.id}, Author: {chunk.author}")
+        # Tool calls and rendering happen inside the event loop above; keep "model" exclusive.
+        timings.phases["model"] -= timings.phases["render"]
                  
-        print("\n")
+        if not QUIET:
+            print("\n")
 
     except Exception as e:
         print(f"{Colors.BG_RED}{Colors.WHITE} ERROR during agent run: {e} {Colors.RESET}")
 
-    if final_response_text:
-        add_agent_response_to_history(
+    with timings.phase("db"):
+        add_turn_to_history(
             runner.session_service,
             runner.app_name,
             user_id,
             session_id,
+            query,
             agent_name,
             final_response_text,
         )
 
-    display_state(
-        runner.session_service,
-        runner.app_name,
-        user_id,
-        session_id,
-        "State AFTER processing",
-    )
+    if DEBUG_STATE:
+        with timings.phase("render"):
+            display_state(
+                runner.session_service,
+                runner.app_name,
+                user_id,
+                session_id,
+                "State AFTER processing",
+                snapshot.get(),
+            )
+
+    if not QUIET:
+        print(timings.summary())
+
+    return final_response_text
+
+
+
+async def stream_agent_async(runner, user_id, session_id, query: str):
+    """Like call_agent_async, but yields the reply text as the model produces it.
+
+    The runner is run with SSE streaming, so partial events carry the text
+    generated so far in small chunks. Replies that arrive in one piece (local
+    commands, cached FAQ answers, tool-only turns) are yielded whole. The turn
+    is recorded in the history once the stream ends, and its time to first
+    token goes into `stream_stats`.
+    """
+    with tracing.turn(mode="stream"):
+        async for text in _stream_agent_turn(runner, user_id, session_id, query):
+            yield text
+
+
+async def _stream_agent_turn(runner, user_id, session_id, query):
+    timings = TurnTimings()
+    snapshot = SessionSnapshot(runner.session_service, runner.app_name, user_id, session_id, timings)
+    command = match_command(query)
+    if command:
+        try:
+            response = _run_command_turn(runner, user_id, session_id, query, command, snapshot)
+            timings.mark_first_token()
+            stream_stats.record(timings)
+            yield response
+            return
+        except Exception as e:
+            print(f"{Colors.RED}Command '{command}' failed, falling back to the agent: {e}{Colors.RESET}")
+
+    active_runner = _select_runner(runner, query)
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.genai import types
+
+    content = types.Content(role="user", parts=[types.Part(text=query)])
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+
+    final_response_text = None
+    agent_name = "agent"
+    # Whether text was streamed since the last complete event; if not, the
+    # complete event's text has not been shown yet.
+    streamed = False
+    shown_any = False
+    started = time.perf_counter()
+    hop_recorded = active_runner is not runner
+    model_timer = tracing.ModelCallTimer()
+    try:
+        with timings.phase("db"):
+            await load_turn_window(user_id, session_id)
+        with timings.phase("model"):
+            async for event in active_runner.run_async(
+                user_id=user_id, session_id=session_id, new_message=content, run_config=run_config
+            ):
+                model_timer.observe(event)
+                if event.author:
+                    agent_name = event.author
+
+                if not hop_recorded and event.author == runner.agent.name and _is_transfer_event(event):
+                    intent_router.stats.record_orchestrator_hop(time.perf_counter() - started)
+                    hop_recorded = True
+
+                if event.partial:
+                    text = "".join(part.text for part in (event.content.parts if event.content else []) if getattr(part, "text", None))
+                    if text:
+                        timings.mark_first_token()
+                        if not streamed and shown_any:
+                            yield "\n\n"
+                        streamed = shown_any = True
+                        yield text
+                    continue
+
+                if event.is_final_response() and event.content:
+                    final_response_text = _final_text(event)
+                    if final_response_text and not streamed:
+                        timings.mark_first_token()
+                        if shown_any:
+                            yield "\n\n"
+                        shown_any = True
+                        yield final_response_text
+                streamed = False
+    except Exception as e:
+        print(f"{Colors.BG_RED}{Colors.WHITE} ERROR during agent run: {e} {Colors.RESET}")
+        if not shown_any:
+            yield "Sorry, I encountered an error. Please try again."
 
-    return final_response_text
\ No newline at end of file
+    with timings.phase("db"):
+        add_turn_to_history(
+            runner.session_service,
+            runner.app_name,
+            user_id,
+            session_id,
+            query,
+            agent_name,
+            final_response_text,
+        )
+    stream_stats.record(timings)
+    if not QUIET:
+        print(timings.summary())